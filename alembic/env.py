@@ -11,7 +11,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.core.config import settings
 from src.db.database import Base
-from src.db.models import Prediction, Feedback, APIUsage, ModelVersion
+from src.db.models import Prediction, Feedback, APIUsage, APIUsageRollup, ModelVersion, PredictionStats
 
 config = context.config
 
@@ -0,0 +1,59 @@
+"""Add prediction_stats rollup table
+
+Revision ID: 3b7d1f9c2a41
+Revises: e192133942fe
+Create Date: 2026-10-19 09:12:40.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d1f9c2a41'
+down_revision: Union[str, None] = 'e192133942fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('prediction_stats',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('model_version', sa.String(length=50), nullable=False),
+    sa.Column('total_count', sa.BigInteger(), nullable=False),
+    sa.Column('fraud_count', sa.BigInteger(), nullable=False),
+    sa.Column('low_count', sa.BigInteger(), nullable=False),
+    sa.Column('medium_count', sa.BigInteger(), nullable=False),
+    sa.Column('high_count', sa.BigInteger(), nullable=False),
+    sa.Column('fraud_probability_sum', sa.Float(), nullable=False),
+    sa.Column('anomaly_score_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bucket_start', 'model_version', name='uq_prediction_stats_bucket_model')
+    )
+    op.create_index(op.f('ix_prediction_stats_bucket_start'), 'prediction_stats', ['bucket_start'], unique=False)
+
+    # Backfill from predictions written before the rollup existed
+    op.execute("""
+        INSERT INTO prediction_stats (
+            bucket_start, model_version, total_count, fraud_count,
+            low_count, medium_count, high_count,
+            fraud_probability_sum, anomaly_score_sum
+        )
+        SELECT
+            date_trunc('minute', created_at), model_version, count(*),
+            count(*) FILTER (WHERE prediction),
+            count(*) FILTER (WHERE risk_level = 'LOW'),
+            count(*) FILTER (WHERE risk_level = 'MEDIUM'),
+            count(*) FILTER (WHERE risk_level = 'HIGH'),
+            sum(fraud_probability), sum(anomaly_score)
+        FROM predictions
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_prediction_stats_bucket_start'), table_name='prediction_stats')
+    op.drop_table('prediction_stats')
@@ -0,0 +1,52 @@
+"""Add api_usage_rollup table
+
+Revision ID: 8c2e4a6d0f13
+Revises: 3b7d1f9c2a41
+Create Date: 2026-10-19 10:04:51.603917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2e4a6d0f13'
+down_revision: Union[str, None] = '3b7d1f9c2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('api_usage_rollup',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('api_key', sa.String(length=255), nullable=False),
+    sa.Column('endpoint', sa.String(length=255), nullable=False),
+    sa.Column('method', sa.String(length=10), nullable=False),
+    sa.Column('request_count', sa.BigInteger(), nullable=False),
+    sa.Column('status_2xx', sa.BigInteger(), nullable=False),
+    sa.Column('status_3xx', sa.BigInteger(), nullable=False),
+    sa.Column('status_4xx', sa.BigInteger(), nullable=False),
+    sa.Column('status_5xx', sa.BigInteger(), nullable=False),
+    sa.Column('latency_sum_ms', sa.Float(), nullable=False),
+    sa.Column('latency_max_ms', sa.Float(), nullable=False),
+    sa.Column('latency_10ms', sa.BigInteger(), nullable=False),
+    sa.Column('latency_50ms', sa.BigInteger(), nullable=False),
+    sa.Column('latency_100ms', sa.BigInteger(), nullable=False),
+    sa.Column('latency_250ms', sa.BigInteger(), nullable=False),
+    sa.Column('latency_500ms', sa.BigInteger(), nullable=False),
+    sa.Column('latency_1000ms', sa.BigInteger(), nullable=False),
+    sa.Column('latency_inf', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('bucket_start', 'api_key', 'endpoint', 'method', name='uq_api_usage_rollup_bucket')
+    )
+    op.create_index(op.f('ix_api_usage_rollup_api_key'), 'api_usage_rollup', ['api_key'], unique=False)
+    op.create_index(op.f('ix_api_usage_rollup_bucket_start'), 'api_usage_rollup', ['bucket_start'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_api_usage_rollup_bucket_start'), table_name='api_usage_rollup')
+    op.drop_index(op.f('ix_api_usage_rollup_api_key'), table_name='api_usage_rollup')
+    op.drop_table('api_usage_rollup')
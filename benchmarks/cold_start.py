@@ -0,0 +1,78 @@
+"""
+Cold-start benchmark: import time of src.main and latency of the first requests.
+
+Each scenario runs in a fresh interpreter so nothing is shared between runs:
+
+    python benchmarks/cold_start.py --runs 5
+
+"with warmup" waits for /ready before sending traffic, as an orchestrator
+would; "without warmup" sets WARMUP_ENABLED=False and sends traffic as soon as
+the app has started.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = r"""
+import json, time
+t0 = time.perf_counter()
+from src.main import app
+import_s = time.perf_counter() - t0
+
+from fastapi.testclient import TestClient
+payload = json.load(open("sample_transaction.json"))
+headers = {"X-API-Key": "dev-key-12345"}
+
+with TestClient(app) as client:
+    t0 = time.perf_counter()
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.01)
+    ready_s = time.perf_counter() - t0
+
+    latencies = []
+    for i in range(5):
+        payload["transaction_id"] = f"COLD-START-{time.time_ns()}-{i}"
+        t0 = time.perf_counter()
+        client.post("/api/v1/predict", json=payload, headers=headers)
+        latencies.append(time.perf_counter() - t0)
+
+print(json.dumps({"import_s": import_s, "ready_s": ready_s, "latencies": latencies}))
+"""
+
+
+def run_once(warmup: bool) -> dict:
+    env = dict(os.environ, WARMUP_ENABLED=str(warmup), LOG_LEVEL="WARNING", PYTHONWARNINGS="ignore")
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<18}{'import ms':>12}{'ready ms':>12}{'1st req ms':>12}{'2nd req ms':>12}{'5th req ms':>12}")
+    for warmup in (False, True):
+        runs = [run_once(warmup) for _ in range(args.runs)]
+        median = lambda values: statistics.median(values) * 1000
+        print(
+            f"{'with warmup' if warmup else 'without warmup':<18}"
+            f"{median([r['import_s'] for r in runs]):>12.1f}"
+            f"{median([r['ready_s'] for r in runs]):>12.1f}"
+            f"{median([r['latencies'][0] for r in runs]):>12.1f}"
+            f"{median([r['latencies'][1] for r in runs]):>12.1f}"
+            f"{median([r['latencies'][4] for r in runs]):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
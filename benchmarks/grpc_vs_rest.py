@@ -0,0 +1,130 @@
+"""
+Latency of REST /predict against gRPC Score and ScoreStream on localhost.
+
+Starts one uvicorn worker with the gRPC service enabled and sends the same
+transaction through each path, one request at a time over a kept-alive connection:
+
+    python benchmarks/grpc_vs_rest.py --requests 2000
+
+Rate limits are raised for the run, so every request is scored. Both paths go
+through score_transaction, so the difference is transport, parsing and encoding.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import grpc
+import httpx
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.rpc import scoring_pb2, scoring_pb2_grpc
+
+warnings.filterwarnings("ignore")
+
+HTTP_PORT = 8010
+GRPC_PORT = 50061
+
+
+def summary(name: str, samples: list, elapsed: float) -> str:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2] * 1000
+    p99 = samples[int(len(samples) * 0.99)] * 1000
+    return f"{name:<16}{p50:>10.2f}{p99:>10.2f}{len(samples) / elapsed:>12.0f}"
+
+
+async def bench_rest(payload: dict, requests: int) -> str:
+    samples = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{HTTP_PORT}", headers={"X-API-Key": settings.API_KEY}) as client:
+        start = time.perf_counter()
+        for i in range(requests):
+            payload["transaction_id"] = f"BENCH-REST-{i}"
+            t0 = time.perf_counter()
+            response = await client.post("/api/v1/predict", json=payload)
+            samples.append(time.perf_counter() - t0)
+            response.raise_for_status()
+        return summary("REST /predict", samples, time.perf_counter() - start)
+
+
+async def bench_grpc(features: list, requests: int) -> list:
+    metadata = (("x-api-key", settings.API_KEY),)
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{GRPC_PORT}") as channel:
+        stub = scoring_pb2_grpc.ScoringStub(channel)
+
+        samples = []
+        start = time.perf_counter()
+        for i in range(requests):
+            t0 = time.perf_counter()
+            await stub.Score(scoring_pb2.ScoreRequest(transaction_id=f"BENCH-GRPC-{i}", features=features), metadata=metadata)
+            samples.append(time.perf_counter() - t0)
+        unary = summary("gRPC Score", samples, time.perf_counter() - start)
+
+        # Ping-pong on one stream: send, wait for the answer, send the next
+        samples = []
+        call = stub.ScoreStream(metadata=metadata)
+        start = time.perf_counter()
+        for i in range(requests):
+            t0 = time.perf_counter()
+            await call.write(scoring_pb2.ScoreRequest(transaction_id=f"BENCH-STREAM-{i}", features=features))
+            await call.read()
+            samples.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        await call.done_writing()
+        return [unary, summary("gRPC ScoreStream", samples, elapsed)]
+
+
+async def main(requests: int):
+    sample = json.loads((ROOT / "sample_transaction.json").read_text())
+    features = [sample["transaction"][name] for name in model_loader.get_feature_names()]
+
+    env = dict(
+        os.environ,
+        GRPC_ENABLED="True",
+        GRPC_PORT=str(GRPC_PORT),
+        RATE_LIMIT_PER_MINUTE=str(10 ** 9),
+        RATE_LIMIT_PER_HOUR=str(10 ** 9),
+        LOG_LEVEL="WARNING",
+        PYTHONWARNINGS="ignore"
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(HTTP_PORT), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        async with httpx.AsyncClient() as client:
+            for _ in range(100):
+                try:
+                    if (await client.get(f"http://127.0.0.1:{HTTP_PORT}/ready")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+
+        # Warm both paths before measuring
+        await bench_rest(dict(sample), 50)
+        await bench_grpc(features, 50)
+
+        rows = [await bench_rest(dict(sample), requests), *await bench_grpc(features, requests)]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{requests} sequential requests")
+    print(f"{'path':<16}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>12}")
+    for row in rows:
+        print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,138 @@
+"""
+Load test of the scoring API with weighted user classes and an SLO report.
+
+Headless against the docker-compose stack (rate limits raised by the override):
+
+    docker-compose -f config/docker-compose.yml -f config/docker-compose.loadtest.yml up -d --build
+    docker-compose -f config/docker-compose.yml -f config/docker-compose.loadtest.yml run --rm locust
+
+or from a checkout against any running API:
+
+    locust -f benchmarks/loadtest/locustfile.py --config benchmarks/loadtest/locust.conf --host http://localhost:8000
+    LOAD_PROFILE=step locust -f benchmarks/loadtest/locustfile.py --config benchmarks/loadtest/locust.conf
+
+When the run ends, p95/p99 per request name, the error rate and throughput are
+checked against benchmarks/loadtest/slo.py; the process exits 1 if any fails
+and the report is written to LOADTEST_REPORT when set.
+"""
+import os
+import random
+import sys
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from locust import HttpUser, between, constant, events, task
+from locust.runners import WorkerRunner
+from benchmarks.loadtest import payloads, slo
+
+API_KEY = os.getenv("LOADTEST_API_KEY", "dev-key-12345")
+API = "/api/v1"
+PAGE_SIZE = int(os.getenv("LOADTEST_PAGE_SIZE", "50"))
+MAX_SKIP = int(os.getenv("LOADTEST_MAX_SKIP", "1000"))
+
+profile = os.getenv("LOAD_PROFILE", "").lower()
+# locust runs a LoadTestShape found in this module, so only import the selected one
+if profile == "step":
+    from benchmarks.loadtest.shapes import StepLoadShape  # noqa: F401
+elif profile == "soak":
+    from benchmarks.loadtest.shapes import SoakLoadShape  # noqa: F401
+elif profile:
+    raise ValueError(f"Unknown LOAD_PROFILE {profile!r}; expected step or soak")
+
+# (prediction_id, prediction) pairs seen while paging, for reviewers to label
+recent_predictions: deque = deque(maxlen=5000)
+
+
+class ApiUser(HttpUser):
+    abstract = True
+
+    def on_start(self):
+        self.client.headers["X-API-Key"] = API_KEY
+
+
+class ScoringUser(ApiUser):
+    """Checkout traffic: one transaction at a time"""
+    weight = 12
+    wait_time = between(0.05, 0.5)
+
+    @task(8)
+    def predict(self):
+        self.client.post(f"{API}/predict", json=payloads.predict_request(), name="predict")
+
+    @task(2)
+    def predict_simple(self):
+        self.client.post(f"{API}/predict/simple", json=payloads.simple_request(), name="predict/simple")
+
+
+class BatchUser(ApiUser):
+    """Back-office systems scoring in batches of each configured size"""
+    weight = 2
+    wait_time = between(0.5, 2.0)
+
+    @task
+    def predict_batch(self):
+        size = random.choice(payloads.batch_sizes())
+        self.client.post(f"{API}/predict/batch", json=payloads.batch_request(size), name=f"predict/batch [{size}]")
+
+
+class ReviewerUser(ApiUser):
+    """Analysts paging through predictions and labeling some of them"""
+    weight = 3
+    wait_time = between(1.0, 3.0)
+
+    @task(3)
+    def page_predictions(self):
+        params = {"skip": random.randrange(0, MAX_SKIP + 1, PAGE_SIZE), "limit": PAGE_SIZE}
+        if random.random() < 0.2:
+            params["fraud_only"] = "true"
+        response = self.client.get(f"{API}/predictions", params=params, name="predictions [page]")
+        if response.status_code == 200:
+            recent_predictions.extend((row["id"], bool(row["prediction"])) for row in response.json())
+
+    @task(1)
+    def submit_feedback(self):
+        if not recent_predictions:
+            return
+        prediction_id, prediction = random.choice(recent_predictions)
+        self.client.post(f"{API}/feedback", json=payloads.feedback_request(prediction_id, prediction), name="feedback")
+
+
+class MonitorUser(ApiUser):
+    """Load balancer and uptime checks"""
+    weight = 1
+    wait_time = constant(2)
+
+    @task
+    def health(self):
+        self.client.get("/health", name="health")
+
+
+@events.quitting.add_listener
+def check_slos(environment, **kwargs):
+    # Workers only hold part of the stats; the master (or a local runner) reports
+    if isinstance(environment.runner, WorkerRunner):
+        return
+
+    def endpoint_stats(entry) -> slo.EndpointStats:
+        return slo.EndpointStats(
+            name=entry.name,
+            requests=entry.num_requests,
+            failures=entry.num_failures,
+            p95_ms=entry.get_response_time_percentile(0.95) or 0.0,
+            p99_ms=entry.get_response_time_percentile(0.99) or 0.0,
+            rps=entry.total_rps
+        )
+
+    stats = environment.stats
+    endpoints = sorted((endpoint_stats(entry) for entry in stats.entries.values()), key=lambda e: e.name)
+    total = stats.total
+    duration = (total.last_request_timestamp or total.start_time) - total.start_time
+    report = slo.evaluate(endpoints, endpoint_stats(total), round(duration, 1))
+
+    print(slo.format_report(report))
+    report_path = os.getenv("LOADTEST_REPORT")
+    if report_path:
+        slo.write_report(report, report_path)
+    environment.process_exit_code = 0 if report["passed"] else 1
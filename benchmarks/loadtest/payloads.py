@@ -0,0 +1,88 @@
+"""
+Request bodies that look like production traffic, standard library only so the
+locustfile runs in the stock locust image.
+
+Feature distributions approximate the training data (the public credit card
+fraud dataset): V1-V28 are PCA components with shrinking spread, Time covers two
+days in seconds, Amount is heavy-tailed with a median around 22, and a small
+share of transactions carry the fraud class's shifted components.
+"""
+import itertools
+import math
+import os
+import random
+import uuid
+from typing import List, Optional
+
+# Approximate standard deviations of V1-V28 over all transactions
+V_STD = [
+    1.96, 1.65, 1.52, 1.42, 1.38, 1.33, 1.24, 1.19, 1.10, 1.09, 1.02, 1.00, 1.00, 0.96,
+    0.92, 0.88, 0.85, 0.84, 0.81, 0.77, 0.73, 0.73, 0.62, 0.61, 0.52, 0.48, 0.40, 0.33
+]
+# Approximate means of V1-V28 over fraudulent transactions
+V_FRAUD_MEAN = [
+    -4.77, 3.62, -7.03, 4.54, -3.15, -1.40, -5.57, 0.57, -2.58, -5.68, 3.80, -6.26, -0.11, -6.97,
+    -0.09, -4.14, -6.67, -2.25, 0.68, 0.37, 0.71, 0.01, -0.04, -0.11, 0.04, 0.05, 0.17, 0.08
+]
+SECONDS_IN_DATASET = 172792
+# Lognormal Amount: median e^mu, mean about 88
+AMOUNT_MU, AMOUNT_SIGMA = math.log(22.0), 1.66
+FRAUD_RATE = float(os.getenv("LOADTEST_FRAUD_RATE", "0.002"))
+TIMES_OF_DAY = ["morning", "afternoon", "evening", "night", None]
+
+# Unique across locust worker processes as well as within one
+_prefix = uuid.uuid4().hex[:8]
+_counter = itertools.count()
+
+
+def transaction_id() -> str:
+    return f"LOAD-{_prefix}-{next(_counter)}"
+
+
+def transaction(rng: random.Random = random, fraud: Optional[bool] = None) -> dict:
+    """One transaction's V1-V28, Time and Amount"""
+    if fraud is None:
+        fraud = rng.random() < FRAUD_RATE
+    features = {
+        f"V{i + 1}": round(rng.gauss(V_FRAUD_MEAN[i] if fraud else 0.0, std), 6)
+        for i, std in enumerate(V_STD)
+    }
+    features["Time"] = float(rng.randrange(SECONDS_IN_DATASET))
+    amount = rng.lognormvariate(AMOUNT_MU - (1.0 if fraud else 0.0), AMOUNT_SIGMA)
+    features["Amount"] = round(min(amount, 25000.0), 2)
+    return features
+
+
+def predict_request(rng: random.Random = random) -> dict:
+    """Body for POST /predict"""
+    return {"transaction_id": transaction_id(), "transaction": transaction(rng)}
+
+
+def simple_request(rng: random.Random = random) -> dict:
+    """Body for POST /predict/simple"""
+    body = {"amount": round(min(rng.lognormvariate(AMOUNT_MU, AMOUNT_SIGMA), 25000.0), 2)}
+    time_of_day = rng.choice(TIMES_OF_DAY)
+    if time_of_day is not None:
+        body["time_of_day"] = time_of_day
+    return {"transaction_id": transaction_id(), "transaction": body}
+
+
+def batch_request(size: int, rng: random.Random = random) -> dict:
+    """Body for POST /predict/batch"""
+    return {"transactions": [predict_request(rng) for _ in range(size)]}
+
+
+def feedback_request(prediction_id: str, prediction: bool, rng: random.Random = random) -> dict:
+    """Body for POST /feedback: reviewers mostly confirm the model, sometimes overturn it"""
+    actual_label = prediction if rng.random() < 0.9 else not prediction
+    return {
+        "prediction_id": prediction_id,
+        "actual_label": actual_label,
+        "feedback_source": "load_test",
+        "notes": None if rng.random() < 0.8 else "reviewed during load test"
+    }
+
+
+def batch_sizes() -> List[int]:
+    """Batch sizes exercised, from LOADTEST_BATCH_SIZES (the endpoint takes at most 100)"""
+    return [int(size) for size in os.getenv("LOADTEST_BATCH_SIZES", "10,50,100").split(",")]
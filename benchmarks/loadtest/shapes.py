@@ -0,0 +1,48 @@
+"""
+Load profiles, selected with LOAD_PROFILE=step|soak. Without one, locust's own
+--users/--spawn-rate/--run-time apply.
+"""
+import os
+from locust import LoadTestShape
+
+
+def _int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+class StepLoadShape(LoadTestShape):
+    """
+    STEP_USERS more users every STEP_SECONDS for STEP_COUNT steps, to find the
+    load where latency objectives start failing.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.step_users = _int("STEP_USERS", 10)
+        self.step_seconds = _int("STEP_SECONDS", 60)
+        self.step_count = _int("STEP_COUNT", 10)
+        self.spawn_rate = float(os.getenv("STEP_SPAWN_RATE", self.step_users))
+
+    def tick(self):
+        step = int(self.get_run_time() // self.step_seconds)
+        if step >= self.step_count:
+            return None
+        return self.step_users * (step + 1), self.spawn_rate
+
+
+class SoakLoadShape(LoadTestShape):
+    """
+    Ramp to SOAK_USERS over SOAK_RAMP_SECONDS and hold for SOAK_SECONDS, to
+    surface leaks, pool exhaustion and slow drifts in latency.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.users = _int("SOAK_USERS", 50)
+        self.ramp_seconds = _int("SOAK_RAMP_SECONDS", 120)
+        self.hold_seconds = _int("SOAK_SECONDS", 3600)
+
+    def tick(self):
+        if self.get_run_time() >= self.ramp_seconds + self.hold_seconds:
+            return None
+        return self.users, max(self.users / max(self.ramp_seconds, 1), 0.1)
@@ -0,0 +1,117 @@
+"""
+Service level objectives checked at the end of a load test run.
+
+Latency targets apply per request name; names not listed use DEFAULT. Every
+target can be overridden from the environment, e.g. SLO_PREDICT_BATCH_10_P99_MS=250 for
+"predict/batch [10]", SLO_DEFAULT_P95_MS, SLO_MAX_ERROR_RATE, SLO_MIN_RPS.
+"""
+import json
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+
+class LatencyTarget(NamedTuple):
+    p95_ms: float
+    p99_ms: float
+
+
+# Keyed by the request names used in the locustfile
+TARGETS: Dict[str, LatencyTarget] = {
+    "predict": LatencyTarget(50, 100),
+    "predict/simple": LatencyTarget(50, 100),
+    "predict/batch [10]": LatencyTarget(150, 300),
+    "predict/batch [50]": LatencyTarget(400, 800),
+    "predict/batch [100]": LatencyTarget(800, 1500),
+    "predictions [page]": LatencyTarget(100, 250),
+    "feedback": LatencyTarget(100, 250),
+    "health": LatencyTarget(20, 50),
+}
+DEFAULT = LatencyTarget(200, 500)
+MAX_ERROR_RATE = 0.01
+MIN_RPS = 0.0
+
+
+class EndpointStats(NamedTuple):
+    name: str
+    requests: int
+    failures: int
+    p95_ms: float
+    p99_ms: float
+    rps: float
+
+
+def _env(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _env_key(name: str) -> str:
+    return re.sub(r"[^A-Z0-9]+", "_", name.upper()).strip("_")
+
+
+def target(name: str) -> LatencyTarget:
+    base = TARGETS.get(name) or LatencyTarget(
+        _env("SLO_DEFAULT_P95_MS", DEFAULT.p95_ms), _env("SLO_DEFAULT_P99_MS", DEFAULT.p99_ms)
+    )
+    key = _env_key(name)
+    return LatencyTarget(_env(f"SLO_{key}_P95_MS", base.p95_ms), _env(f"SLO_{key}_P99_MS", base.p99_ms))
+
+
+def evaluate(endpoints: List[EndpointStats], total: EndpointStats, duration_s: Optional[float] = None) -> dict:
+    """Pass/fail of every objective; the run passes only if all do"""
+    checks = []
+
+    def check(scope: str, metric: str, actual: float, limit: float, upper: bool = True):
+        checks.append({
+            "scope": scope,
+            "metric": metric,
+            "actual": round(actual, 4),
+            "target": limit,
+            "passed": actual <= limit if upper else actual >= limit
+        })
+
+    for stats in endpoints:
+        if not stats.requests:
+            continue
+        latency = target(stats.name)
+        check(stats.name, "p95_ms", stats.p95_ms, latency.p95_ms)
+        check(stats.name, "p99_ms", stats.p99_ms, latency.p99_ms)
+
+    error_rate = total.failures / total.requests if total.requests else 1.0
+    check("total", "error_rate", error_rate, _env("SLO_MAX_ERROR_RATE", MAX_ERROR_RATE))
+    check("total", "rps", total.rps, _env("SLO_MIN_RPS", MIN_RPS), upper=False)
+
+    return {
+        "passed": bool(total.requests) and all(c["passed"] for c in checks),
+        "duration_s": duration_s,
+        "requests": total.requests,
+        "failures": total.failures,
+        "error_rate": round(error_rate, 6),
+        "rps": round(total.rps, 2),
+        "endpoints": [stats._asdict() for stats in endpoints],
+        "checks": checks
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"SLO report: {'PASS' if report['passed'] else 'FAIL'}",
+        f"{report['requests']} requests, {report['failures']} failed ({report['error_rate']:.2%}), {report['rps']:.1f} req/s",
+        "",
+        f"{'endpoint':<24}{'requests':>10}{'failures':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}",
+    ]
+    for stats in report["endpoints"]:
+        lines.append(
+            f"{stats['name']:<24}{stats['requests']:>10}{stats['failures']:>10}"
+            f"{stats['p95_ms']:>10.0f}{stats['p99_ms']:>10.0f}{stats['rps']:>10.1f}"
+        )
+    failed = [c for c in report["checks"] if not c["passed"]]
+    if failed:
+        lines += ["", "Failed objectives:"]
+        lines += [f"  {c['scope']} {c['metric']}: {c['actual']} (target {c['target']})" for c in failed]
+    return "\n".join(lines)
+
+
+def write_report(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,72 @@
+"""
+Throughput of `python -m src.cli score` by worker count.
+
+Writes a synthetic CSV shaped like the credit-card dataset and scores it with 1,
+2, 4, ... workers up to the CPU count, each run in a fresh process:
+
+    python benchmarks/offline_scoring.py --rows 284807 --chunk-size 50000
+
+Speedup is relative to one worker scoring in-process. Peak RSS shows memory
+staying bounded by chunk size rather than file size.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+from src.core.model_loader import DEFAULT_FEATURE_NAMES
+
+
+def write_dataset(path: Path, rows: int):
+    rng = np.random.default_rng(0)
+    with open(path, "w") as f:
+        f.write(",".join([*DEFAULT_FEATURE_NAMES, "Class"]) + "\n")
+        for start in range(0, rows, 100000):
+            n = min(100000, rows - start)
+            features = rng.standard_normal((n, len(DEFAULT_FEATURE_NAMES)))
+            features[:, -2] = rng.uniform(0, 172792, n)
+            features[:, -1] = np.abs(features[:, -1]) * 100
+            np.savetxt(f, np.column_stack([features, np.zeros(n)]), delimiter=",", fmt="%.6f")
+
+
+def run(dataset: Path, output: Path, workers: int, chunk_size: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "src.cli", "score", str(dataset), str(output),
+         "--workers", str(workers), "--chunk-size", str(chunk_size)],
+        cwd=ROOT, capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONWARNINGS="ignore")
+    )
+    rate = float(re.search(r"([\d.]+) rows/s", result.stdout).group(1))
+    rss = [float(value) for value in re.findall(r"(\d+) MB", result.stdout)]
+    return {"rate": rate, "rss": max(rss)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=284807)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = Path(tmp) / "transactions.csv"
+        write_dataset(dataset, args.rows)
+        results = {workers: run(dataset, Path(tmp) / "scores.parquet", workers, args.chunk_size) for workers in counts}
+
+    print(f"{args.rows} rows, chunks of {args.chunk_size}, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8}{'rows/s':>12}{'speedup':>10}{'peak RSS MB':>14}")
+    for workers, result in results.items():
+        print(f"{workers:>8}{result['rate']:>12.0f}{result['rate'] / results[1]['rate']:>10.2f}{result['rss']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Rate limiter overhead: Redis round trips and latency per check.
+
+Compares the previous INCR/EXPIRE sequence (re-implemented here for reference)
+with the single GCRA script call used by RateLimiter and the leased tokens
+used by HybridRateLimiter:
+
+    python benchmarks/rate_limiter.py --iterations 2000
+
+Runs against REDIS_HOST/REDIS_PORT; pass --fake to use an in-process fakeredis
+server, which shows round-trip counts but not network latency.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import redis.asyncio as redis
+from src.core.config import settings
+from src.core.cache import cache
+from src.core.rate_limiter import RateLimiter, HybridRateLimiter
+
+
+class CountingRedis:
+    """Proxy that counts commands sent to the server"""
+
+    def __init__(self, client):
+        self.client = client
+        self.round_trips = 0
+        original = client.execute_command
+
+        async def execute_command(*args, **kwargs):
+            self.round_trips += 1
+            return await original(*args, **kwargs)
+
+        client.execute_command = execute_command
+
+
+async def legacy_check(client, api_key: str, endpoint: str):
+    current_time = int(time.time())
+    minute_key = f"bench:legacy:{api_key}:{endpoint}:minute:{current_time // 60}"
+    hour_key = f"bench:legacy:{api_key}:{endpoint}:hour:{current_time // 3600}"
+    if await client.incrby(minute_key, 1) == 1:
+        await client.expire(minute_key, 60)
+    if await client.incrby(hour_key, 1) == 1:
+        await client.expire(hour_key, 3600)
+
+
+async def measure(name, check, counter, iterations):
+    counter.round_trips = 0
+    latencies = []
+    for i in range(iterations):
+        # A new endpoint every 10 calls so the first-hit EXPIREs are exercised
+        endpoint = f"/bench/{i // 10}"
+        start = time.perf_counter()
+        await check(endpoint)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    print(
+        f"{name:<10}{counter.round_trips / iterations:>14.2f}"
+        f"{statistics.median(latencies):>12.1f}{latencies[int(len(latencies) * 0.99)]:>12.1f}"
+    )
+
+
+async def main(iterations: int, fake: bool):
+    if fake:
+        import fakeredis
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    else:
+        client = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=settings.REDIS_DB, decode_responses=True)
+        await client.ping()
+
+    counter = CountingRedis(client)
+    cache.redis_client = client
+    cache.redis_available = True
+    limiter = RateLimiter(requests_per_minute=10**9, requests_per_hour=10**9)
+    hybrid = HybridRateLimiter(requests_per_minute=10**9, requests_per_hour=10**9, lease_size=settings.RATE_LIMIT_LEASE_SIZE)
+
+    # Load the script before timing
+    await limiter.check_rate_limit("bench", "/warmup")
+
+    print(f"{'limiter':<10}{'RTT/check':>14}{'p50 us':>12}{'p99 us':>12}")
+    await measure("legacy", lambda endpoint: legacy_check(client, "bench", endpoint), counter, iterations)
+    await measure("gcra", lambda endpoint: limiter.check_rate_limit("bench", endpoint), counter, iterations)
+    # One endpoint for the hybrid limiter: leases pay off on a key's steady traffic
+    await measure("hybrid", lambda endpoint: hybrid.check_rate_limit("bench", "/bench/hybrid"), counter, iterations)
+    await hybrid.stop()
+
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--fake", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.fake))
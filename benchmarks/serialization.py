@@ -0,0 +1,170 @@
+"""
+Serialization share of /predict/batch request time, before and after the fast path.
+
+Times the stages of a batch request in-process, without HTTP or the database:
+
+    python benchmarks/serialization.py --batch-size 100 --iterations 50
+
+"before" is the previous path:
+- json.loads and model validation of the body;
+- PredictionResponse and BatchPredictionResponse models;
+- FastAPI's response_model validation and JSONResponse encoding.
+
+"after" is what the prediction endpoints do now:
+- ValidatedBody (TypeAdapter.validate_json);
+- plain dicts from prediction_payload;
+- ORJSONResponse.
+
+Scoring is the same in both and is timed once.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from src.api.schemas import BatchPredictionRequest, BatchPredictionResponse, PredictionResponse
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.core.scoring import prediction_payload
+from src.main import batch_predict_body
+
+warnings.filterwarnings("ignore")
+
+RESPONSE_FIELD = create_model_field("Response_predict_batch", BatchPredictionResponse, mode="serialization")
+
+
+class FakeRequest:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def body(self) -> bytes:
+        return self._body
+
+
+def score(request: BatchPredictionRequest) -> list:
+    scaler = model_loader.get_scaler()
+    results = []
+    for txn in request.transactions:
+        values = txn.transaction.model_dump()
+        scaled = scaler.transform([[values["Time"]], [values["Amount"]]])
+        features = np.array([[values[f"V{i}"] for i in range(1, 29)] + [scaled[0][0], scaled[1][0]]])
+        # One row at a time, as the endpoint scores them
+        predictions, fraud_probabilities, risk_levels, anomaly_scores = model_loader.predict_batch(features)
+        results.append((
+            txn.transaction_id,
+            int(predictions[0]),
+            float(fraud_probabilities[0]),
+            str(risk_levels[0]),
+            anomaly_scores[0]
+        ))
+    return results
+
+
+async def parse_before(body: bytes) -> BatchPredictionRequest:
+    return BatchPredictionRequest.model_validate(json.loads(body))
+
+
+async def parse_after(body: bytes) -> BatchPredictionRequest:
+    return await batch_predict_body(FakeRequest(body))
+
+
+async def respond_before(scores: list) -> bytes:
+    threshold = model_loader.get_threshold()
+    predictions = [
+        PredictionResponse(
+            transaction_id=transaction_id,
+            prediction=prediction,
+            fraud_probability=round(fraud_probability, 4),
+            risk_level=risk_level,
+            anomaly_score=round(float(anomaly_score), 4),
+            threshold=round(threshold, 4),
+            timestamp=datetime.now(),
+            model_version=settings.APP_VERSION
+        )
+        for transaction_id, prediction, fraud_probability, risk_level, anomaly_score in scores
+    ]
+    response = BatchPredictionResponse(
+        predictions=predictions,
+        total_processed=len(predictions),
+        fraud_detected=sum(p.prediction for p in predictions),
+        processing_time_ms=1.0
+    )
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+    return JSONResponse(content).body
+
+
+async def respond_after(scores: list) -> bytes:
+    threshold = model_loader.get_threshold()
+    timestamp = datetime.now()
+    predictions = [
+        prediction_payload(transaction_id, prediction, fraud_probability, risk_level, anomaly_score, threshold, timestamp)
+        for transaction_id, prediction, fraud_probability, risk_level, anomaly_score in scores
+    ]
+    return ORJSONResponse({
+        "predictions": predictions,
+        "total_processed": len(predictions),
+        "fraud_detected": sum(p["prediction"] for p in predictions),
+        "processing_time_ms": 1.0
+    }).body
+
+
+async def timed(func, arg, iterations: int) -> float:
+    """Median microseconds per call"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func(arg)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+async def main(batch_size: int, iterations: int):
+    sample = json.loads((ROOT / "sample_transaction.json").read_text())
+    body = json.dumps({
+        "transactions": [
+            {"transaction_id": f"BENCH-{i}", "transaction": sample["transaction"]}
+            for i in range(batch_size)
+        ]
+    }).encode()
+
+    request = await parse_after(body)
+    scores = score(request)
+    assert json.loads(await respond_before(scores))["predictions"][0]["risk_level"] == \
+        json.loads(await respond_after(scores))["predictions"][0]["risk_level"]
+
+    start = time.perf_counter()
+    for _ in range(max(1, iterations // 10)):
+        score(request)
+    score_us = (time.perf_counter() - start) * 1e6 / max(1, iterations // 10)
+
+    rows = []
+    for name, parse, respond in (("before", parse_before, respond_before), ("after", parse_after, respond_after)):
+        parse_us = await timed(parse, body, iterations)
+        respond_us = await timed(respond, scores, iterations)
+        total = parse_us + score_us + respond_us
+        rows.append((name, parse_us, respond_us, (parse_us + respond_us) / total * 100))
+
+    print(f"batch of {batch_size}, scoring {score_us / 1000:.1f} ms")
+    print(f"{'path':<10}{'parse us':>12}{'respond us':>12}{'serialization %':>18}")
+    for name, parse_us, respond_us, share in rows:
+        print(f"{name:<10}{parse_us:>12.0f}{respond_us:>12.0f}{share:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.iterations))
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Dict, Literal
 from datetime import datetime
 from uuid import UUID
 
@@ -9,6 +9,30 @@ class FeedbackCreate(BaseModel):
     feedback_source: str = Field(..., max_length=50)
     notes: Optional[str] = None
 
+class BulkFeedbackRow(BaseModel):
+    """One line of a bulk feedback file, keyed by prediction id or transaction id"""
+    prediction_id: Optional[UUID] = None
+    transaction_id: Optional[str] = None
+    actual_label: bool
+    feedback_source: str = Field(..., max_length=50)
+    notes: Optional[str] = None
+    
+    @model_validator(mode="after")
+    def require_identifier(self):
+        if self.prediction_id is None and not self.transaction_id:
+            raise ValueError("prediction_id or transaction_id is required")
+        return self
+
+class BulkFeedbackError(BaseModel):
+    row: int
+    error: str
+
+class BulkFeedbackResponse(BaseModel):
+    total_rows: int
+    inserted: int
+    failed: int
+    errors: List[BulkFeedbackError]
+
 class FeedbackResponse(BaseModel):
     id: UUID
     prediction_id: UUID
@@ -35,3 +59,119 @@ class PredictionDetail(BaseModel):
     class Config:
         from_attributes = True
         protected_namespaces = ()  # Disable Pydantic protected namespace warning
+
+class StatsBucket(BaseModel):
+    bucket_start: datetime
+    model_version: str
+    total_count: int
+    fraud_count: int
+    fraud_rate: float
+    low_count: int
+    medium_count: int
+    high_count: int
+    avg_fraud_probability: float
+    avg_anomaly_score: float
+    
+    class Config:
+        protected_namespaces = ()
+
+class StatsResponse(BaseModel):
+    interval: str
+    start: datetime
+    end: datetime
+    buckets: List[StatsBucket]
+
+class UsageBucket(BaseModel):
+    bucket_start: datetime
+    endpoint: str
+    method: str
+    request_count: int
+    status_2xx: int
+    status_3xx: int
+    status_4xx: int
+    status_5xx: int
+    avg_latency_ms: float
+    max_latency_ms: float
+    latency_histogram: Dict[str, int]
+
+class UsageResponse(BaseModel):
+    interval: str
+    start: datetime
+    end: datetime
+    buckets: List[UsageBucket]
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    format: str
+    output: str
+    total_rows: int
+    total_chunks: int
+    chunk_size: int
+    completed_chunks: int
+    progress: float
+    processed_rows: int
+    invalid_rows: int
+    fraud_detected: int
+    inserted_rows: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+class DriftStats(BaseModel):
+    count: int
+    psi: Optional[float]
+    ks: Optional[float]
+    status: str
+
+class DriftResponse(BaseModel):
+    window_hours: int
+    scope: str
+    features: Dict[str, DriftStats]
+
+class ThresholdPoint(BaseModel):
+    threshold: float
+    flagged: int
+    true_positives: int
+    false_positives: int
+    precision: float
+    recall: float
+    f1_score: float
+    false_positive_rate: float
+    alert_rate: float
+
+class ThresholdTarget(BaseModel):
+    """Constraints on the operating point; the objective is maximized among points meeting all of them"""
+    objective: Literal["f1", "recall", "precision"] = "f1"
+    min_precision: Optional[float] = Field(None, ge=0, le=1)
+    min_recall: Optional[float] = Field(None, ge=0, le=1)
+    max_alert_rate: Optional[float] = Field(None, ge=0, le=1)
+
+class ThresholdAnalysisResponse(BaseModel):
+    model_version: str
+    labeled_rows: int
+    fraud_rows: int
+    current: Optional[ThresholdPoint]
+    best_f1: ThresholdPoint
+    target: Optional[ThresholdPoint]
+    curve: List[ThresholdPoint]
+    
+    class Config:
+        protected_namespaces = ()
+
+class ThresholdVersionCreate(ThresholdTarget):
+    version: str = Field(..., max_length=50)
+    since: Optional[datetime] = None
+    activate: bool = False
+
+class ModelVersionResponse(BaseModel):
+    id: UUID
+    version: str
+    threshold: float
+    metrics: dict
+    deployed_at: datetime
+    is_active: bool
+    
+    class Config:
+        from_attributes = True
@@ -133,6 +133,12 @@ class HealthResponse(BaseModel):
         protected_namespaces = ()
 
 
+class ReadinessResponse(BaseModel):
+    status: str = Field(..., description="ready or starting")
+    checks: dict = Field(default_factory=dict, description="Warmup result per dependency")
+    warmup_duration_ms: Optional[float] = None
+
+
 # Simplified Schema for User-Friendly Input
 class SimpleTransactionInput(BaseModel):
     """
@@ -0,0 +1,460 @@
+import asyncio
+import gc
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import click
+import numpy as np
+from src.core import columnar
+from src.core.model_loader import model_loader
+
+INPUT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+OUTPUT_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+
+def _read_tables(path: Path, kind: str, columns: List[str], chunk_size: int, id_column: Optional[str]) -> Iterator:
+    """The input as pyarrow tables of chunk_size rows, read incrementally"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    if kind == "parquet":
+        for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=chunk_size, columns=columns):
+            yield pa.Table.from_batches([batch])
+        return
+
+    reader = pa_csv.open_csv(
+        str(path),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={id_column: pa.string()} if id_column else None
+        )
+    )
+    # CSV blocks are sized in bytes; regroup them into chunk_size rows
+    pending = None
+    for batch in reader:
+        table = pa.Table.from_batches([batch])
+        pending = table if pending is None else pa.concat_tables([pending, table])
+        while pending.num_rows >= chunk_size:
+            yield pending.slice(0, chunk_size)
+            pending = pending.slice(chunk_size)
+    if pending is not None and pending.num_rows:
+        yield pending
+
+
+def _to_batch(table, feature_names: List[str], id_column: Optional[str], offset: int) -> columnar.ColumnarBatch:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    features = np.empty((table.num_rows, len(feature_names)), dtype=np.float64)
+    for i, name in enumerate(feature_names):
+        # Nulls come through as NaN and the row is skipped as invalid
+        features[:, i] = pc.cast(table.column(name), pa.float64()).to_numpy()
+    if id_column:
+        transaction_ids = np.asarray(pc.cast(table.column(id_column), pa.string()).to_numpy(zero_copy_only=False), dtype=str)
+    else:
+        # Without an id column, rows are identified by their position in the input
+        transaction_ids = np.arange(offset, offset + table.num_rows).astype(str)
+    return columnar.ColumnarBatch(transaction_ids, features)
+
+
+def _score_chunk(batch: columnar.ColumnarBatch) -> Tuple[np.ndarray, Optional[dict], int]:
+    """Runs in the worker processes: (ids of scored rows, results, invalid row count)"""
+    feature_names = model_loader.get_feature_names()
+    invalid = columnar.invalid_mask(batch, feature_names)
+    valid = columnar.ColumnarBatch(batch.transaction_ids[~invalid], batch.features[~invalid])
+    results = columnar.score(valid, feature_names) if len(valid.transaction_ids) else None
+    return valid.transaction_ids, results, int(invalid.sum())
+
+
+class _OutputWriter:
+    """Appends result chunks to a Parquet file or an Arrow IPC file (memory-mappable)"""
+
+    def __init__(self, path: Path, kind: str):
+        self.path = path
+        self.kind = kind
+        self._sink = None
+        self._writer = None
+
+    def write(self, transaction_ids: np.ndarray, results: dict):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({"transaction_id": transaction_ids, **results})
+        if self._writer is None:
+            if self.kind == "parquet":
+                self._writer = pq.ParquetWriter(str(self.path), table.schema)
+            else:
+                self._sink = pa.OSFile(str(self.path), "wb")
+                self._writer = pa.ipc.new_file(self._sink, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._sink is not None:
+            self._sink.close()
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def score_file(input_path: Path, output_path: Path, workers: int, chunk_size: int, id_column: Optional[str] = None) -> dict:
+    """
+    Score a CSV or Parquet file chunk by chunk across a process pool.
+
+    Workers are forked after the model is loaded, so they share its memory instead
+    of each unpickling a copy. At most two chunks per worker are in flight, which
+    bounds memory by chunk_size rather than by the file.
+    """
+    model_loader.load()
+    feature_names = model_loader.get_feature_names()
+    columns = [*feature_names, id_column] if id_column else feature_names
+    kind = INPUT_FORMATS[input_path.suffix.lower()]
+    writer = _OutputWriter(output_path, OUTPUT_FORMATS[output_path.suffix.lower()])
+    stats = {"rows": 0, "scored": 0, "invalid": 0, "fraud_detected": 0}
+
+    def collect(result):
+        transaction_ids, results, invalid = result
+        stats["invalid"] += invalid
+        if results is not None:
+            stats["scored"] += len(transaction_ids)
+            stats["fraud_detected"] += int(results["prediction"].sum())
+            writer.write(transaction_ids, results)
+
+    pool = None
+    if workers > 1:
+        # Keep the model out of the workers' garbage collections, which would
+        # otherwise touch and copy its pages
+        gc.freeze()
+        methods = multiprocessing.get_all_start_methods()
+        pool = multiprocessing.get_context("fork" if "fork" in methods else "spawn").Pool(
+            workers, initializer=model_loader.load
+        )
+        # The forked workers keep their frozen copy; this process doesn't need it
+        gc.unfreeze()
+
+    start = time.perf_counter()
+    in_flight = deque()
+    try:
+        for table in _read_tables(input_path, kind, columns, chunk_size, id_column):
+            batch = _to_batch(table, feature_names, id_column, stats["rows"])
+            stats["rows"] += table.num_rows
+            if pool is None:
+                collect(_score_chunk(batch))
+                continue
+            # Results are written in input order
+            in_flight.append(pool.apply_async(_score_chunk, (batch,)))
+            while len(in_flight) > 2 * workers:
+                collect(in_flight.popleft().get())
+        while in_flight:
+            collect(in_flight.popleft().get())
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF)
+    stats["worker_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN) if pool is not None else None
+    return stats
+
+
+@click.group()
+def cli():
+    """Fraud detection command line tools"""
+
+
+@cli.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("output_path", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default=True,
+              help="Scoring processes; 1 scores in this process")
+@click.option("--chunk-size", type=click.IntRange(min=1), default=50000, show_default=True,
+              help="Rows per chunk; memory grows with chunk size times workers")
+@click.option("--id-column", default=None, help="Column to copy to transaction_id (default: row number)")
+def score(input_path: Path, output_path: Path, workers: int, chunk_size: int, id_column: Optional[str]):
+    """Score INPUT_PATH (CSV or Parquet) into OUTPUT_PATH (.parquet, or .arrow for a memory-mappable file).
+
+    The input needs one column per name in the model metadata's feature_names.
+    Output columns: transaction_id, prediction, fraud_probability, risk_level,
+    anomaly_score. Rows with missing, non-finite or negative-Amount values are
+    skipped and counted.
+    """
+    if input_path.suffix.lower() not in INPUT_FORMATS:
+        raise click.BadParameter(f"expected one of {', '.join(INPUT_FORMATS)}", param_hint="INPUT_PATH")
+    if output_path.suffix.lower() not in OUTPUT_FORMATS:
+        raise click.BadParameter(f"expected one of {', '.join(OUTPUT_FORMATS)}", param_hint="OUTPUT_PATH")
+
+    stats = score_file(input_path, output_path, workers, chunk_size, id_column)
+
+    click.echo(
+        f"Scored {stats['scored']} of {stats['rows']} rows ({stats['invalid']} invalid, "
+        f"{stats['fraud_detected']} flagged) in {stats['seconds']:.1f} s: {stats['rows_per_second']:.0f} rows/s"
+    )
+    peak = f"Peak RSS: {stats['peak_rss_mb']:.0f} MB"
+    if stats["worker_peak_rss_mb"] is not None:
+        peak += f", largest worker {stats['worker_peak_rss_mb']:.0f} MB"
+    click.echo(peak)
+
+
+@cli.command("drift-reference")
+@click.argument("training_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), default=None,
+              help="Where the reference is written (default: DRIFT_REFERENCE_PATH)")
+@click.option("--max-rows", type=click.IntRange(min=1), default=200000, show_default=True,
+              help="Rows sampled uniformly from the file")
+@click.option("--bins", type=click.IntRange(min=2), default=None, help="Bins per feature (default: DRIFT_BINS)")
+def drift_reference(training_path: Path, output: Optional[Path], max_rows: int, bins: Optional[int]):
+    """Build the drift reference for the serving model from its training data (CSV or Parquet).
+
+    Bin edges are the sample's quantiles of each feature and of the model's
+    anomaly score. Restart the API to load a new reference.
+    """
+    import json
+    from src.core import drift
+    from src.core.config import settings
+    from src.core.retraining import Reservoir, scale
+
+    if training_path.suffix.lower() not in INPUT_FORMATS:
+        raise click.BadParameter(f"expected one of {', '.join(INPUT_FORMATS)}", param_hint="TRAINING_PATH")
+
+    model_loader.load()
+    feature_names = model_loader.get_feature_names()
+    sample = Reservoir(max_rows, len(feature_names))
+    for table in _read_tables(training_path, INPUT_FORMATS[training_path.suffix.lower()], feature_names, 50000, None):
+        features = _to_batch(table, feature_names, None, 0).features
+        sample.add(features[np.isfinite(features).all(axis=1)])
+
+    features, _ = sample.data()
+    if not len(features):
+        raise click.ClickException("No complete rows in the training file")
+    scores = model_loader.get_model().decision_function(scale(features, model_loader.get_scaler(), feature_names))
+    reference = drift.build_reference(features, scores, feature_names, bins or settings.DRIFT_BINS)
+
+    output = output or Path(settings.DRIFT_REFERENCE_PATH)
+    output.write_text(json.dumps(reference))
+    click.echo(f"Wrote the reference for {len(features)} of {sample.seen} rows to {output}")
+
+
+async def _labeled_sample(feature_names: List[str], max_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    from src.core.retraining import collect_labeled_sample
+    from src.db.database import AsyncSessionLocal, async_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            return await collect_labeled_sample(db, feature_names, max_rows)
+    finally:
+        await async_engine.dispose()
+
+
+async def _register_version(version: str, threshold: float, metrics: dict, activate: bool):
+    from src.db import crud
+    from src.db.database import AsyncSessionLocal, async_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud.create_model_version(db, version=version, threshold=threshold, metrics=metrics, is_active=activate)
+    finally:
+        await async_engine.dispose()
+
+
+@cli.command()
+@click.argument("data_path", required=False, type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--label-column", default=None, help="0/1 fraud column in DATA_PATH, to also hold ROC-AUC and PR-AUC")
+@click.option("--max-rows", type=click.IntRange(min=1), default=100000, show_default=True,
+              help="Held-out rows sampled uniformly")
+@click.option("--auc-tolerance", type=click.FloatRange(min=0), default=None,
+              help="Largest ROC-AUC / PR-AUC loss allowed (default: PRUNE_AUC_TOLERANCE)")
+@click.option("--min-agreement", type=click.FloatRange(0, 1), default=None,
+              help="Smallest share of verdicts that must match the full forest (default: PRUNE_MIN_AGREEMENT)")
+@click.option("--output-dir", type=click.Path(file_okay=False, path_type=Path), default=None,
+              help="Where the version's artifacts are written (default: RETRAIN_OUTPUT_DIR)")
+@click.option("--register/--no-register", default=True, show_default=True, help="Record the version in model_versions")
+@click.option("--activate", is_flag=True, help="Mark the new version active in model_versions")
+def prune(
+    data_path: Optional[Path],
+    label_column: Optional[str],
+    max_rows: int,
+    auc_tolerance: Optional[float],
+    min_agreement: Optional[float],
+    output_dir: Optional[Path],
+    register: bool,
+    activate: bool
+):
+    """Write a version of the serving forest with fewer trees at equal accuracy.
+
+    Trees are added greedily, each time the one that keeps the subset's scores
+    closest to the full forest's, and every tenth size is checked on held-out
+    rows: DATA_PATH (CSV or Parquet), or labeled feedback from the database when
+    omitted. The smallest size within tolerance is written with a recalibrated
+    threshold. The report shows each size's accuracy and scoring latency.
+    """
+    from src.core import pruning
+    from src.core.config import settings
+    from src.core.retraining import Reservoir, scale
+
+    model_loader.load()
+    feature_names = model_loader.get_feature_names()
+    if data_path is None:
+        features, labels = asyncio.run(_labeled_sample(feature_names, max_rows))
+    else:
+        if data_path.suffix.lower() not in INPUT_FORMATS:
+            raise click.BadParameter(f"expected one of {', '.join(INPUT_FORMATS)}", param_hint="DATA_PATH")
+        columns = [*feature_names, label_column] if label_column else feature_names
+        sample = Reservoir(max_rows, len(columns))
+        for table in _read_tables(data_path, INPUT_FORMATS[data_path.suffix.lower()], columns, 50000, None):
+            rows = _to_batch(table, columns, None, 0).features
+            sample.add(rows[np.isfinite(rows).all(axis=1)])
+        rows, _ = sample.data()
+        features = rows[:, :len(feature_names)]
+        labels = rows[:, -1].astype(np.int8) if label_column else None
+    if not len(features):
+        raise click.ClickException("No held-out rows to evaluate on")
+
+    try:
+        order, reports = pruning.size_report(
+            model_loader.get_model(),
+            scale(features, model_loader.get_scaler(), feature_names),
+            model_loader.get_threshold(),
+            labels,
+            auc_tolerance=settings.PRUNE_AUC_TOLERANCE if auc_tolerance is None else auc_tolerance,
+            min_agreement=settings.PRUNE_MIN_AGREEMENT if min_agreement is None else min_agreement
+        )
+    except pruning.PruningError as e:
+        raise click.ClickException(str(e))
+
+    full = reports[-1]
+    click.echo(f"{'trees':>5} {'agreement':>9} {'roc_auc':>8} {'pr_auc':>8} {'1 row ms':>9} {'batch us/row':>12} {'saved':>6}  ok")
+    for report in reports:
+        click.echo(
+            f"{report.n_estimators:>5} {report.agreement:>9.4f} "
+            f"{'-' if report.roc_auc is None else f'{report.roc_auc:.4f}':>8} "
+            f"{'-' if report.pr_auc is None else f'{report.pr_auc:.4f}':>8} "
+            f"{report.latency_single_ms:>9.3f} {report.latency_batch_us:>12.2f} "
+            f"{1 - report.latency_batch_us / full.latency_batch_us:>6.0%}  {'yes' if report.within_tolerance else 'no'}"
+        )
+
+    chosen = pruning.smallest_within_tolerance(reports)
+    if chosen.n_estimators == full.n_estimators:
+        click.echo("No smaller forest is within tolerance; nothing written")
+        return
+
+    version = f"pruned{chosen.n_estimators}-{datetime.utcnow():%Y%m%d%H%M%S}"
+    directory = (output_dir or Path(settings.RETRAIN_OUTPUT_DIR)) / version
+    pruned = pruning.prune(model_loader.get_model(), order[:chosen.n_estimators])
+    metadata = pruning.write_version(
+        directory, pruned, chosen, full, model_loader.get_metadata(), model_loader.get_scaler(), len(features)
+    )
+    if register:
+        asyncio.run(_register_version(
+            version, chosen.threshold, {**metadata["test_metrics"], "pruned_from": metadata["pruned_from"]}, activate
+        ))
+    click.echo(
+        f"Wrote {version} ({chosen.n_estimators} of {full.n_estimators} trees, threshold {chosen.threshold:.4f}) "
+        f"to {directory}" + (" and registered it" if register else "")
+    )
+
+
+async def _retrain(**options) -> dict:
+    from src.core.retraining import retrain as run_retraining
+    from src.db.database import AsyncSessionLocal, async_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            return await run_retraining(db, **options)
+    finally:
+        await async_engine.dispose()
+
+
+@cli.command()
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default=True,
+              help="Processes fitting candidate models; 1 fits in this process")
+@click.option("--output-dir", type=click.Path(file_okay=False, path_type=Path), default=None,
+              help="Where the version's artifacts are written (default: RETRAIN_OUTPUT_DIR)")
+@click.option("--since", type=click.DateTime(), default=None, help="Only train on predictions made after this time")
+@click.option("--activate", is_flag=True, help="Mark the new version active in model_versions")
+def retrain(workers: int, output_dir: Optional[Path], since: Optional[datetime], activate: bool):
+    """Fit candidate models on stored predictions and register the best one.
+
+    Candidates are fit on a bounded sample of predictions without feedback and
+    ranked by PR-AUC on predictions with feedback. The winner's model, scaler
+    and metadata are written in the serving format under a new version directory.
+    """
+    from src.core.config import settings
+    from src.core.retraining import RetrainingError
+
+    model_loader.load()
+    try:
+        result = asyncio.run(_retrain(
+            output_dir=output_dir or Path(settings.RETRAIN_OUTPUT_DIR),
+            workers=workers,
+            since=since,
+            activate=activate
+        ))
+    except RetrainingError as e:
+        raise click.ClickException(str(e))
+
+    for candidate in result["candidates"]:
+        click.echo(
+            f"{candidate['params']}: PR-AUC {candidate['pr_auc']:.4f}, F1 {candidate['f1_score']:.4f}, "
+            f"ROC-AUC {candidate['roc_auc']:.4f}"
+        )
+    serving = result["serving_metrics"]
+    click.echo(f"Serving model: PR-AUC {serving['pr_auc']:.4f}, F1 {serving['f1_score']:.4f}")
+    click.echo(
+        f"Registered {result['version']} (threshold {result['threshold']:.4f}, "
+        f"PR-AUC {result['metrics']['pr_auc']:.4f}) in {result['directory']}"
+    )
+
+
+
+async def _backfill_stats(start: datetime, end: datetime) -> int:
+    from src.db import crud
+    from src.db.database import AsyncSessionLocal, async_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            return await crud.rebuild_prediction_stats(db, start, end)
+    finally:
+        await async_engine.dispose()
+
+
+@cli.command("backfill-stats")
+@click.option("--since", type=click.DateTime(), required=True, help="Start of the range to rebuild (UTC)")
+@click.option("--until", type=click.DateTime(), default=None,
+              help="End of the range (UTC; default: the latest minute every worker has flushed)")
+def backfill_stats(since: datetime, until: Optional[datetime]):
+    """Rebuild the /stats rollup (prediction_stats) for a time range from the predictions table.
+
+    Workers buffer their counts for STATS_FLUSH_INTERVAL seconds, so a worker
+    that is killed loses its unflushed counts. This recounts whole minutes in
+    one transaction; minutes workers may still flush into are refused.
+    """
+    from datetime import timedelta
+    from src.core.config import settings
+
+    flushed = datetime.utcnow() - timedelta(seconds=settings.STATS_FLUSH_INTERVAL + 60)
+    until = until or flushed
+    if until > flushed:
+        raise click.BadParameter(f"must be before {flushed:%Y-%m-%d %H:%M:%S} (UTC)", param_hint="--until")
+    if since >= until:
+        raise click.BadParameter("must be before --until", param_hint="--since")
+
+    buckets = asyncio.run(_backfill_stats(since, until))
+    click.echo(f"Rebuilt {buckets} buckets from {since:%Y-%m-%d %H:%M} to {until:%Y-%m-%d %H:%M}")
+
+
+if __name__ == "__main__":
+    cli()
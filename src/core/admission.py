@@ -0,0 +1,188 @@
+import json
+import time
+from typing import Dict, List, Optional
+from src.core.config import settings
+from src.core.metrics import record_admission_rejected, register_admission_lane
+
+# Probes and scrapes are answered whatever the load: failing them under
+# overload gets healthy pods restarted and hides the overload from dashboards
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics"})
+# Operator endpoints (profiler, task dumps) must work during an overload too
+EXEMPT_PREFIXES = (f"{settings.API_V1_PREFIX}/admin/",)
+
+# Responses that mean something downstream is saturated, like slow ones
+_CONGESTION_STATUSES = frozenset({503, 504})
+
+
+class Lane:
+    """
+    Concurrency limit for one class of requests, adjusted AIMD-style from
+    observed latency: a completion within `target_latency` while the limit is
+    nearly in use grows it by 1/limit (about +1 per limit's worth of requests);
+    a slower one, an error or a 503/504 shrinks it by `backoff`, at most once
+    per target_latency so one congested moment counts once.
+
+    Without a target latency the limit is fixed: for endpoints that are slow by
+    design (uploads, analyses), whose latency says nothing about overload.
+
+    Requests over the limit are rejected at once rather than queued, so their
+    callers can retry elsewhere instead of waiting for a proxy timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target_latency: Optional[float],
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        backoff: float = 0.9
+    ):
+        self.name = name
+        self.target_latency = target_latency
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        # Lower-priority lanes that shrink whenever this one does
+        self.yielding: List["Lane"] = []
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        return True
+
+    @property
+    def adaptive(self) -> bool:
+        return self.target_latency is not None
+
+    def release(self, latency: float, congested: bool = False):
+        # Checked before in_flight drops: was the limit actually the constraint?
+        saturated = self.in_flight >= self.limit * 0.8
+        self.in_flight -= 1
+        if not self.adaptive:
+            return
+        if congested or latency > self.target_latency:
+            self.decrease()
+        elif saturated:
+            self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+
+    def decrease(self, now: Optional[float] = None):
+        if not self.adaptive:
+            return
+        now = time.monotonic() if now is None else now
+        if now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit * self.backoff, self.min_limit)
+        for lane in self.yielding:
+            lane.decrease(now)
+
+
+class AdmissionController:
+    """Lanes by path, highest priority first; each lower adaptive lane yields to every higher one"""
+
+    def __init__(self, lanes: List[Lane], routes: Dict[str, str], default: str):
+        self.lanes = {lane.name: lane for lane in lanes}
+        adaptive = [lane for lane in lanes if lane.adaptive]
+        for i, lane in enumerate(adaptive):
+            lane.yielding = adaptive[i + 1:]
+        # Longest prefix wins, so /predict/batch is not matched as /predict
+        self._routes = sorted(((prefix, self.lanes[name]) for prefix, name in routes.items()), key=lambda r: -len(r[0]))
+        self._default = self.lanes[default]
+        for lane in lanes:
+            register_admission_lane(lane)
+
+    def lane_for(self, path: str) -> Optional[Lane]:
+        if path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES):
+            return None
+        for prefix, lane in self._routes:
+            if path == prefix or path.startswith(prefix + "/"):
+                return lane
+        return self._default
+
+
+def build_controller() -> AdmissionController:
+    prefix = settings.API_V1_PREFIX
+    return AdmissionController(
+        [
+            Lane(
+                "realtime", settings.ADMISSION_REALTIME_TARGET_MS / 1000, settings.ADMISSION_REALTIME_LIMIT,
+                settings.ADMISSION_REALTIME_MIN_LIMIT, settings.ADMISSION_REALTIME_MAX_LIMIT
+            ),
+            Lane(
+                "default", settings.ADMISSION_DEFAULT_TARGET_MS / 1000, settings.ADMISSION_DEFAULT_LIMIT,
+                settings.ADMISSION_DEFAULT_MIN_LIMIT, settings.ADMISSION_DEFAULT_MAX_LIMIT
+            ),
+            Lane(
+                "batch", settings.ADMISSION_BATCH_TARGET_MS / 1000, settings.ADMISSION_BATCH_LIMIT,
+                settings.ADMISSION_BATCH_MIN_LIMIT, settings.ADMISSION_BATCH_MAX_LIMIT
+            ),
+            Lane("bulk", None, settings.ADMISSION_BULK_LIMIT, settings.ADMISSION_BULK_LIMIT, settings.ADMISSION_BULK_LIMIT),
+        ],
+        routes={
+            f"{prefix}/predict": "realtime",
+            f"{prefix}/predict/simple": "realtime",
+            f"{prefix}/predict/batch": "batch",
+            # Slow by design: file uploads and downloads, whole-table analyses
+            f"{prefix}/jobs": "bulk",
+            f"{prefix}/feedback/bulk": "bulk",
+            f"{prefix}/thresholds": "bulk",
+        },
+        default="default"
+    )
+
+
+class AdmissionMiddleware:
+    """
+    Plain ASGI middleware, outermost, so a rejected request costs a dict
+    lookup and a 503 with Retry-After. Latency is measured to the start of
+    the response, so streamed bodies don't count as slow, and the slot is
+    held until the body is done.
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or build_controller()
+        self._rejection_body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        lane = self.controller.lane_for(scope["path"])
+        if lane is None:
+            return await self.app(scope, receive, send)
+        if not lane.try_acquire():
+            record_admission_rejected(lane.name)
+            return await self._reject(send)
+
+        start = time.monotonic()
+        latency: Optional[float] = None
+        congested = True
+
+        async def send_wrapper(message):
+            nonlocal latency, congested
+            if message["type"] == "http.response.start":
+                latency = time.monotonic() - start
+                congested = message["status"] in _CONGESTION_STATUSES
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            lane.release(time.monotonic() - start if latency is None else latency, congested)
+
+    async def _reject(self, send):
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(self._rejection_body)).encode()),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": self._rejection_body})
@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+from typing import Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.prediction_schemas import BulkFeedbackRow, BulkFeedbackError, BulkFeedbackResponse
+from src.db import crud
+import structlog
+
+logger = structlog.get_logger()
+
+# Rows resolved and inserted per round trip
+CHUNK_SIZE = 1000
+
+
+class BulkFeedbackInputError(ValueError):
+    """The file as a whole can't be read (e.g. not UTF-8); nothing was inserted"""
+
+
+def _parse_rows(body: bytes, content_type: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line_number, record, error) for every data line of an NDJSON or CSV body"""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as e:
+        raise BulkFeedbackInputError(f"File is not valid UTF-8 (byte {e.start})")
+
+    if "csv" in content_type:
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            # Empty CSV cells mean "not provided"
+            yield reader.line_num, {
+                key.strip(): (value.strip() or None) if isinstance(value, str) else value
+                for key, value in record.items() if key
+            }, None
+        return
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+
+def _validate_row(record: dict, default_source: Optional[str]) -> BulkFeedbackRow:
+    if not record.get("feedback_source"):
+        record["feedback_source"] = record.pop("source", None) or default_source
+    return BulkFeedbackRow(**record)
+
+
+async def _ingest_chunk(
+    db: AsyncSession,
+    chunk: List[Tuple[int, BulkFeedbackRow]],
+    errors: List[BulkFeedbackError]
+) -> int:
+    prediction_ids = {row.prediction_id for _, row in chunk if row.prediction_id is not None}
+    transaction_ids = {row.transaction_id for _, row in chunk if row.prediction_id is None}
+
+    matches = await crud.resolve_prediction_ids(db, list(prediction_ids), list(transaction_ids))
+    transaction_by_id = {prediction_id: transaction_id for prediction_id, transaction_id in matches}
+    id_by_transaction = {transaction_id: prediction_id for prediction_id, transaction_id in matches}
+
+    rows = []
+    row_numbers = []
+    touched = {}
+    for row_number, row in chunk:
+        prediction_id = row.prediction_id if row.prediction_id is not None else id_by_transaction.get(row.transaction_id)
+        if prediction_id not in transaction_by_id:
+            errors.append(BulkFeedbackError(row=row_number, error="Prediction not found"))
+            continue
+
+        rows.append({
+            "prediction_id": prediction_id,
+            "actual_label": row.actual_label,
+            "feedback_source": row.feedback_source,
+            "notes": row.notes
+        })
+        row_numbers.append(row_number)
+        touched[prediction_id] = transaction_by_id[prediction_id]
+
+    try:
+        return await crud.bulk_create_feedback(db, rows, touched)
+    except Exception as e:
+        await db.rollback()
+        logger.warning("bulk_feedback_chunk_failed", rows=len(rows), error=str(e))
+        errors.extend(BulkFeedbackError(row=n, error=f"Insert failed: {e}") for n in row_numbers)
+        return 0
+
+
+async def ingest_feedback(
+    db: AsyncSession,
+    body: bytes,
+    content_type: str,
+    default_source: Optional[str] = None
+) -> BulkFeedbackResponse:
+    """
+    Validate, resolve and insert a bulk feedback file chunk by chunk.
+
+    Bad rows are reported by line number and never abort the rest of the file;
+    a chunk whose INSERT fails reports each of its rows as failed.
+    """
+    errors: List[BulkFeedbackError] = []
+    chunk: List[Tuple[int, BulkFeedbackRow]] = []
+    total_rows = 0
+    inserted = 0
+
+    for line_number, record, error in _parse_rows(body, content_type):
+        total_rows += 1
+        if error:
+            errors.append(BulkFeedbackError(row=line_number, error=error))
+            continue
+
+        try:
+            row = _validate_row(record, default_source)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+            )
+            errors.append(BulkFeedbackError(row=line_number, error=message))
+            continue
+
+        chunk.append((line_number, row))
+        if len(chunk) >= CHUNK_SIZE:
+            inserted += await _ingest_chunk(db, chunk, errors)
+            chunk = []
+
+    if chunk:
+        inserted += await _ingest_chunk(db, chunk, errors)
+
+    errors.sort(key=lambda err: err.row)
+    return BulkFeedbackResponse(
+        total_rows=total_rows,
+        inserted=inserted,
+        failed=len(errors),
+        errors=errors
+    )
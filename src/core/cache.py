@@ -1,9 +1,14 @@
 import redis.asyncio as redis
+import asyncio
 import json
 import hashlib
-from typing import Optional, Any
+import uuid
+import msgpack
+from typing import Optional, Any, List
 from functools import wraps
 from src.core.config import settings
+from src.core.circuit_breaker import CircuitOpenError, create_circuit_breaker
+from src.core.near_cache import NearCache, CacheStats
 import structlog
 
 logger = structlog.get_logger()
@@ -11,125 +16,249 @@ logger = structlog.get_logger()
 class RedisCache:
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
-        self.redis_available = True
+        # Every Redis call goes through the breaker: while it's open, calls return
+        # their fallback at once instead of waiting out a dead server
+        self.breaker = create_circuit_breaker("redis", call_timeout=settings.REDIS_CALL_TIMEOUT)
+        self._scripts: dict = {}
+        self._connect_lock = asyncio.Lock()
+        # Optional per-worker copy of hot values, kept coherent through a pub/sub channel
+        self.near_cache: Optional[NearCache] = None
+        if settings.NEAR_CACHE_ENABLED:
+            self.near_cache = NearCache(
+                max_entries=settings.NEAR_CACHE_MAX_ENTRIES,
+                max_bytes=settings.NEAR_CACHE_MAX_BYTES,
+                ttl=settings.NEAR_CACHE_TTL
+            )
+        self.stats = CacheStats()
+        self._origin = uuid.uuid4().hex.encode()
+        self._listener: Optional[asyncio.Task] = None
+    
+    @property
+    def redis_available(self) -> bool:
+        return self.breaker.available
+    
+    @redis_available.setter
+    def redis_available(self, available: bool):
+        if available:
+            self.breaker.reset()
+        else:
+            self.breaker.trip()
     
     async def connect(self):
-        if not self.redis_client and self.redis_available:
+        """Create the client and ping it. A failure counts against the breaker, so
+        the connection is retried by the first call after it half-opens."""
+        async with self._connect_lock:
+            if self.redis_client or not self.redis_available:
+                return
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                # Values are msgpack bytes; see get_value/set_value
+                decode_responses=False,
+                socket_connect_timeout=settings.REDIS_CALL_TIMEOUT,
+                socket_keepalive=True
+            )
             try:
-                self.redis_client = await redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=settings.REDIS_PORT,
-                    db=settings.REDIS_DB,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_keepalive=True
-                )
-                # Test connection
-                await self.redis_client.ping()
+                await self.breaker.call(client.ping)
+                self.redis_client = client
                 logger.info("redis_connected", host=settings.REDIS_HOST, port=settings.REDIS_PORT)
+                if self.near_cache is not None and self._listener is None:
+                    self._listener = asyncio.create_task(self._listen_for_invalidations())
             except Exception as e:
                 logger.warning("redis_connection_failed", error=str(e), message="Running without Redis cache")
-                self.redis_available = False
-                self.redis_client = None
+                await client.aclose()
     
     async def disconnect(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
         if self.redis_client:
             await self.redis_client.close()
     
-    async def get(self, key: str) -> Optional[str]:
-        if not self.redis_available:
-            return None
+    def _invalidation_message(self, keys) -> bytes:
+        return b"\n".join([self._origin, *(key.encode() for key in keys)])
+    
+    def _handle_invalidation(self, data: bytes):
+        origin, *keys = data.split(b"\n")
+        # Writers drop their own copies before publishing
+        if origin != self._origin:
+            self.near_cache.invalidate(key.decode() for key in keys)
+    
+    async def _listen_for_invalidations(self):
+        """Drop near-cache entries written or deleted by other workers.
+        
+        Messages missed while unsubscribed can't be replayed, so the near cache is
+        emptied and stops serving whenever the subscription isn't up.
+        """
+        while True:
+            pubsub = None
+            try:
+                if self.redis_client and self.redis_available:
+                    pubsub = self.redis_client.pubsub()
+                    await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                    self.near_cache.coherent = True
+                    while self.redis_available:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self._handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("near_cache_subscription_failed", error=str(e))
+            finally:
+                self.near_cache.coherent = False
+                self.near_cache.clear()
+                if pubsub is not None:
+                    await pubsub.aclose()
+            await asyncio.sleep(1.0)
+    
+    async def _execute(self, operation: str, default: Any, command, **log_fields) -> Any:
+        """Run command(client) under the breaker; `default` if Redis is down or the call fails"""
         if not self.redis_client:
             await self.connect()
-        if not self.redis_available:
-            return None
+        if not self.redis_client:
+            return default
         try:
-            return await self.redis_client.get(key)
+            return await self.breaker.call(command, self.redis_client)
+        except CircuitOpenError:
+            return default
         except Exception as e:
-            logger.warning("redis_get_failed", key=key, error=str(e))
-            return None
+            logger.warning(f"redis_{operation}_failed", error=str(e), **log_fields)
+            return default
     
-    async def set(self, key: str, value: Any, expire: int = None):
-        if not self.redis_available:
-            return
-        if not self.redis_client:
-            await self.connect()
-        if not self.redis_available:
+    async def run(self, operation: str, command, default: Any = None, **log_fields) -> Any:
+        """Run command(client) for commands without a wrapper here, e.g. streams or pipelines"""
+        return await self._execute(operation, default, command, **log_fields)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._execute("get", None, lambda client: client.get(key), key=key)
+    
+    async def _write(self, operation: str, keys: List[str], command, **log_fields):
+        """Run a write and, with the near cache on, publish the keys in the same round trip"""
+        if self.near_cache is None:
+            await self._execute(operation, None, command, **log_fields)
             return
         
-        try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            
-            if expire:
-                await self.redis_client.setex(key, expire, value)
-            else:
-                await self.redis_client.set(key, value)
-        except Exception as e:
-            logger.warning("redis_set_failed", key=key, error=str(e))
+        self.near_cache.invalidate(keys)
+        message = self._invalidation_message(keys)
+        
+        def pipelined(client):
+            pipe = client.pipeline(transaction=False)
+            command(pipe)
+            pipe.publish(settings.CACHE_INVALIDATION_CHANNEL, message)
+            return pipe.execute()
+        
+        await self._execute(operation, None, pipelined, **log_fields)
     
-    async def delete(self, key: str):
-        if not self.redis_available:
-            return
-        if not self.redis_client:
-            await self.connect()
-        if not self.redis_available:
+    async def set(self, key: str, value: Any, expire: int = None):
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        
+        if expire:
+            command = lambda client: client.setex(key, expire, value)
+        else:
+            command = lambda client: client.set(key, value)
+        await self._write("set", [key], command, key=key)
+    
+    async def delete(self, *keys: str):
+        if not keys:
             return
+        await self._write("delete", list(keys), lambda client: client.delete(*keys), key=keys[0], count=len(keys))
+    
+    async def get_value(self, key: str) -> Optional[Any]:
+        """Get a value stored with set_value, from the near cache when it has it"""
+        near_cache = self.near_cache
+        if near_cache is None:
+            encoded = await self.get(key)
+        else:
+            encoded = near_cache.get(key)
+            if encoded is not None:
+                self.stats.record(key, "local_hits")
+                return msgpack.unpackb(encoded)
+            
+            generation = near_cache.generation
+            result = await self._execute(
+                "get",
+                None,
+                lambda client: client.pipeline(transaction=False).get(key).pttl(key).execute(),
+                key=key
+            )
+            encoded, ttl_ms = result if result is not None else (None, -2)
+            # Skip if an invalidation arrived while the read was in flight
+            if encoded is not None and near_cache.generation == generation:
+                near_cache.put(key, encoded, ttl_ms / 1000 if ttl_ms > 0 else None)
+        
+        if encoded is None:
+            self.stats.record(key, "misses")
+            return None
         try:
-            await self.redis_client.delete(key)
-        except Exception as e:
-            logger.warning("redis_delete_failed", key=key, error=str(e))
+            value = msgpack.unpackb(encoded)
+        except Exception:
+            # Written in another format, e.g. by an older release: treat as a miss
+            self.stats.record(key, "misses")
+            return None
+        self.stats.record(key, "remote_hits")
+        return value
+    
+    async def set_value(self, key: str, value: Any, expire: int = None):
+        """Store a value as msgpack, which is smaller and faster to decode than JSON"""
+        await self.set(key, msgpack.packb(value), expire=expire)
+    
+    def get_stats(self) -> dict:
+        """Lookup outcomes by key prefix and near-cache state, for this worker only"""
+        return {
+            "connected": self.redis_client is not None and self.redis_available,
+            "breaker": self.breaker.state,
+            "near_cache": self.near_cache.stats() if self.near_cache is not None else None,
+            "prefixes": self.stats.snapshot()
+        }
     
     async def exists(self, key: str) -> bool:
-        if not self.redis_available:
-            return False
-        if not self.redis_client:
-            await self.connect()
-        if not self.redis_available:
-            return False
-        try:
-            return await self.redis_client.exists(key) > 0
-        except Exception as e:
-            logger.warning("redis_exists_failed", key=key, error=str(e))
-            return False
+        return await self._execute("exists", 0, lambda client: client.exists(key), key=key) > 0
     
     async def incr(self, key: str, amount: int = 1) -> int:
-        if not self.redis_available:
-            return 1  # Return 1 to simulate first increment when Redis is unavailable
-        if not self.redis_client:
-            await self.connect()
-        if not self.redis_available:
-            return 1
-        try:
-            return await self.redis_client.incrby(key, amount)
-        except Exception as e:
-            logger.warning("redis_incr_failed", key=key, error=str(e))
-            return 1
+        # 1 simulates a first increment when Redis is unavailable
+        return await self._execute("incr", 1, lambda client: client.incrby(key, amount), key=key)
     
     async def expire(self, key: str, seconds: int):
-        if not self.redis_available:
-            return
-        if not self.redis_client:
-            await self.connect()
-        if not self.redis_available:
-            return
-        try:
-            await self.redis_client.expire(key, seconds)
-        except Exception as e:
-            logger.warning("redis_expire_failed", key=key, error=str(e))
+        await self._execute("expire", None, lambda client: client.expire(key, seconds), key=key)
     
     async def ttl(self, key: str) -> int:
-        if not self.redis_available:
-            return -1
-        if not self.redis_client:
-            await self.connect()
-        if not self.redis_available:
-            return -1
-        try:
-            return await self.redis_client.ttl(key)
-        except Exception as e:
-            logger.warning("redis_ttl_failed", key=key, error=str(e))
-            return -1
+        return await self._execute("ttl", -1, lambda client: client.ttl(key), key=key)
+    
+    def _registered(self, client: redis.Redis, script: str):
+        registered = self._scripts.get(script)
+        if registered is None:
+            registered = self._scripts[script] = client.register_script(script)
+        return registered
+
+    async def run_script(self, script: str, keys: list, args: list) -> Optional[Any]:
+        """Run a Lua script atomically (EVALSHA, loading it on first use); None if Redis is unavailable"""
+        return await self._execute(
+            "script",
+            None,
+            lambda client: self._registered(client, script)(keys=keys, args=args),
+            key=keys[0] if keys else None
+        )
+
+    async def run_script_batch(self, script: str, calls: list) -> Optional[list]:
+        """Run one Lua script for many (keys, args) pairs in a single pipelined round trip"""
+        if not calls:
+            return None
+        
+        async def execute(client):
+            registered = self._registered(client, script)
+            async with client.pipeline(transaction=False) as pipe:
+                for keys, args in calls:
+                    await registered(keys=keys, args=args, client=pipe)
+                return await pipe.execute()
+        
+        return await self._execute("script_batch", None, execute, calls=len(calls))
 
 cache = RedisCache()
 
@@ -159,12 +288,12 @@ def cache_prediction(expire: int = 3600):
             features_dict = request.transaction.dict()
             cache_key = f"prediction:{generate_cache_key('pred', features_dict)}"
             
-            cached = await cache.get(cache_key)
+            cached = await cache.get_value(cache_key)
             if cached:
-                return json.loads(cached)
+                return cached
             
             result = await func(*args, **kwargs)
-            await cache.set(cache_key, result.dict(), expire=expire)
+            await cache.set_value(cache_key, result.model_dump(mode="json"), expire=expire)
             
             return result
         
@@ -172,10 +301,34 @@ def cache_prediction(expire: int = 3600):
     return decorator
 
 async def get_health_cache() -> Optional[dict]:
-    cached = await cache.get("health:status")
-    if cached:
-        return json.loads(cached)
-    return None
+    return await cache.get_value("health:status")
 
 async def set_health_cache(data: dict, expire: int = 60):
-    await cache.set("health:status", data, expire=expire)
+    await cache.set_value("health:status", data, expire=expire)
+
+def _prediction_cache_key(prediction_id=None, transaction_id=None) -> str:
+    if prediction_id is not None:
+        return f"prediction:id:{prediction_id}"
+    return f"prediction:txn:{transaction_id}"
+
+async def get_prediction_cache(prediction_id=None, transaction_id=None) -> Optional[dict]:
+    return await cache.get_value(_prediction_cache_key(prediction_id, transaction_id))
+
+async def set_prediction_cache(data: dict, expire: int = settings.CACHE_EXPIRATION):
+    """Store a serialized prediction under both its id and transaction id"""
+    await cache.set_value(_prediction_cache_key(prediction_id=data["id"]), data, expire=expire)
+    await cache.set_value(_prediction_cache_key(transaction_id=data["transaction_id"]), data, expire=expire)
+
+async def invalidate_prediction_cache(prediction_id, transaction_id: str):
+    await cache.delete(
+        _prediction_cache_key(prediction_id=prediction_id),
+        _prediction_cache_key(transaction_id=transaction_id)
+    )
+
+async def invalidate_prediction_cache_many(predictions: dict):
+    """Invalidate many predictions in one round trip, given {prediction_id: transaction_id}"""
+    keys = []
+    for prediction_id, transaction_id in predictions.items():
+        keys.append(_prediction_cache_key(prediction_id=prediction_id))
+        keys.append(_prediction_cache_key(transaction_id=transaction_id))
+    await cache.delete(*keys)
@@ -0,0 +1,156 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional
+from src.core.config import settings
+from src.core.metrics import record_circuit_breaker_call, set_circuit_breaker_state
+import structlog
+
+logger = structlog.get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"Circuit breaker '{name}' is open; retry in {retry_after:.1f}s")
+
+
+class CircuitBreaker:
+    """
+    Fails fast on a dependency that keeps failing, and probes it until it recovers.
+
+    - closed: calls go through; the outcomes of the last `window_size` calls are
+      kept, and once at least `minimum_calls` have been seen a failure rate at or
+      above `failure_rate_threshold` opens the breaker.
+    - open: calls raise CircuitOpenError without touching the dependency until
+      `recovery_timeout` has passed.
+    - half_open: up to `half_open_max_calls` probe calls go through; a success
+      closes the breaker, a failure opens it for another `recovery_timeout`.
+
+    State changes are synchronous, so the breaker can also guard code that can't
+    await, such as a connection pool checkout (see before_call/record_*).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_size: int = 20,
+        recovery_timeout: float = 10.0,
+        call_timeout: Optional[float] = None,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.recovery_timeout = recovery_timeout
+        self.call_timeout = call_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes = 0
+        set_circuit_breaker_state(self.name, self.state)
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would be let through right now (doesn't change state)"""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at >= self.recovery_timeout
+        if self.state == HALF_OPEN:
+            return self._probes < self.half_open_max_calls
+        return True
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning("circuit_breaker_state_changed", breaker=self.name, previous=self.state, state=state)
+        self.state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        else:
+            self._outcomes.clear()
+        set_circuit_breaker_state(self.name, state)
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError; report its outcome with one of the record_* methods"""
+        if self.state == OPEN:
+            elapsed = time.monotonic() - self._opened_at
+            if elapsed < self.recovery_timeout:
+                record_circuit_breaker_call(self.name, "rejected")
+                raise CircuitOpenError(self.name, self.recovery_timeout - elapsed)
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                record_circuit_breaker_call(self.name, "rejected")
+                raise CircuitOpenError(self.name, self.recovery_timeout)
+            self._probes += 1
+
+    def record_success(self):
+        record_circuit_breaker_call(self.name, "success")
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+        else:
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        record_circuit_breaker_call(self.name, "failure")
+        if self.state == HALF_OPEN:
+            self._transition(OPEN)
+            return
+
+        self._outcomes.append(False)
+        if len(self._outcomes) >= self.minimum_calls:
+            failure_rate = self._outcomes.count(False) / len(self._outcomes)
+            if failure_rate >= self.failure_rate_threshold:
+                self._transition(OPEN)
+
+    def record_ignored(self):
+        """End an admitted call whose outcome says nothing about the dependency"""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Await func(*args, **kwargs) under the breaker and the per-call timeout"""
+        self.before_call()
+        try:
+            if self.call_timeout is not None:
+                result = await asyncio.wait_for(func(*args, **kwargs), self.call_timeout)
+            else:
+                result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self.record_ignored()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def trip(self):
+        """Open the breaker now, e.g. when a dependency is known to be down"""
+        self._transition(OPEN)
+
+    def reset(self):
+        self._transition(CLOSED)
+
+
+def create_circuit_breaker(name: str, call_timeout: Optional[float] = None) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_rate_threshold=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+        minimum_calls=settings.CIRCUIT_BREAKER_MINIMUM_CALLS,
+        window_size=settings.CIRCUIT_BREAKER_WINDOW_SIZE,
+        recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+        call_timeout=call_timeout
+    )
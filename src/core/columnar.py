@@ -0,0 +1,210 @@
+import io
+import zipfile
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from src.core.drift import drift_monitor
+from src.core.model_loader import model_loader
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+NPZ = "application/x-npz"
+MEDIA_TYPES = (ARROW_STREAM, NPZ)
+
+# Invalid rows listed in an error response
+MAX_REPORTED_ROWS = 20
+
+# Same limit as the transaction_id column
+MAX_TRANSACTION_ID_LENGTH = 255
+
+
+class ColumnarInputError(ValueError):
+    def __init__(self, message: str, rows: Optional[List[dict]] = None):
+        super().__init__(message)
+        self.rows = rows or []
+
+
+class ColumnarBatch(NamedTuple):
+    transaction_ids: np.ndarray
+    # (n, len(feature_names)) float64, unscaled, in model_loader.get_feature_names() order
+    features: np.ndarray
+
+
+def media_type(content_type: str) -> Optional[str]:
+    kind = content_type.split(";", 1)[0].strip().lower()
+    return kind if kind in MEDIA_TYPES else None
+
+
+def _decode_npz(body: bytes, feature_names: List[str]) -> ColumnarBatch:
+    """An .npz archive with `features` (n, n_features), `transaction_id` (n,) and
+    optionally `feature_names`, checked against the model's order"""
+    try:
+        archive = np.load(io.BytesIO(body), allow_pickle=False)
+    except (ValueError, OSError, zipfile.BadZipFile) as e:
+        raise ColumnarInputError(f"Invalid .npz body: {e}")
+    if not isinstance(archive, np.lib.npyio.NpzFile):
+        raise ColumnarInputError("Expected an .npz archive, not a single .npy array")
+
+    with archive:
+        missing = {"features", "transaction_id"} - set(archive.files)
+        if missing:
+            raise ColumnarInputError(f"Missing arrays: {', '.join(sorted(missing))}")
+        try:
+            features = archive["features"]
+            transaction_ids = archive["transaction_id"]
+            declared = archive["feature_names"].tolist() if "feature_names" in archive.files else None
+        except ValueError as e:
+            # Object arrays need pickle, which is never loaded
+            raise ColumnarInputError(f"Invalid array: {e}")
+
+    if declared is not None and declared != feature_names:
+        raise ColumnarInputError(f"feature_names must be {feature_names}")
+    if features.ndim != 2 or features.shape[1] != len(feature_names):
+        raise ColumnarInputError(f"features must have shape (n, {len(feature_names)}), got {features.shape}")
+    if features.dtype.kind not in "fiu":
+        raise ColumnarInputError(f"features must be numeric, got {features.dtype}")
+    if transaction_ids.ndim != 1 or transaction_ids.dtype.kind not in "US":
+        raise ColumnarInputError("transaction_id must be a 1-d string array")
+
+    return ColumnarBatch(transaction_ids.astype(str), features.astype(np.float64, copy=False))
+
+
+def _decode_arrow(body: bytes, feature_names: List[str]) -> ColumnarBatch:
+    """An Arrow IPC stream with a `transaction_id` column and one column per feature name"""
+    # Imported here: pyarrow is only needed by clients that send Arrow
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowException as e:
+        raise ColumnarInputError(f"Invalid Arrow IPC stream: {e}")
+
+    missing = [name for name in ["transaction_id", *feature_names] if name not in table.column_names]
+    if missing:
+        raise ColumnarInputError(f"Missing columns: {', '.join(missing)}")
+
+    ids = table.column("transaction_id")
+    if ids.null_count:
+        raise ColumnarInputError("transaction_id must not contain nulls")
+
+    features = np.empty((table.num_rows, len(feature_names)), dtype=np.float64)
+    try:
+        for i, name in enumerate(feature_names):
+            # Nulls come through as NaN and are rejected with the other non-finite values
+            features[:, i] = pc.cast(table.column(name), pa.float64()).to_numpy()
+        transaction_ids = np.asarray(pc.cast(ids, pa.string()).to_numpy(zero_copy_only=False), dtype=str)
+    except pa.ArrowException as e:
+        raise ColumnarInputError(f"Invalid column type: {e}")
+
+    return ColumnarBatch(transaction_ids, features)
+
+
+def decode(body: bytes, kind: str, feature_names: List[str]) -> ColumnarBatch:
+    if kind == ARROW_STREAM:
+        return _decode_arrow(body, feature_names)
+    return _decode_npz(body, feature_names)
+
+
+def _checks(batch: ColumnarBatch, feature_names: List[str]) -> Tuple[Tuple[np.ndarray, str], ...]:
+    """(mask of failing rows, message) for every row-level rule"""
+    id_lengths = np.char.str_len(batch.transaction_ids)
+    _, inverse, counts = np.unique(batch.transaction_ids, return_inverse=True, return_counts=True)
+    return (
+        (~np.isfinite(batch.features).all(axis=1), "features must be finite"),
+        (batch.features[:, feature_names.index("Amount")] < 0, "Amount must be >= 0"),
+        ((id_lengths == 0) | (id_lengths > MAX_TRANSACTION_ID_LENGTH), "transaction_id must be 1-255 characters"),
+        (counts[inverse] > 1, "duplicate transaction_id"),
+    )
+
+
+def invalid_mask(batch: ColumnarBatch, feature_names: List[str]) -> np.ndarray:
+    """Rows breaking any rule that validate checks"""
+    return np.logical_or.reduce([mask for mask, _ in _checks(batch, feature_names)])
+
+
+def validate(batch: ColumnarBatch, feature_names: List[str], max_rows: int):
+    """Check every row at once; raises ColumnarInputError listing the first invalid rows"""
+    n = len(batch.transaction_ids)
+    if n == 0:
+        raise ColumnarInputError("Batch is empty")
+    if n > max_rows:
+        raise ColumnarInputError(f"Batch has {n} rows; the limit is {max_rows}")
+    if batch.features.shape[0] != n:
+        raise ColumnarInputError(f"{batch.features.shape[0]} feature rows for {n} transaction ids")
+
+    checks = _checks(batch, feature_names)
+    invalid = np.logical_or.reduce([mask for mask, _ in checks])
+    if not invalid.any():
+        return
+
+    rows = [
+        {
+            "row": int(i),
+            "transaction_id": str(batch.transaction_ids[i]),
+            "errors": [message for mask, message in checks if mask[i]]
+        }
+        for i in np.flatnonzero(invalid)[:MAX_REPORTED_ROWS]
+    ]
+    raise ColumnarInputError(f"{int(invalid.sum())} invalid rows", rows=rows)
+
+
+def score(batch: ColumnarBatch, feature_names: List[str]) -> Dict[str, np.ndarray]:
+    """Scale Time and Amount column-wise and score the whole matrix in one call"""
+    features = batch.features.copy()
+    scaler = model_loader.get_scaler()
+    for name in ("Time", "Amount"):
+        i = feature_names.index(name)
+        features[:, i] = scaler.transform(features[:, i:i + 1]).ravel()
+
+    predictions, fraud_probabilities, risk_levels, anomaly_scores = model_loader.predict_batch(features)
+    drift_monitor.record(batch.features, anomaly_scores)
+    return {
+        "prediction": predictions,
+        "fraud_probability": fraud_probabilities,
+        "risk_level": risk_levels,
+        "anomaly_score": anomaly_scores
+    }
+
+
+def encode(kind: str, transaction_ids: np.ndarray, results: Dict[str, np.ndarray]) -> bytes:
+    """Results as columns in the request's format: transaction_id, prediction,
+    fraud_probability, risk_level, anomaly_score"""
+    if kind == ARROW_STREAM:
+        import pyarrow as pa
+
+        table = pa.table({"transaction_id": transaction_ids, **results})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    buffer = io.BytesIO()
+    np.savez(buffer, transaction_id=transaction_ids, **results)
+    return buffer.getvalue()
+
+
+def prediction_rows(
+    batch: ColumnarBatch,
+    results: Dict[str, np.ndarray],
+    feature_names: List[str],
+    threshold: float
+) -> List[dict]:
+    """Rows for crud.bulk_create_predictions; only built for persistence, after scoring"""
+    return [
+        {
+            "transaction_id": transaction_id,
+            "prediction": bool(prediction),
+            "fraud_probability": fraud_probability,
+            "risk_level": risk_level,
+            "anomaly_score": anomaly_score,
+            "threshold_used": threshold,
+            "features": dict(zip(feature_names, features))
+        }
+        for transaction_id, prediction, fraud_probability, risk_level, anomaly_score, features in zip(
+            batch.transaction_ids.tolist(),
+            results["prediction"].tolist(),
+            results["fraud_probability"].tolist(),
+            results["risk_level"].tolist(),
+            results["anomaly_score"].tolist(),
+            batch.features.tolist()
+        )
+    ]
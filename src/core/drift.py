@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+from src.core.cache import cache
+from src.core.config import settings
+from src.core.metrics import set_drift
+import structlog
+
+logger = structlog.get_logger()
+
+# Name of the anomaly score's histogram, tracked alongside the features
+SCORE = "anomaly_score"
+
+# Conventional PSI bands: below 0.1 stable, 0.1-0.25 moderate shift, above significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+# Floor for empty bins so PSI stays finite
+_EPSILON = 1e-4
+
+
+def bin_indices(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Bin of each value, column by column: values is (n, k), edges is (k, bins - 1)
+    sorted per row and padded with +inf. Bins are (edge[i-1], edge[i]]."""
+    return (values[:, :, None] > edges[None, :, :]).sum(axis=2)
+
+
+def histogram(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """(k, bins) counts of an (n, k) matrix in one bincount"""
+    columns, bins = edges.shape[0], edges.shape[1] + 1
+    flat = bin_indices(values, edges) + np.arange(columns) * bins
+    return np.bincount(flat.ravel(), minlength=columns * bins).reshape(columns, bins)
+
+
+def build_reference(features: np.ndarray, scores: np.ndarray, feature_names: List[str], bins: int = 10) -> dict:
+    """
+    Training-time reference: quantile bin edges and the share of training rows in
+    each bin, for every feature (raw, in feature_names order) and the anomaly score.
+    Columns with repeated values get fewer distinct edges; the rest is padded.
+    """
+    values = np.column_stack([features, scores])
+    edges = np.full((values.shape[1], bins - 1), np.inf)
+    for i in range(values.shape[1]):
+        quantiles = np.unique(np.quantile(values[:, i], np.linspace(0, 1, bins + 1)[1:-1]))
+        edges[i, :len(quantiles)] = quantiles
+    counts = histogram(values, edges)
+    return {
+        "names": [*feature_names, SCORE],
+        "bins": bins,
+        # JSON has no infinity; padding is stored as null
+        "edges": [[None if np.isinf(edge) else float(edge) for edge in row] for row in edges],
+        "expected": (counts / len(values)).tolist(),
+        "n_samples": len(values)
+    }
+
+
+def compare(counts: np.ndarray, expected: np.ndarray, names: List[str]) -> Dict[str, dict]:
+    """PSI and binned KS distance of live counts against the reference, per name"""
+    totals = counts.sum(axis=1, keepdims=True)
+    actual = counts / np.maximum(totals, 1)
+    psi = ((actual - expected) * np.log(np.maximum(actual, _EPSILON) / np.maximum(expected, _EPSILON))).sum(axis=1)
+    ks = np.abs(np.cumsum(actual, axis=1) - np.cumsum(expected, axis=1)).max(axis=1)
+    return {
+        name: {
+            "count": int(total),
+            "psi": round(float(psi_value), 6) if total else None,
+            "ks": round(float(ks_value), 6) if total else None,
+            "status": (
+                "no_data" if not total else
+                "significant" if psi_value >= PSI_SIGNIFICANT else
+                "moderate" if psi_value >= PSI_MODERATE else
+                "stable"
+            )
+        }
+        for name, total, psi_value, ks_value in zip(names, totals.ravel(), psi, ks)
+    }
+
+
+class DriftMonitor:
+    """
+    Fixed-bin histograms of incoming features and anomaly scores, compared with
+    the training reference saved next to the model.
+
+    Each prediction batch costs one comparison against the bin edges and one
+    bincount into a fixed (features + 1, bins) array. Counts are flushed to
+    per-hour Redis hashes with HINCRBY, so every worker's counts add up in the
+    same place; reading sums the hashes of the requested window.
+
+    record() is called from worker threads (columnar scoring runs under
+    asyncio.to_thread), so the count arrays are only touched under a lock.
+    """
+
+    def __init__(self, flush_interval: float = 10.0):
+        self.flush_interval = flush_interval
+        self.names: List[str] = []
+        self._edges: Optional[np.ndarray] = None
+        self._expected: Optional[np.ndarray] = None
+        self._pending: Optional[np.ndarray] = None
+        # Everything this worker has seen, for when Redis is unavailable
+        self._totals: Optional[np.ndarray] = None
+        self._key_prefix = ""
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._edges is not None
+
+    def load(self, path: str = settings.DRIFT_REFERENCE_PATH) -> bool:
+        reference_path = Path(path)
+        if not reference_path.exists():
+            logger.warning("drift_reference_missing", path=path)
+            return False
+        content = reference_path.read_bytes()
+        self.set_reference(json.loads(content), hashlib.sha1(content).hexdigest()[:12])
+        logger.info("drift_reference_loaded", path=path, features=len(self.names))
+        return True
+
+    def set_reference(self, reference: dict, reference_id: str):
+        self.names = reference["names"]
+        self._edges = np.array(
+            [[np.inf if edge is None else edge for edge in row] for row in reference["edges"]], dtype=np.float64
+        )
+        self._expected = np.array(reference["expected"], dtype=np.float64)
+        self._pending = np.zeros_like(self._expected, dtype=np.int64)
+        self._totals = np.zeros_like(self._pending)
+        # Counts from a different reference have different bins, so they get their own keys
+        self._key_prefix = f"drift:{settings.APP_VERSION}:{reference_id}"
+
+    def record(self, features: np.ndarray, scores: np.ndarray):
+        """Add an (n, n_features) matrix of raw features and its n anomaly scores"""
+        if self._edges is None:
+            return
+        counts = histogram(np.column_stack([features, scores]), self._edges)
+        with self._lock:
+            self._pending += counts
+            self._totals += counts
+
+    def _key(self, hour: int) -> str:
+        return f"{self._key_prefix}:{hour}"
+
+    async def flush(self):
+        if self._pending is None:
+            return
+        with self._lock:
+            if not self._pending.any():
+                return
+            pending, self._pending = self._pending, np.zeros_like(self._pending)
+        key = self._key(int(time.time()) // 3600)
+        fields = np.flatnonzero(pending)
+
+        def pipelined(client):
+            pipe = client.pipeline(transaction=False)
+            for field, count in zip(fields.tolist(), pending.ravel()[fields].tolist()):
+                pipe.hincrby(key, field, count)
+            pipe.expire(key, settings.DRIFT_RETENTION_HOURS * 3600)
+            return pipe.execute()
+
+        if await cache.run("drift_flush", pipelined, key=key) is None:
+            # Redis unavailable: keep the counts for the next flush
+            with self._lock:
+                self._pending += pending
+
+    async def window_counts(self, hours: int) -> Optional[np.ndarray]:
+        """Counts from every worker over the last `hours` hours; None if Redis is unavailable"""
+        current = int(time.time()) // 3600
+        keys = [self._key(hour) for hour in range(current - hours + 1, current + 1)]
+
+        def pipelined(client):
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            return pipe.execute()
+
+        hashes = await cache.run("drift_window", pipelined, key=self._key_prefix)
+        if hashes is None:
+            return None
+        counts = np.zeros(self._expected.size, dtype=np.int64)
+        for fields in hashes:
+            for field, count in fields.items():
+                counts[int(field)] += int(count)
+        return counts.reshape(self._expected.shape)
+
+    async def report(self, hours: int = 24) -> Optional[dict]:
+        """Drift per feature and for the score; None without a reference"""
+        if self._edges is None:
+            return None
+        # Push this worker's pending counts first so the window includes them
+        await self.flush()
+        counts = await self.window_counts(hours)
+        scope = "all_workers"
+        if counts is None:
+            with self._lock:
+                counts = self._totals.copy()
+            scope = "this_worker"
+        results = compare(counts, self._expected, self.names)
+        set_drift(results)
+        return {"window_hours": hours, "scope": scope, "features": results}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.report(settings.DRIFT_WINDOW_HOURS)
+            except Exception as e:
+                logger.warning("drift_update_failed", error=str(e))
+
+    def start(self):
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+drift_monitor = DriftMonitor(flush_interval=settings.DRIFT_FLUSH_INTERVAL)
@@ -1,5 +1,6 @@
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from fastapi import Response
+import os
 import time
 
 # Counters
@@ -26,6 +27,29 @@ cache_operations = Counter(
     ['operation', 'result']
 )
 
+db_pool_checkout_timeouts = Counter(
+    'db_pool_checkout_timeouts_total',
+    'Connection checkouts that timed out waiting for the pool',
+    ['engine']
+)
+
+circuit_breaker_calls = Counter(
+    'circuit_breaker_calls_total',
+    'Calls through a circuit breaker by outcome (success, failure, rejected)',
+    ['breaker', 'result']
+)
+
+event_loop_blocks = Counter(
+    'event_loop_blocks_total',
+    'Times a single callback held the event loop past the blocking threshold'
+)
+
+admission_rejected = Counter(
+    'admission_rejected_total',
+    'Requests shed with a 503 by admission control',
+    ['lane']
+)
+
 feedback_submitted = Counter(
     'feedback_submitted_total',
     'Total feedback submissions',
@@ -49,8 +73,21 @@ api_request_duration = Histogram(
 db_query_duration = Histogram(
     'db_query_duration_seconds',
     'Database query duration',
-    ['operation'],
-    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0]
+    ['engine', 'operation'],
+    buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+db_pool_checkout_duration = Histogram(
+    'db_pool_checkout_duration_seconds',
+    'Time spent waiting for a pooled connection',
+    ['engine'],
+    buckets=[0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+)
+
+event_loop_lag = Histogram(
+    'event_loop_lag_seconds',
+    'How late event-loop wake-ups run past their scheduled time',
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
 )
 
 # Gauges
@@ -69,6 +106,67 @@ model_threshold = Gauge(
     'Current model threshold'
 )
 
+db_pool_size = Gauge(
+    'db_pool_size',
+    'Configured connection pool size',
+    ['engine']
+)
+
+db_pool_checked_out = Gauge(
+    'db_pool_checked_out',
+    'Connections currently checked out of the pool',
+    ['engine']
+)
+
+db_pool_overflow = Gauge(
+    'db_pool_overflow',
+    'Connections currently open beyond the pool size',
+    ['engine']
+)
+
+db_replica_lag = Gauge(
+    'db_replica_lag_seconds',
+    'Last observed replication lag of the read engine'
+)
+
+circuit_breaker_state = Gauge(
+    'circuit_breaker_state',
+    'Circuit breaker state: 0 closed, 1 half-open, 2 open',
+    ['breaker']
+)
+
+feature_drift_psi = Gauge(
+    'feature_drift_psi',
+    'Population stability index of live values against the training reference',
+    ['feature']
+)
+
+feature_drift_ks = Gauge(
+    'feature_drift_ks',
+    'Largest gap between the live and training CDFs over the reference bins',
+    ['feature']
+)
+
+admission_limit = Gauge(
+    'admission_limit',
+    'Current adaptive concurrency limit of an admission lane',
+    ['lane']
+)
+
+admission_in_flight = Gauge(
+    'admission_in_flight',
+    'Requests currently admitted in an admission lane',
+    ['lane']
+)
+
+event_loop_utilization = Gauge(
+    'event_loop_utilization',
+    'Share of wall time the event-loop thread spent on CPU, per worker process',
+    ['pid']
+)
+
+_CIRCUIT_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
 def record_prediction(prediction: bool, risk_level: str, duration: float):
     """Record prediction metrics"""
     predictions_total.labels(
@@ -99,9 +197,30 @@ def record_cache_operation(operation: str, hit: bool = None):
         result=result
     ).inc()
 
-def record_db_query(operation: str, duration: float):
+def record_db_query(operation: str, duration: float, engine: str = "primary"):
     """Record database query metrics"""
-    db_query_duration.labels(operation=operation).observe(duration)
+    db_query_duration.labels(engine=engine, operation=operation).observe(duration)
+
+def record_pool_checkout(engine: str, duration: float, timed_out: bool = False):
+    """Record connection pool checkout wait"""
+    db_pool_checkout_duration.labels(engine=engine).observe(duration)
+    if timed_out:
+        db_pool_checkout_timeouts.labels(engine=engine).inc()
+
+def register_db_pool(engine_name: str, engine):
+    """Expose pool gauges for an engine, evaluated lazily at scrape time"""
+    # Read engine.pool on every scrape: dispose() replaces the pool object
+    db_pool_size.labels(engine=engine_name).set_function(lambda: engine.pool.size())
+    db_pool_checked_out.labels(engine=engine_name).set_function(lambda: engine.pool.checkedout())
+    db_pool_overflow.labels(engine=engine_name).set_function(lambda: max(engine.pool.overflow(), 0))
+
+def record_circuit_breaker_call(breaker: str, result: str):
+    """Record a call admitted or rejected by a circuit breaker"""
+    circuit_breaker_calls.labels(breaker=breaker, result=result).inc()
+
+def set_circuit_breaker_state(breaker: str, state: str):
+    """Export a circuit breaker's current state"""
+    circuit_breaker_state.labels(breaker=breaker).set(_CIRCUIT_BREAKER_STATES[state])
 
 def record_feedback(actual_label: bool):
     """Record feedback submission"""
@@ -109,6 +228,34 @@ def record_feedback(actual_label: bool):
         actual_label='fraud' if actual_label else 'legitimate'
     ).inc()
 
+def set_drift(results: dict):
+    """Export drift statistics per feature (and anomaly_score) from a DriftMonitor report"""
+    for feature, stats in results.items():
+        if stats["psi"] is not None:
+            feature_drift_psi.labels(feature=feature).set(stats["psi"])
+            feature_drift_ks.labels(feature=feature).set(stats["ks"])
+
+def register_admission_lane(lane):
+    """Expose an admission lane's limit and in-flight count, read at scrape time"""
+    admission_limit.labels(lane=lane.name).set_function(lambda: lane.limit)
+    admission_in_flight.labels(lane=lane.name).set_function(lambda: lane.in_flight)
+
+def record_admission_rejected(lane: str):
+    """Record a request shed by admission control"""
+    admission_rejected.labels(lane=lane).inc()
+
+def record_loop_lag(lag: float):
+    """Record one event-loop scheduling delay"""
+    event_loop_lag.observe(lag)
+
+def record_loop_block():
+    """Record a callback that blocked the event loop past the threshold"""
+    event_loop_blocks.inc()
+
+def set_loop_utilization(utilization: float):
+    """Export this worker's event-loop utilization"""
+    event_loop_utilization.labels(pid=str(os.getpid())).set(utilization)
+
 async def metrics_endpoint():
     """Prometheus metrics endpoint"""
     return Response(
@@ -1,8 +1,17 @@
 import time
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+from src.core.config import settings
 from src.core.metrics import record_api_request
 from src.core.logging_setup import log_api_request
+from src.core.usage import usage_aggregator
+
+
+def get_route_template(request: Request) -> str:
+    """Matched route path (e.g. /api/v1/predictions/{prediction_id}), or the raw path if unrouted"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or request.url.path
+
 
 class MonitoringMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
@@ -12,10 +21,11 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
         
         duration = time.time() - start_time
         duration_ms = duration * 1000
+        route = get_route_template(request)
         
         record_api_request(
             method=request.method,
-            endpoint=request.url.path,
+            endpoint=route,
             status=response.status_code,
             duration=duration
         )
@@ -27,6 +37,19 @@ class MonitoringMiddleware(BaseHTTPMiddleware):
             duration_ms=duration_ms
         )
         
+        # Only requests that passed API key verification are billable
+        api_key = getattr(request.state, "api_key", None)
+        if api_key and settings.ENABLE_USAGE_TRACKING:
+            usage_aggregator.record(
+                api_key=api_key,
+                endpoint=route,
+                method=request.method,
+                status_code=response.status_code,
+                duration_ms=duration_ms
+            )
+        
         response.headers["X-Response-Time"] = f"{duration_ms:.2f}ms"
+        for name, value in getattr(request.state, "rate_limit_headers", {}).items():
+            response.headers[name] = value
         
         return response
@@ -1,63 +1,101 @@
 import pickle
 import json
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List
 from src.core.config import get_settings
+import structlog
 
 settings = get_settings()
+logger = structlog.get_logger()
+
+# Raw input column order, for metadata written before feature_names was recorded
+DEFAULT_FEATURE_NAMES = [f"V{i}" for i in range(1, 29)] + ["Time", "Amount"]
 
 
 class ModelLoader:
+    """
+    Process-wide holder of the model, scaler and metadata.
+    
+    Artifacts are loaded on first use (or explicitly by the startup warmup) rather
+    than at import, so importing the app doesn't pay for unpickling scikit-learn.
+    """
     _instance = None
     _model = None
     _scaler = None
     _metadata = None
+    _lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ModelLoader, cls).__new__(cls)
-            cls._instance._load_artifacts()
         return cls._instance
     
+    @property
+    def is_loaded(self) -> bool:
+        return self._metadata is not None
+    
+    def load(self):
+        """Load artifacts once; safe to call from several threads"""
+        if self.is_loaded:
+            return
+        with self._lock:
+            if not self.is_loaded:
+                self._load_artifacts()
+    
     def _load_artifacts(self):
         try:
             model_path = Path(settings.MODEL_PATH)
             with open(model_path, 'rb') as f:
-                self._model = pickle.load(f)
+                model = pickle.load(f)
             
             scaler_path = Path(settings.SCALER_PATH)
             with open(scaler_path, 'rb') as f:
-                self._scaler = pickle.load(f)
+                scaler = pickle.load(f)
             
             metadata_path = Path(settings.METADATA_PATH)
             with open(metadata_path, 'r') as f:
-                self._metadata = json.load(f)
+                metadata = json.load(f)
             
-            print(f"Model loaded successfully")
-            print(f"   Model: {self._metadata['model_type']}")
-            print(f"   Threshold: {self._metadata['optimal_threshold']:.4f}")
-            print(f"   Precision: {self._metadata['test_metrics']['precision']:.2%}")
-            print(f"   Recall: {self._metadata['test_metrics']['recall']:.2%}")
+            self._model = model
+            self._scaler = scaler
+            # Set last: is_loaded keys off metadata
+            self._metadata = metadata
             
+            logger.info(
+                "model_loaded",
+                model_type=metadata["model_type"],
+                threshold=round(metadata["optimal_threshold"], 4),
+                precision=round(metadata["test_metrics"]["precision"], 4),
+                recall=round(metadata["test_metrics"]["recall"], 4)
+            )
+        
         except Exception as e:
-            print(f"Error loading model artifacts: {e}")
+            logger.error("model_load_failed", error=str(e))
             raise
     
     def get_model(self):
+        self.load()
         return self._model
     
     def get_scaler(self):
+        self.load()
         return self._scaler
     
     def get_metadata(self) -> Dict[str, Any]:
+        self.load()
         return self._metadata
     
     def get_threshold(self) -> float:
-        return self._metadata['optimal_threshold']
+        return self.get_metadata()['optimal_threshold']
+    
+    def get_feature_names(self) -> List[str]:
+        """Raw input columns in the order the model expects them; Time and Amount are scaled before scoring"""
+        return self.get_metadata().get("feature_names", DEFAULT_FEATURE_NAMES)
     
     def predict(self, features: np.ndarray) -> Tuple[int, float, str]:
-        anomaly_score = self._model.decision_function(features)[0]
+        anomaly_score = self.get_model().decision_function(features)[0]
         threshold = self.get_threshold()
         prediction = 1 if anomaly_score < threshold else 0
         fraud_probability = max(0, min(1, (threshold - anomaly_score) / (threshold + 0.1)))
@@ -70,6 +108,22 @@ class ModelLoader:
             risk_level = "LOW"
         
         return prediction, fraud_probability, risk_level
+    
+    def predict_batch(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorized predict for an (n, n_features) matrix.
+        
+        Returns (predictions, fraud_probabilities, risk_levels, anomaly_scores),
+        matching predict() row for row.
+        """
+        anomaly_scores = self.get_model().decision_function(features)
+        threshold = self.get_threshold()
+        predictions = (anomaly_scores < threshold).astype(np.int8)
+        fraud_probabilities = np.clip((threshold - anomaly_scores) / (threshold + 0.1), 0, 1)
+        risk_levels = np.where(
+            fraud_probabilities >= 0.7, "HIGH",
+            np.where(fraud_probabilities >= 0.3, "MEDIUM", "LOW")
+        )
+        return predictions, fraud_probabilities, risk_levels, anomaly_scores
 
 
 model_loader = ModelLoader()
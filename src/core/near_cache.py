@@ -0,0 +1,145 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+# Rough per-entry cost of the key, tuple and dict slot on top of the value bytes
+ENTRY_OVERHEAD = 200
+
+
+def _entry_size(key: str, value: bytes) -> int:
+    return len(key) + len(value) + ENTRY_OVERHEAD
+
+
+def key_prefix(key: str) -> str:
+    """Key without its last segment: prediction:id:<uuid> -> prediction:id"""
+    prefix, _, _ = key.rpartition(":")
+    return prefix or key
+
+
+class NearCache:
+    """
+    In-process LRU of encoded Redis values, bounded by entry count and bytes.
+
+    Each entry expires with its Redis key, or after `ttl` if that's sooner.
+    Entries are only served while `coherent` is set, i.e. while this worker is
+    subscribed to invalidations; RedisCache clears it when the subscription drops.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.coherent = False
+        # Bumped on every invalidation, so a read that raced one can tell
+        self.generation = 0
+        self.size_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._next_purge = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.coherent:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: bytes, ttl: Optional[float] = None):
+        """Store a value; `ttl` is the key's remaining Redis TTL in seconds, if any"""
+        if not self.coherent:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        size = _entry_size(key, value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.size_bytes += size
+        if len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._evict()
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size_bytes -= _entry_size(key, entry[0])
+        return True
+
+    def _evict(self):
+        # Expired entries go first (at most one full scan per second), then least recently used
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._next_purge = now + 1.0
+            for key in [key for key, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                self._remove(key)
+                self.expirations += 1
+
+        while self._entries and (len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            key, (value, _) = self._entries.popitem(last=False)
+            self.size_bytes -= _entry_size(key, value)
+            self.evictions += 1
+
+    def invalidate(self, keys: Iterable[str]):
+        self.generation += 1
+        for key in keys:
+            if self._remove(key):
+                self.invalidations += 1
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "coherent": self.coherent,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+
+class CacheStats:
+    """Per-key-prefix lookup outcomes for this worker"""
+
+    OUTCOMES = ("local_hits", "remote_hits", "misses")
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, key: str, outcome: str):
+        prefix = key_prefix(key)
+        counts = self._counts.get(prefix)
+        if counts is None:
+            counts = self._counts[prefix] = dict.fromkeys(self.OUTCOMES, 0)
+        counts[outcome] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        result = {}
+        for prefix, counts in self._counts.items():
+            lookups = sum(counts.values())
+            hits = counts["local_hits"] + counts["remote_hits"]
+            result[prefix] = {
+                **counts,
+                "lookups": lookups,
+                "hit_rate": round(hits / lookups * 100, 2),
+                "local_hit_rate": round(counts["local_hits"] / lookups * 100, 2)
+            }
+        return result
@@ -0,0 +1,58 @@
+from typing import Dict, List
+from src.core.config import settings
+from src.core.rollup import BufferedRollup
+from src.db.database import AsyncSessionLocal
+from src.db import crud
+
+_RISK_COLUMNS = {"LOW": "low_count", "MEDIUM": "medium_count", "HIGH": "high_count"}
+
+
+class PredictionStatsAggregator(BufferedRollup):
+    """
+    Accumulates per-(minute, model_version) prediction counts in memory and writes
+    them to prediction_stats with one bulk upsert per flush interval, so single-row
+    predictions don't all queue on the current minute's rollup row lock.
+
+    Counts still buffered when a worker is killed never reach prediction_stats;
+    `python -m src.cli backfill-stats` rebuilds a time range from predictions.
+    """
+
+    name = "prediction_stats"
+    key_columns = ("model_version",)
+
+    def _empty_row(self) -> Dict[str, float]:
+        return {
+            "total_count": 0,
+            "fraud_count": 0,
+            "low_count": 0,
+            "medium_count": 0,
+            "high_count": 0,
+            "fraud_probability_sum": 0.0,
+            "anomaly_score_sum": 0.0
+        }
+
+    async def _upsert(self, rows: List[dict]):
+        async with AsyncSessionLocal() as db:
+            await crud.upsert_prediction_stats(db, rows)
+
+    def record(
+        self,
+        model_version: str,
+        prediction: bool,
+        risk_level: str,
+        fraud_probability: float,
+        anomaly_score: float
+    ):
+        row = self._row(model_version)
+
+        row["total_count"] += 1
+        if prediction:
+            row["fraud_count"] += 1
+        risk_column = _RISK_COLUMNS.get(risk_level)
+        if risk_column:
+            row[risk_column] += 1
+        row["fraud_probability_sum"] += fraud_probability
+        row["anomaly_score_sum"] += anomaly_score
+
+
+prediction_stats_aggregator = PredictionStatsAggregator(flush_interval=settings.STATS_FLUSH_INTERVAL)
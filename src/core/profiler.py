@@ -0,0 +1,156 @@
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# (thread name, frames root to leaf); a frame is (function, file, first line)
+Frame = Tuple[str, str, int]
+Stack = Tuple[str, Tuple[Frame, ...]]
+
+
+class ProfilerBusyError(Exception):
+    pass
+
+
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the app, site-packages or the stdlib, so stacks stay readable"""
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    for prefix in (os.getcwd() + os.sep, _STDLIB):
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread snapshots every other thread's Python
+    stack with sys._current_frames() at a fixed interval and counts identical
+    stacks. Nothing is instrumented, so code runs at full speed between samples.
+
+    Overhead is one snapshot per interval, taken while holding the GIL: about
+    50-150 us with the app's handful of threads (mean_sample_us in overhead(),
+    which includes waiting for the GIL), so around 1% of one core at the
+    default 10 ms interval and at most ~3% at the PROFILER_MIN_INTERVAL_MS
+    floor. Runs are capped at PROFILER_MAX_SECONDS and only one per process
+    is allowed at a time.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.sampling_seconds = 0.0
+        self._stop = threading.Event()
+        self._labels: Dict[object, Frame] = {}
+
+    def _frame(self, code) -> Frame:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (code.co_qualname, _short_path(code.co_filename), code.co_firstlineno)
+        return label
+
+    def _sample(self, own_ident: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[(names.get(ident, f"thread-{ident}"), tuple(stack))] += 1
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            start = time.perf_counter()
+            self._sample(own_ident)
+            self.sampling_seconds += time.perf_counter() - start
+            self.sample_count += 1
+
+    async def profile(self, seconds: float) -> "StackSampler":
+        """Sample for `seconds` without blocking the event loop"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running in this worker")
+        thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        try:
+            thread.start()
+            await asyncio.sleep(seconds)
+        finally:
+            self._stop.set()
+            thread.join()
+            self._lock.release()
+        return self
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: `thread;root;...;leaf count` per line,
+        for flamegraph.pl, speedscope or inferno"""
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = ";".join(f"{name} ({path}:{line})" for name, path, line in stack)
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        """speedscope file with one sampled profile per thread (https://www.speedscope.app)"""
+        frames: List[dict] = []
+        frame_index: Dict[Frame, int] = {}
+        profiles: Dict[str, dict] = {}
+        for (thread, stack), count in self.samples.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indices.append(frame_index[frame])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": thread, "unit": "seconds", "startValue": 0, "endValue": 0,
+                "samples": [], "weights": []
+            })
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+            profile["endValue"] += count * self.interval
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "fraud-detection-api",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": sorted(profiles.values(), key=lambda profile: profile["name"] != "MainThread")
+        }
+
+    def overhead(self) -> dict:
+        return {
+            "samples": self.sample_count,
+            "interval_ms": self.interval * 1000,
+            "mean_sample_us": round(self.sampling_seconds / self.sample_count * 1e6, 1) if self.sample_count else 0.0
+        }
+
+
+def dump_tasks(limit: int = 20) -> List[dict]:
+    """Every asyncio task on the running loop with where it is suspended, innermost frame last"""
+    tasks = []
+    for task in asyncio.all_tasks():
+        coro = task.get_coro()
+        tasks.append({
+            "name": task.get_name(),
+            "coroutine": getattr(coro, "__qualname__", repr(coro)),
+            "done": task.done(),
+            "stack": [
+                f"{frame.f_code.co_qualname} ({_short_path(frame.f_code.co_filename)}:{frame.f_lineno})"
+                for frame in task.get_stack(limit=limit)
+            ]
+        })
+    return sorted(tasks, key=lambda task: task["name"])
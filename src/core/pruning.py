@@ -0,0 +1,219 @@
+import copy
+import json
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+import numpy as np
+from sklearn.ensemble import IsolationForest
+# Same private helpers score_samples relies on; scikit-learn is pinned
+from sklearn.ensemble._iforest import _average_path_length
+from sklearn.metrics import auc, precision_recall_curve, roc_auc_score
+from src.core.config import settings
+from src.core.model_loader import DEFAULT_FEATURE_NAMES
+from src.core.retraining import Candidate, write_artifacts
+import structlog
+
+logger = structlog.get_logger()
+
+
+class PruningError(Exception):
+    pass
+
+
+class SizeReport(NamedTuple):
+    n_estimators: int
+    threshold: float
+    agreement: float
+    # Only with labels
+    precision: Optional[float]
+    recall: Optional[float]
+    roc_auc: Optional[float]
+    pr_auc: Optional[float]
+    # Median decision_function time for one row, and per row in a 1000-row batch
+    latency_single_ms: float
+    latency_batch_us: float
+    within_tolerance: bool
+
+
+def tree_depths(model: IsolationForest, features: np.ndarray) -> np.ndarray:
+    """(n_samples, n_trees) path length of each row in each tree, the terms
+    IsolationForest.score_samples averages"""
+    depths = np.empty((len(features), len(model.estimators_)), order="F")
+    for i, (tree, columns) in enumerate(zip(model.estimators_, model.estimators_features_)):
+        leaves = tree.apply(np.ascontiguousarray(features[:, columns], dtype=np.float32), check_input=False)
+        depths[:, i] = model._decision_path_lengths[i][leaves] + model._average_path_length_per_tree[i][leaves] - 1.0
+    return depths
+
+
+def decision_scores(depth_sums: np.ndarray, n_trees: int, model: IsolationForest) -> np.ndarray:
+    """decision_function of a forest from the summed depths of its n_trees trees"""
+    return -(2 ** (-depth_sums / (n_trees * _average_path_length([model._max_samples])[0]))) - model.offset_
+
+
+def greedy_order(depths: np.ndarray) -> List[int]:
+    """
+    Trees in the order a greedy forward selection adds them: at each step the tree
+    whose addition brings the subset's mean path length closest (least squares)
+    to the full forest's. Every candidate is tried at once per step, so the
+    whole order costs O(n_samples * n_trees^2) arithmetic and no re-scoring.
+    """
+    n_trees = depths.shape[1]
+    target = depths.mean(axis=1)
+    remaining = list(range(n_trees))
+    order, current = [], np.zeros(len(depths))
+    for size in range(1, n_trees + 1):
+        candidates = depths[:, remaining]
+        errors = (((current[:, None] + candidates) / size - target[:, None]) ** 2).sum(axis=0)
+        best = remaining.pop(int(np.argmin(errors)))
+        order.append(best)
+        current += depths[:, best]
+    return order
+
+
+def prune(model: IsolationForest, trees: List[int]) -> IsolationForest:
+    """Copy of the forest keeping only `trees`; offset_ is kept, so thresholds need recalibrating"""
+    pruned = copy.copy(model)
+    pruned.estimators_ = [model.estimators_[i] for i in trees]
+    pruned.estimators_features_ = [model.estimators_features_[i] for i in trees]
+    pruned._decision_path_lengths = [model._decision_path_lengths[i] for i in trees]
+    pruned._average_path_length_per_tree = [model._average_path_length_per_tree[i] for i in trees]
+    pruned._seeds = np.asarray(model._seeds)[trees]
+    pruned.n_estimators = len(trees)
+    return pruned
+
+
+def _latency(model: IsolationForest, features: np.ndarray) -> tuple:
+    row, batch = features[:1], features[:1000]
+    timings = []
+    for _ in range(30):
+        start = time.perf_counter()
+        model.decision_function(row)
+        timings.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    model.decision_function(batch)
+    return float(np.median(timings)) * 1000, (time.perf_counter() - start) / len(batch) * 1e6
+
+
+def _label_metrics(scores: np.ndarray, threshold: float, labels: Optional[np.ndarray]) -> tuple:
+    """(precision, recall, roc_auc, pr_auc), all None without labels"""
+    if labels is None:
+        return None, None, None, None
+    flagged = scores < threshold
+    true_positives = int((flagged & (labels == 1)).sum())
+    precision_curve, recall_curve, _ = precision_recall_curve(labels, -scores)
+    return (
+        true_positives / int(flagged.sum()) if flagged.any() else 0.0,
+        true_positives / int(labels.sum()),
+        float(roc_auc_score(labels, -scores)),
+        float(auc(recall_curve, precision_curve))
+    )
+
+
+def size_report(
+    model: IsolationForest,
+    features: np.ndarray,
+    threshold: float,
+    labels: Optional[np.ndarray] = None,
+    sizes: Optional[List[int]] = None,
+    auc_tolerance: float = 0.005,
+    min_agreement: float = 0.995
+) -> tuple:
+    """
+    Greedy tree order and the accuracy and latency of its prefixes at each size
+    on the given held-out rows (model input, already scaled).
+
+    Each pruned forest gets the threshold that flags as many held-out rows as
+    the full forest does at `threshold`, so agreement compares verdicts at the
+    same alert volume. With labels, ROC-AUC and PR-AUC must stay within
+    auc_tolerance of the full forest's as well.
+    """
+    if labels is not None and labels.min() == labels.max():
+        raise PruningError("Labels must cover both classes")
+
+    depths = tree_depths(model, features)
+    order = greedy_order(depths)
+    n_trees = len(order)
+    full_scores = decision_scores(depths.sum(axis=1), n_trees, model)
+    full_verdicts = full_scores < threshold
+    flagged_fraction = full_verdicts.mean()
+    *_, full_roc, full_pr = _label_metrics(full_scores, threshold, labels)
+
+    sizes = sorted(set(sizes or range(10, n_trees + 1, 10)) | {n_trees})
+    prefix_sums = np.cumsum(depths[:, order], axis=1)
+    reports = []
+    for size in sizes:
+        scores = decision_scores(prefix_sums[:, size - 1], size, model)
+        if size == n_trees:
+            size_threshold = threshold
+        else:
+            # Same alert volume as the full forest; with nothing flagged, sit just below the lowest score
+            size_threshold = (
+                float(np.quantile(scores, flagged_fraction)) if flagged_fraction > 0
+                else float(np.nextafter(scores.min(), -np.inf))
+            )
+        precision, recall, roc, pr = _label_metrics(scores, size_threshold, labels)
+        agreement = float(((scores < size_threshold) == full_verdicts).mean())
+        within = agreement >= min_agreement and (
+            labels is None or (full_roc - roc <= auc_tolerance and full_pr - pr <= auc_tolerance)
+        )
+        latency_single, latency_batch = _latency(prune(model, order[:size]), features)
+        reports.append(SizeReport(
+            size, size_threshold, agreement, precision, recall, roc, pr, latency_single, latency_batch, within
+        ))
+        logger.info("pruning_size_evaluated", **reports[-1]._asdict())
+    return order, reports
+
+
+def smallest_within_tolerance(reports: List[SizeReport]) -> SizeReport:
+    """Smallest size from which every larger size is also within tolerance"""
+    chosen = reports[-1]
+    for report in reversed(reports):
+        if not report.within_tolerance:
+            break
+        chosen = report
+    return chosen
+
+
+def write_version(
+    directory: Path,
+    pruned: IsolationForest,
+    chosen: SizeReport,
+    full: SizeReport,
+    source_metadata: dict,
+    scaler,
+    n_samples_eval: int
+) -> dict:
+    """Write the pruned forest in the serving format with its recalibrated threshold"""
+    metrics = {
+        name: getattr(chosen, name) for name in ("precision", "recall", "roc_auc", "pr_auc")
+        if getattr(chosen, name) is not None
+    }
+    if "precision" not in metrics:
+        # Without labels, verdicts match the source model's on `agreement` of rows
+        metrics = {**source_metadata["test_metrics"]}
+    metrics["agreement"] = chosen.agreement
+
+    # Scores track the full forest's, so its drift reference still applies
+    reference_path = Path(settings.DRIFT_REFERENCE_PATH)
+    reference = json.loads(reference_path.read_text()) if reference_path.exists() else None
+
+    metadata = write_artifacts(
+        directory,
+        Candidate({"contamination": pruned.contamination}, pruned, chosen.threshold, metrics),
+        scaler,
+        source_metadata.get("feature_names", DEFAULT_FEATURE_NAMES),
+        source_metadata.get("n_samples_train", 0),
+        n_samples_eval,
+        reference,
+        extra_metadata={
+            "pruned_from": {
+                "n_estimators": full.n_estimators,
+                "threshold": full.threshold,
+                "latency_single_ms": full.latency_single_ms,
+                "latency_batch_us": full.latency_batch_us
+            }
+        }
+    )
+    if reference is None:
+        logger.warning("drift_reference_missing", path=str(reference_path))
+    return metadata
@@ -1,61 +1,388 @@
 from fastapi import HTTPException, Request
-from typing import Callable
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import math
 import time
 from src.core.cache import cache
+from src.core.config import settings
+from src.core.middleware import get_route_template
 import structlog
 
 logger = structlog.get_logger()
 
+# GCRA over any number of (limit, period) windows, checked and updated in one
+# server-side call. Each key stores the window's theoretical arrival time (TAT)
+# in milliseconds and always carries a TTL, so a crash can't leave keys behind.
+#
+# ARGV[1] is the number of requests to take: positive takes up to that many
+# (fewer if a window runs out), negative gives unused requests back.
+#
+# KEYS: one per window. ARGV: count, limit_1, period_ms_1, limit_2, period_ms_2, ...
+# Returns: {granted, retry_after_ms, remaining_1, reset_ms_1, remaining_2, reset_ms_2, ...}
+GCRA_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+local requested = tonumber(ARGV[1])
+local granted = requested
+local retry_after = 0
+local tats = {}
+
+for i = 1, #KEYS do
+    local limit = tonumber(ARGV[2 * i])
+    local period = tonumber(ARGV[2 * i + 1])
+    local interval = period / limit
+    local tat = tonumber(redis.call('GET', KEYS[i])) or now
+    if tat < now then
+        tat = now
+    end
+    if requested > 0 then
+        local available = math.floor((now + period - tat) / interval + 1e-9)
+        if available < granted then
+            granted = math.max(available, 0)
+        end
+        if available < 1 then
+            retry_after = math.max(retry_after, tat + interval - period - now)
+        end
+    end
+    tats[i] = tat
+end
+
+local result = {granted, math.ceil(retry_after)}
+for i = 1, #KEYS do
+    local limit = tonumber(ARGV[2 * i])
+    local period = tonumber(ARGV[2 * i + 1])
+    local interval = period / limit
+    local tat = tats[i]
+    if granted ~= 0 then
+        tat = math.max(tat + granted * interval, now)
+        if tat > now then
+            redis.call('SET', KEYS[i], string.format('%.3f', tat), 'PX', math.max(1, math.ceil(tat - now)))
+        else
+            redis.call('DEL', KEYS[i])
+        end
+    end
+    local remaining = math.floor((now + period - tat) / interval + 1e-9)
+    if remaining < 0 then
+        remaining = 0
+    end
+    table.insert(result, remaining)
+    table.insert(result, math.ceil(tat - now))
+end
+return result
+"""
+
+
+class LocalGCRA:
+    """In-process GCRA with the same semantics as GCRA_SCRIPT, used when Redis is unreachable"""
+    
+    def __init__(self):
+        self._tats: Dict[Tuple[str, str], float] = {}
+    
+    def take(self, key: str, windows) -> Tuple[bool, float, List[Tuple[int, int, float]]]:
+        """Take one request; returns (allowed, retry_after_s, [(limit, remaining, reset_s), ...])"""
+        now = time.monotonic()
+        tats = []
+        allowed = True
+        retry_after = 0.0
+        for name, limit, period in windows:
+            interval = period / limit
+            tat = max(self._tats.get((key, name), now), now)
+            if tat + interval - period > now + 1e-9:
+                allowed = False
+                retry_after = max(retry_after, tat + interval - period - now)
+            tats.append(tat)
+        
+        state = []
+        for (name, limit, period), tat in zip(windows, tats):
+            interval = period / limit
+            if allowed:
+                tat += interval
+                self._tats[(key, name)] = tat
+            remaining = max(int((now + period - tat) / interval + 1e-9), 0)
+            state.append((limit, remaining, tat - now))
+        return allowed, retry_after, state
+    
+    def prune(self):
+        now = time.monotonic()
+        for key in [key for key, tat in self._tats.items() if tat <= now]:
+            del self._tats[key]
+
+
 class RateLimiter:
     def __init__(
         self,
         requests_per_minute: int = 100,
-        requests_per_hour: int = 1000
+        requests_per_hour: int = 1000,
+        local_workers: int = 1
     ):
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
+        self.windows = (
+            ("minute", requests_per_minute, 60),
+            ("hour", requests_per_hour, 3600),
+        )
+        # Per-worker share of each limit, enforced locally while Redis is unreachable
+        self.local_windows = tuple(
+            (name, max(1, limit // max(1, local_workers)), period)
+            for name, limit, period in self.windows
+        )
+        self.local = LocalGCRA()
+        self.policy = ", ".join(f"{limit};w={period}" for _, limit, period in self.windows)
+    
+    def _keys(self, api_key: str, endpoint: str) -> List[str]:
+        # Hash tag keeps all windows in one cluster slot for the multi-key script
+        tag = f"{{{api_key}:{endpoint}}}"
+        return [f"ratelimit:{tag}:{name}" for name, _, _ in self.windows]
+    
+    def _args(self, count: int) -> List[int]:
+        args: List[int] = [count]
+        for _, limit, period in self.windows:
+            args.extend((limit, period * 1000))
+        return args
+    
+    def _headers(self, limit: int, remaining: int, reset_seconds: int) -> Dict[str, str]:
+        return {
+            "RateLimit-Limit": str(limit),
+            "RateLimit-Remaining": str(remaining),
+            "RateLimit-Reset": str(reset_seconds),
+            "RateLimit-Policy": self.policy
+        }
+    
+    def _result(self, allowed: bool, retry_after_s: float, windows) -> dict:
+        """Build headers from [(name, limit, remaining, reset_s)] and raise 429 if not allowed"""
+        # Report the most constrained window
+        name, limit, remaining, reset_s = min(windows, key=lambda window: window[2])
+        headers = self._headers(limit, remaining, math.ceil(reset_s))
+        
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(retry_after_s)))
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {limit} requests per {name}",
+                headers=headers
+            )
+        
+        return {
+            "minute_remaining": windows[0][2],
+            "hour_remaining": windows[1][2],
+            "headers": headers
+        }
+    
+    def _check_local(self, api_key: str, endpoint: str) -> dict:
+        logger.debug("rate_limit_local", reason="redis_unavailable")
+        allowed, retry_after, state = self.local.take(f"{api_key}:{endpoint}", self.local_windows)
+        windows = [
+            (name, limit, remaining, reset_s)
+            for (name, _, _), (limit, remaining, reset_s) in zip(self.local_windows, state)
+        ]
+        return self._result(allowed, retry_after, windows)
     
     async def check_rate_limit(self, api_key: str, endpoint: str):
-        # If Redis is not available, skip rate limiting
-        if not cache.redis_available:
-            logger.debug("rate_limit_skipped", reason="redis_unavailable")
-            return {
-                "minute_remaining": self.requests_per_minute,
-                "hour_remaining": self.requests_per_hour
-            }
+        """
+        Check and consume one request against every window in a single Redis round trip.
+        
+        Windows use GCRA, so a full window's quota can be used as a burst and is
+        then replenished smoothly instead of resetting at fixed clock boundaries.
+        Without Redis, each worker enforces its share of the limits locally.
+        """
+        result = None
+        if cache.redis_available:
+            result = await cache.run_script(GCRA_SCRIPT, self._keys(api_key, endpoint), self._args(1))
+        if result is None:
+            return self._check_local(api_key, endpoint)
+        
+        granted, retry_after_ms = int(result[0]), int(result[1])
+        windows = [
+            (name, limit, int(result[2 + 2 * i]), int(result[3 + 2 * i]) / 1000)
+            for i, (name, limit, _) in enumerate(self.windows)
+        ]
+        return self._result(granted >= 1, retry_after_ms / 1000, windows)
+    
+    def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+
+
+class _Lease:
+    __slots__ = ("tokens", "last_used", "remaining", "reset_s", "retry_at", "pending")
+    
+    def __init__(self):
+        self.tokens = 0
+        self.last_used = 0.0
+        self.remaining: List[int] = []
+        self.reset_s: List[float] = []
+        self.retry_at = 0.0
+        self.pending: Optional[asyncio.Future] = None
+
+
+class HybridRateLimiter(RateLimiter):
+    """
+    Serves most requests from a per-worker lease of quota, so steady traffic
+    doesn't touch Redis on the request path.
+    
+    Leases of up to `lease_size` requests are taken from the shared GCRA windows
+    with the same script as RateLimiter, so Redis is charged before anything is
+    admitted. A background task tops up busy leases and gives back the tokens of
+    leases idle for `lease_ttl`, sending every script call of a pass in one
+    pipelined round trip. A request only waits on Redis when its lease is empty.
+    
+    Accuracy, for W workers sharing a limit L:
+    - Never admits more than L per window while Redis is reachable, because
+      every admitted request was charged to Redis as part of a lease.
+    - May reject early by up to (W - 1) * lease_size requests: the tokens that
+      can sit in other workers' leases until they are used or given back, at
+      most lease_ttl + sync_interval later.
+    - Without Redis, each worker admits L // RATE_LIMIT_LOCAL_WORKERS on its own.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: int = 100,
+        requests_per_hour: int = 1000,
+        local_workers: int = 1,
+        lease_size: int = 10,
+        lease_ttl: float = 5.0,
+        sync_interval: float = 1.0
+    ):
+        super().__init__(requests_per_minute, requests_per_hour, local_workers)
+        self.lease_size = max(1, min(lease_size, requests_per_minute, requests_per_hour))
+        self.lease_ttl = lease_ttl
+        self.sync_interval = sync_interval
+        self._leases: Dict[Tuple[str, str], _Lease] = {}
+        self._task: Optional[asyncio.Task] = None
+    
+    def _apply(self, lease: _Lease, result: list, now: float):
+        granted = int(result[0])
+        lease.tokens += max(granted, 0)
+        lease.remaining = [int(result[2 + 2 * i]) for i in range(len(self.windows))]
+        lease.reset_s = [int(result[3 + 2 * i]) / 1000 for i in range(len(self.windows))]
+        if granted <= 0:
+            lease.retry_at = now + int(result[1]) / 1000
+    
+    async def _acquire(self, key: Tuple[str, str], lease: _Lease) -> bool:
+        """Fetch a lease on the request path; concurrent requests share one fetch"""
+        if lease.pending is not None:
+            # A failed fetch fails for every request that waited on it
+            return await lease.pending
         
-        current_time = int(time.time())
+        lease.pending = asyncio.get_running_loop().create_future()
+        ok = False
+        try:
+            result = await cache.run_script(GCRA_SCRIPT, self._keys(*key), self._args(self.lease_size))
+            if result is not None:
+                self._apply(lease, result, time.monotonic())
+                ok = True
+            return ok
+        finally:
+            lease.pending.set_result(ok)
+            lease.pending = None
+    
+    async def check_rate_limit(self, api_key: str, endpoint: str):
+        if not cache.redis_available:
+            return self._check_local(api_key, endpoint)
         
-        minute_key = f"ratelimit:{api_key}:{endpoint}:minute:{current_time // 60}"
-        hour_key = f"ratelimit:{api_key}:{endpoint}:hour:{current_time // 3600}"
+        key = (api_key, endpoint)
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease()
         
-        minute_count = await cache.incr(minute_key)
-        if minute_count == 1:
-            await cache.expire(minute_key, 60)
+        now = time.monotonic()
+        lease.last_used = now
+        if lease.tokens <= 0 and now >= lease.retry_at:
+            if not await self._acquire(key, lease):
+                return self._check_local(api_key, endpoint)
         
-        if minute_count > self.requests_per_minute:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Rate limit exceeded: {self.requests_per_minute} requests per minute"
-            )
+        allowed = lease.tokens > 0
+        if allowed:
+            lease.tokens -= 1
+        windows = [
+            (name, limit, lease.tokens + remaining, reset_s)
+            for (name, limit, _), remaining, reset_s in zip(self.windows, lease.remaining, lease.reset_s)
+        ]
+        return self._result(allowed, max(lease.retry_at - now, 0), windows)
+    
+    async def sync(self):
+        """One reconciliation pass: top up busy leases and give back idle ones in one round trip"""
+        now = time.monotonic()
+        low_water = self.lease_size // 2
+        calls = []
+        for key, lease in list(self._leases.items()):
+            if lease.pending is not None:
+                continue
+            if now - lease.last_used >= self.lease_ttl:
+                # Take the tokens out before the await so requests can't spend them meanwhile
+                refund, lease.tokens = lease.tokens, 0
+                del self._leases[key]
+                if refund > 0:
+                    calls.append((key, lease, -refund))
+            elif lease.tokens <= low_water and now >= lease.retry_at:
+                calls.append((key, lease, self.lease_size - lease.tokens))
         
-        hour_count = await cache.incr(hour_key)
-        if hour_count == 1:
-            await cache.expire(hour_key, 3600)
+        self.local.prune()
+        if not calls:
+            return
         
-        if hour_count > self.requests_per_hour:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Rate limit exceeded: {self.requests_per_hour} requests per hour"
-            )
+        # If this round trip fails, refunded tokens stay charged: the limiter errs towards rejecting
+        results = await cache.run_script_batch(
+            GCRA_SCRIPT,
+            [(self._keys(*key), self._args(count)) for key, _, count in calls]
+        )
+        if results is None:
+            return
         
-        return {
-            "minute_remaining": self.requests_per_minute - minute_count,
-            "hour_remaining": self.requests_per_hour - hour_count
-        }
+        for (key, lease, count), result in zip(calls, results):
+            if count > 0:
+                self._apply(lease, result, now)
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("rate_limit_sync_failed", error=str(e))
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Give back whatever this worker still holds
+        for lease in self._leases.values():
+            lease.last_used = float("-inf")
+        await self.sync()
+
+
+def create_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_MODE == "hybrid":
+        return HybridRateLimiter(
+            requests_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+            requests_per_hour=settings.RATE_LIMIT_PER_HOUR,
+            local_workers=settings.RATE_LIMIT_LOCAL_WORKERS,
+            lease_size=settings.RATE_LIMIT_LEASE_SIZE,
+            lease_ttl=settings.RATE_LIMIT_LEASE_TTL,
+            sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL
+        )
+    return RateLimiter(
+        requests_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+        requests_per_hour=settings.RATE_LIMIT_PER_HOUR,
+        local_workers=settings.RATE_LIMIT_LOCAL_WORKERS
+    )
 
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limiter()
 
 async def check_rate_limit(request: Request, api_key: str):
-    endpoint = request.url.path
-    return await rate_limiter.check_rate_limit(api_key, endpoint)
+    # Route template, so /predictions/{prediction_id} shares one budget across ids
+    endpoint = f"{request.method}:{get_route_template(request)}"
+    result = await rate_limiter.check_rate_limit(api_key, endpoint)
+    request.state.rate_limit_headers = result["headers"]
+    return result
@@ -0,0 +1,325 @@
+import itertools
+import json
+import multiprocessing
+import pickle
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.metrics import auc, f1_score, precision_recall_curve, precision_score, recall_score, roc_auc_score
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core import drift
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.db import crud
+import structlog
+
+logger = structlog.get_logger()
+
+# Small grid around the notebook's parameters (100 trees, max_samples="auto" = 256)
+PARAM_GRID = {
+    "n_estimators": [100, 200],
+    "max_samples": [256, 1024],
+    "max_features": [1.0, 0.75],
+}
+
+# Artifact names read by ModelLoader (see MODEL_PATH, SCALER_PATH, METADATA_PATH)
+MODEL_FILE = "isolation_forest_model.pkl"
+SCALER_FILE = "scaler.pkl"
+METADATA_FILE = "model_metadata.json"
+DRIFT_REFERENCE_FILE = "drift_reference.json"
+
+
+class RetrainingError(Exception):
+    pass
+
+
+class Reservoir:
+    """Uniform sample of at most `capacity` rows from a stream of any length (Algorithm R)"""
+
+    def __init__(self, capacity: int, n_features: int, seed: int = 42):
+        self.capacity = capacity
+        self.rows = np.empty((capacity, n_features), dtype=np.float64)
+        self.labels = np.empty(capacity, dtype=np.int8)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, rows: np.ndarray, labels: Optional[np.ndarray] = None):
+        if labels is None:
+            labels = np.zeros(len(rows), dtype=np.int8)
+        positions = np.arange(self.seen, self.seen + len(rows))
+        self.seen += len(rows)
+
+        # Row t goes to slot t while there's room, then replaces a random slot with probability capacity / (t + 1)
+        slots = np.where(positions < self.capacity, positions, self._rng.integers(0, positions + 1))
+        keep = slots < self.capacity
+        self.rows[slots[keep]] = rows[keep]
+        self.labels[slots[keep]] = labels[keep]
+
+    @property
+    def size(self) -> int:
+        return min(self.seen, self.capacity)
+
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.rows[:self.size], self.labels[:self.size]
+
+
+class TrainingData(NamedTuple):
+    # Raw features in feature_names order
+    train: np.ndarray
+    eval_features: np.ndarray
+    eval_labels: np.ndarray
+    # Fit on every streamed Amount, as the notebook's scaler was
+    scaler: StandardScaler
+    rows_seen: int
+
+
+class Candidate(NamedTuple):
+    params: dict
+    model: IsolationForest
+    threshold: float
+    metrics: dict
+
+
+def _to_matrix(features: List[dict], feature_names: List[str]) -> np.ndarray:
+    return np.array([[row.get(name, np.nan) for name in feature_names] for row in features], dtype=np.float64)
+
+
+def scale(features: np.ndarray, scaler: StandardScaler, feature_names: List[str]) -> np.ndarray:
+    """Model input: Time and Amount through the scaler, as build_features does"""
+    scaled = features.copy()
+    for name in ("Time", "Amount"):
+        i = feature_names.index(name)
+        scaled[:, i] = scaler.transform(scaled[:, i:i + 1]).ravel()
+    return scaled
+
+
+async def collect_labeled_sample(db: AsyncSession, feature_names: List[str], max_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Uniform sample of at most max_rows predictions with feedback: raw features and latest labels"""
+    labeled = Reservoir(max_rows, len(feature_names))
+    async for chunk in crud.stream_labeled_features(db, settings.RETRAIN_STREAM_CHUNK_SIZE):
+        rows = _to_matrix([features for features, _ in chunk], feature_names)
+        labels = np.array([label for _, label in chunk], dtype=np.int8)
+        finite = np.isfinite(rows).all(axis=1)
+        labeled.add(rows[finite], labels[finite])
+    return labeled.data()
+
+
+async def collect_training_data(
+    db: AsyncSession,
+    feature_names: List[str],
+    max_train_rows: int = settings.RETRAIN_MAX_TRAIN_ROWS,
+    max_eval_rows: int = settings.RETRAIN_MAX_EVAL_ROWS,
+    since: Optional[datetime] = None
+) -> TrainingData:
+    """
+    Stream stored predictions into two bounded samples: unlabeled rows to fit on and
+    rows with feedback to evaluate on, kept apart so no candidate is scored on rows
+    it was trained on. Memory is fixed by the sample sizes, not the table size.
+    """
+    amount = feature_names.index("Amount")
+    scaler = StandardScaler()
+    train = Reservoir(max_train_rows, len(feature_names))
+
+    async for chunk in crud.stream_unlabeled_features(db, settings.RETRAIN_STREAM_CHUNK_SIZE, since):
+        rows = _to_matrix(chunk, feature_names)
+        rows = rows[np.isfinite(rows).all(axis=1)]
+        if len(rows):
+            scaler.partial_fit(rows[:, amount:amount + 1])
+            train.add(rows)
+
+    eval_features, eval_labels = await collect_labeled_sample(db, feature_names, max_eval_rows)
+    train_rows, _ = train.data()
+    logger.info(
+        "retraining_data_collected",
+        train_rows=len(train_rows),
+        rows_seen=train.seen,
+        eval_rows=len(eval_features),
+        eval_fraud=int(eval_labels.sum())
+    )
+    return TrainingData(train_rows, eval_features, eval_labels, scaler, train.seen)
+
+
+def evaluate(scores: np.ndarray, labels: np.ndarray) -> Tuple[float, dict]:
+    """Threshold with the best F1 among score percentiles (as in the notebook) and
+    the metrics at that threshold; lower scores are more anomalous"""
+    best_threshold, best_f1 = float(np.percentile(scores, 50)), -1.0
+    for threshold in np.unique(np.percentile(scores, np.arange(1, 100))):
+        f1 = f1_score(labels, scores < threshold, zero_division=0)
+        if f1 > best_f1:
+            best_threshold, best_f1 = float(threshold), f1
+
+    predicted = scores < best_threshold
+    precision_curve, recall_curve, _ = precision_recall_curve(labels, -scores)
+    return best_threshold, {
+        "precision": float(precision_score(labels, predicted, zero_division=0)),
+        "recall": float(recall_score(labels, predicted, zero_division=0)),
+        "f1_score": float(best_f1),
+        "roc_auc": float(roc_auc_score(labels, -scores)),
+        "pr_auc": float(auc(recall_curve, precision_curve))
+    }
+
+
+# Training matrix for the pool's workers: inherited when forked, not pickled per task
+_train: Optional[np.ndarray] = None
+
+
+def _init_worker(train: np.ndarray):
+    global _train
+    _train = train
+
+
+def _fit(params: dict) -> IsolationForest:
+    # One process per candidate, so each forest fits single-threaded
+    model = IsolationForest(**params, n_jobs=1, random_state=42)
+    model.fit(_train)
+    return model
+
+
+def select_model(
+    train: np.ndarray,
+    eval_features: np.ndarray,
+    eval_labels: np.ndarray,
+    contamination: float,
+    workers: int = 1,
+    grid: Dict[str, list] = PARAM_GRID
+) -> List[Candidate]:
+    """Fit one forest per grid point across `workers` processes and evaluate each on
+    the labeled rows; returns candidates best first, by PR-AUC then F1"""
+    if len(eval_labels) < settings.RETRAIN_MIN_LABELS or eval_labels.min() == eval_labels.max():
+        raise RetrainingError(
+            f"Need at least {settings.RETRAIN_MIN_LABELS} labeled predictions covering both classes, "
+            f"have {len(eval_labels)} ({int(eval_labels.sum())} fraud)"
+        )
+
+    grid_points = [
+        {**dict(zip(grid, values)), "contamination": contamination}
+        for values in itertools.product(*grid.values())
+    ]
+    # max_samples can't exceed the sample size
+    for params in grid_points:
+        if isinstance(params.get("max_samples"), int):
+            params["max_samples"] = min(params["max_samples"], len(train))
+
+    if workers > 1:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        with context.Pool(min(workers, len(grid_points)), initializer=_init_worker, initargs=(train,)) as pool:
+            models = pool.map(_fit, grid_points)
+    else:
+        _init_worker(train)
+        models = [_fit(params) for params in grid_points]
+
+    candidates = []
+    for params, model in zip(grid_points, models):
+        threshold, metrics = evaluate(model.decision_function(eval_features), eval_labels)
+        candidates.append(Candidate(params, model, threshold, metrics))
+        logger.info("retraining_candidate", params=params, threshold=round(threshold, 4), **metrics)
+
+    candidates.sort(key=lambda candidate: (candidate.metrics["pr_auc"], candidate.metrics["f1_score"]), reverse=True)
+    return candidates
+
+
+def write_artifacts(
+    directory: Path,
+    candidate: Candidate,
+    scaler: StandardScaler,
+    feature_names: List[str],
+    n_samples_train: int,
+    n_samples_eval: int,
+    drift_reference: Optional[dict] = None,
+    extra_metadata: Optional[dict] = None
+) -> dict:
+    """Write the model, scaler and metadata in the layout ModelLoader reads, and
+    the drift reference the DriftMonitor compares live traffic with"""
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / MODEL_FILE, "wb") as f:
+        pickle.dump(candidate.model, f)
+    with open(directory / SCALER_FILE, "wb") as f:
+        pickle.dump(scaler, f)
+    if drift_reference is not None:
+        with open(directory / DRIFT_REFERENCE_FILE, "w") as f:
+            json.dump(drift_reference, f)
+
+    metadata = {
+        "model_type": "IsolationForest",
+        "training_date": datetime.now().isoformat(),
+        "n_samples_train": n_samples_train,
+        "n_samples_eval": n_samples_eval,
+        "n_features": len(feature_names),
+        "feature_names": feature_names,
+        "optimal_threshold": candidate.threshold,
+        "contamination_rate": candidate.params["contamination"],
+        "test_metrics": candidate.metrics,
+        "model_parameters": candidate.model.get_params(),
+        **(extra_metadata or {})
+    }
+    with open(directory / METADATA_FILE, "w") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+async def retrain(
+    db: AsyncSession,
+    output_dir: Path = Path(settings.RETRAIN_OUTPUT_DIR),
+    workers: int = 1,
+    since: Optional[datetime] = None,
+    activate: bool = False
+) -> dict:
+    """
+    Fit candidates on stored predictions, pick the best on labeled feedback, write
+    its artifacts to output_dir/<version> and register it as a model version.
+
+    The serving model is scored on the same labeled rows for comparison. Serving
+    switches only when the artifact paths are pointed at the new directory;
+    `activate` just marks the version active in model_versions.
+    """
+    feature_names = model_loader.get_feature_names()
+    data = await collect_training_data(db, feature_names, since=since)
+    if len(data.train) == 0:
+        raise RetrainingError("No unlabeled predictions to train on")
+
+    train = scale(data.train, data.scaler, feature_names)
+    eval_features = scale(data.eval_features, data.scaler, feature_names)
+    contamination = model_loader.get_metadata().get("contamination_rate", "auto")
+    candidates = select_model(train, eval_features, data.eval_labels, contamination, workers)
+    best = candidates[0]
+
+    serving_scores = model_loader.get_model().decision_function(
+        scale(data.eval_features, model_loader.get_scaler(), feature_names)
+    )
+    _, serving_metrics = evaluate(serving_scores, data.eval_labels)
+
+    version = f"retrain-{datetime.utcnow():%Y%m%d%H%M%S}"
+    reference = drift.build_reference(data.train, best.model.decision_function(train), feature_names, settings.DRIFT_BINS)
+    metadata = write_artifacts(
+        output_dir / version, best, data.scaler, feature_names, len(data.train), len(data.eval_labels), reference
+    )
+    await crud.create_model_version(
+        db,
+        version=version,
+        threshold=best.threshold,
+        metrics={
+            **best.metrics,
+            "params": metadata["model_parameters"],
+            "n_samples_train": len(data.train),
+            "n_samples_eval": len(data.eval_labels),
+            "rows_seen": data.rows_seen,
+            "serving_metrics": serving_metrics
+        },
+        is_active=activate
+    )
+    logger.info("retraining_registered", version=version, activate=activate, **best.metrics)
+    return {
+        "version": version,
+        "directory": str(output_dir / version),
+        "threshold": best.threshold,
+        "metrics": best.metrics,
+        "serving_metrics": serving_metrics,
+        "candidates": [
+            {"params": {k: v for k, v in c.params.items() if k != "contamination"}, **c.metrics}
+            for c in candidates
+        ]
+    }
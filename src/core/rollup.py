@@ -0,0 +1,99 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class BufferedRollup:
+    """
+    Per-minute rollup rows accumulated in memory and written with one bulk
+    upsert per flush interval, instead of one write per event.
+
+    Subclasses name the columns that key a row besides the minute
+    (`key_columns`), build empty rows (`_empty_row`) and write drained rows
+    (`_upsert`). Rows of a failed flush are merged back and go out with the next
+    one; rows still buffered when the process dies are lost.
+    """
+
+    name = "rollup"
+    key_columns: Tuple[str, ...] = ()
+    # Merged with max() rather than summed when a failed flush is restored
+    max_columns: FrozenSet[str] = frozenset()
+
+    def __init__(self, flush_interval: float = 10.0):
+        self.flush_interval = flush_interval
+        self._pending: Dict[tuple, Dict[str, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _empty_row(self) -> Dict[str, float]:
+        raise NotImplementedError
+
+    async def _upsert(self, rows: List[dict]):
+        raise NotImplementedError
+
+    def _row(self, *key) -> Dict[str, float]:
+        """The current minute's row for key, created empty on first use"""
+        key = (int(time.time()) // 60, *key)
+        row = self._pending.get(key)
+        if row is None:
+            row = self._pending[key] = self._empty_row()
+        return row
+
+    def drain(self) -> List[dict]:
+        pending, self._pending = self._pending, {}
+        return [
+            {
+                "bucket_start": datetime.utcfromtimestamp(minute * 60),
+                **dict(zip(self.key_columns, key)),
+                **row
+            }
+            for (minute, *key), row in pending.items()
+        ]
+
+    def _restore(self, rows: List[dict]):
+        """Merge rows from a failed flush back so they go out with the next one"""
+        for row in rows:
+            row = dict(row)
+            minute = int((row.pop("bucket_start") - _EPOCH).total_seconds()) // 60
+            key = (minute, *(row.pop(column) for column in self.key_columns))
+            current = self._pending.setdefault(key, self._empty_row())
+            for column, value in row.items():
+                if column in self.max_columns:
+                    current[column] = max(current[column], value)
+                else:
+                    current[column] += value
+
+    async def flush(self):
+        rows = self.drain()
+        if not rows:
+            return
+        try:
+            await self._upsert(rows)
+            logger.debug(f"{self.name}_flushed", rows=len(rows))
+        except Exception as e:
+            logger.warning(f"{self.name}_flush_failed", rows=len(rows), error=str(e))
+            self._restore(rows)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import Dict, Optional
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.core.config import settings
+from src.core.drift import drift_monitor
+from src.core.logging_setup import log_prediction, logger
+from src.core.model_loader import model_loader
+from src.core.prediction_stats import prediction_stats_aggregator
+from src.db import crud
+
+
+def prediction_payload(
+    transaction_id: str,
+    prediction: int,
+    fraud_probability: float,
+    risk_level: str,
+    anomaly_score: float,
+    threshold: float,
+    timestamp: datetime
+) -> dict:
+    """PredictionResponse fields from values we computed ourselves, so no model validation"""
+    return {
+        "transaction_id": transaction_id,
+        "prediction": int(prediction),
+        "fraud_probability": round(float(fraud_probability), 4),
+        "risk_level": risk_level,
+        "anomaly_score": round(float(anomaly_score), 4),
+        "threshold": round(float(threshold), 4),
+        "timestamp": timestamp,
+        "model_version": settings.APP_VERSION
+    }
+
+
+def build_features(features: Dict[str, float]) -> np.ndarray:
+    """Model input row: V1-V28, then Time and Amount scaled separately (matching training)"""
+    scaler = model_loader.get_scaler()
+    time_scaled = scaler.transform([[features["Time"]]])[0][0]
+    amount_scaled = scaler.transform([[features["Amount"]]])[0][0]
+    return np.array([[features[f"V{i}"] for i in range(1, 29)] + [time_scaled, amount_scaled]])
+
+
+async def score_transaction(
+    db: AsyncSession,
+    transaction_id: str,
+    features: Dict[str, float],
+    timestamp: Optional[datetime] = None
+) -> dict:
+    """
+    Score one transaction, log it and store it; the pipeline behind every single-row
+    entry point (REST and gRPC). `features` holds V1-V28, Time and Amount.
+
+    Storing is best effort: the prediction is returned even if the database is down.
+    """
+    anomaly_score = model_loader.get_model().decision_function(build_features(features))[0]
+    threshold = model_loader.get_threshold()
+    if drift_monitor.enabled:
+        drift_monitor.record(np.array([[features[name] for name in model_loader.get_feature_names()]]), anomaly_score)
+
+    prediction = 1 if anomaly_score < threshold else 0
+    fraud_probability = max(0, min(1, (threshold - anomaly_score) / (threshold + 0.1)))
+
+    if fraud_probability >= 0.7:
+        risk_level = "HIGH"
+    elif fraud_probability >= 0.3:
+        risk_level = "MEDIUM"
+    else:
+        risk_level = "LOW"
+
+    log_prediction(
+        transaction_id=transaction_id,
+        prediction=bool(prediction),
+        probability=float(fraud_probability),
+        risk_level=risk_level
+    )
+
+    try:
+        await crud.create_prediction(
+            db=db,
+            transaction_id=transaction_id,
+            prediction=bool(prediction),
+            fraud_probability=float(fraud_probability),
+            risk_level=risk_level,
+            anomaly_score=float(anomaly_score),
+            threshold=float(threshold),
+            model_version=settings.APP_VERSION,
+            features=features
+        )
+        prediction_stats_aggregator.record(
+            settings.APP_VERSION, bool(prediction), risk_level, float(fraud_probability), float(anomaly_score)
+        )
+    except Exception as db_error:
+        logger.warning("database_save_failed", error=str(db_error), transaction_id=transaction_id)
+        # Leave the session usable for whatever the caller does with it next
+        try:
+            await db.rollback()
+        except Exception:
+            pass
+
+    return prediction_payload(
+        transaction_id,
+        prediction,
+        fraud_probability,
+        risk_level,
+        anomaly_score,
+        threshold,
+        timestamp or datetime.now()
+    )
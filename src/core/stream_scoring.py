@@ -0,0 +1,172 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter, ValidationError
+from starlette.websockets import WebSocket, WebSocketDisconnect
+from src.api.schemas import PredictionRequest
+from src.core import columnar
+from src.core.config import settings
+from src.core.logging_setup import log_prediction, logger
+from src.core.model_loader import model_loader
+from src.core.scoring import prediction_payload
+from src.db.database import AsyncSessionLocal
+from src.db import crud
+
+_request_adapter = TypeAdapter(PredictionRequest)
+
+
+def _transaction_id(message) -> Optional[str]:
+    """Best-effort transaction_id of a frame that failed validation, to tag the error"""
+    try:
+        frame = orjson.loads(message)
+    except orjson.JSONDecodeError:
+        return None
+    transaction_id = frame.get("transaction_id") if isinstance(frame, dict) else None
+    return transaction_id if isinstance(transaction_id, str) else None
+
+
+class ScoringChannel:
+    """
+    Scores PredictionRequest frames from one WebSocket connection and answers each
+    with a PredictionResponse frame carrying its transaction_id.
+
+    Clients may pipeline frames without waiting for answers. Frames queued while a
+    batch is being scored are scored together in the next one (up to
+    max_batch_size), so throughput rises with load without holding a lone frame
+    back. At most max_in_flight frames may be unanswered; past that the channel
+    stops reading and TCP pushes back on the client.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_in_flight: int = settings.WS_MAX_IN_FLIGHT,
+        max_batch_size: int = settings.WS_MAX_BATCH_SIZE,
+        max_batch_delay: float = settings.WS_MAX_BATCH_DELAY
+    ):
+        self.websocket = websocket
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.frames = 0
+        self.batches = 0
+
+    async def _send(self, payload: dict):
+        await self.websocket.send_text(orjson.dumps(payload).decode())
+
+    async def _receive(self):
+        while True:
+            await self._slots.acquire()
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # JSON in text or binary frames
+            message = message["text"] if message.get("text") is not None else message["bytes"]
+            try:
+                request = _request_adapter.validate_json(message)
+            except ValidationError as e:
+                # Same error list as a 422 from /predict
+                await self._send({
+                    "transaction_id": _transaction_id(message),
+                    "detail": jsonable_encoder(e.errors(include_url=False))
+                })
+                self._slots.release()
+                continue
+            self._queue.put_nowait(request)
+
+    async def _next_batch(self) -> List[PredictionRequest]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_batch_delay
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _score(self, requests: List[PredictionRequest]) -> List[dict]:
+        """Score, log and store a batch the way /predict handles one transaction"""
+        feature_names = model_loader.get_feature_names()
+        batch = columnar.ColumnarBatch(
+            np.array([request.transaction_id for request in requests]),
+            np.array(
+                [[getattr(request.transaction, name) for name in feature_names] for request in requests],
+                dtype=np.float64
+            )
+        )
+        results = await asyncio.to_thread(columnar.score, batch, feature_names)
+        threshold = model_loader.get_threshold()
+        timestamp = datetime.now()
+
+        payloads = [
+            prediction_payload(transaction_id, prediction, fraud_probability, risk_level, anomaly_score, threshold, timestamp)
+            for transaction_id, prediction, fraud_probability, risk_level, anomaly_score in zip(
+                batch.transaction_ids.tolist(),
+                results["prediction"].tolist(),
+                results["fraud_probability"].tolist(),
+                results["risk_level"].tolist(),
+                results["anomaly_score"].tolist()
+            )
+        ]
+        for payload in payloads:
+            log_prediction(
+                transaction_id=payload["transaction_id"],
+                prediction=bool(payload["prediction"]),
+                probability=payload["fraud_probability"],
+                risk_level=payload["risk_level"]
+            )
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud.bulk_create_predictions(
+                    db,
+                    columnar.prediction_rows(batch, results, feature_names, threshold),
+                    model_version=settings.APP_VERSION
+                )
+        except Exception as db_error:
+            logger.warning("database_save_failed", error=str(db_error), rows=len(requests))
+
+        return payloads
+
+    async def _respond(self):
+        while True:
+            requests = await self._next_batch()
+            try:
+                payloads = await self._score(requests)
+            except Exception as e:
+                logger.error("prediction_error", error=str(e), rows=len(requests))
+                payloads = [
+                    {"transaction_id": request.transaction_id, "detail": f"Prediction failed: {str(e)}"}
+                    for request in requests
+                ]
+            self.frames += len(requests)
+            self.batches += 1
+            for payload in payloads:
+                await self._send(payload)
+                self._slots.release()
+
+    async def run(self):
+        """Serve the connection until the client closes it"""
+        tasks = [asyncio.create_task(self._receive()), asyncio.create_task(self._respond())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        for task in done:
+            error = task.exception()
+            if error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
@@ -0,0 +1,117 @@
+from typing import Dict, Optional
+import numpy as np
+
+
+def sweep(scores: np.ndarray, labels: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Confusion counts and metrics at every distinct threshold, from one sort and
+    cumulative sums: O(n log n) however many thresholds there are.
+
+    A row is flagged when its anomaly score is below the threshold, as in
+    ModelLoader.predict. Each distinct score s yields the threshold that flags
+    every row scoring <= s: the next distinct score, or just above the largest.
+    """
+    order = np.argsort(scores, kind="stable")
+    sorted_scores = scores[order]
+    frauds = np.cumsum(labels[order], dtype=np.int64)
+
+    # Last row of each run of equal scores
+    ends = np.append(np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1)
+    thresholds = np.append(sorted_scores[ends[:-1] + 1], np.nextafter(sorted_scores[-1], np.inf))
+
+    n = len(scores)
+    positives = int(frauds[-1])
+    flagged = ends + 1
+    true_positives = frauds[ends]
+    false_positives = flagged - true_positives
+    recall = true_positives / positives if positives else np.zeros(len(ends))
+    false_positive_rate = false_positives / (n - positives) if n > positives else np.zeros(len(ends))
+    return {
+        "threshold": thresholds,
+        "flagged": flagged,
+        "true_positives": true_positives,
+        "false_positives": false_positives,
+        "precision": true_positives / flagged,
+        "recall": recall,
+        "f1_score": 2 * true_positives / (flagged + positives),
+        "false_positive_rate": false_positive_rate,
+        "alert_rate": flagged / n
+    }
+
+
+def _point(curve: Dict[str, np.ndarray], i: int) -> dict:
+    return {name: values[i].item() for name, values in curve.items()}
+
+
+def operating_point(
+    curve: Dict[str, np.ndarray],
+    objective: str = "f1",
+    min_precision: Optional[float] = None,
+    min_recall: Optional[float] = None,
+    max_alert_rate: Optional[float] = None
+) -> Optional[dict]:
+    """The point meeting every given constraint that maximizes the objective, or None"""
+    feasible = np.ones(len(curve["threshold"]), dtype=bool)
+    if min_precision is not None:
+        feasible &= curve["precision"] >= min_precision
+    if min_recall is not None:
+        feasible &= curve["recall"] >= min_recall
+    if max_alert_rate is not None:
+        feasible &= curve["alert_rate"] <= max_alert_rate
+    if not feasible.any():
+        return None
+
+    values = curve["f1_score" if objective == "f1" else objective]
+    # Ties go to the lowest threshold, which raises the fewest alerts
+    return _point(curve, int(np.argmax(np.where(feasible, values, -np.inf))))
+
+
+def downsample(curve: Dict[str, np.ndarray], points: int) -> list:
+    """At most `points` curve points, evenly spaced by alert volume, always keeping the ends"""
+    size = len(curve["threshold"])
+    if size <= points:
+        indices = np.arange(size)
+    else:
+        targets = np.linspace(curve["flagged"][0], curve["flagged"][-1], points)
+        indices = np.unique(np.searchsorted(curve["flagged"], targets).clip(0, size - 1))
+    return [_point(curve, int(i)) for i in indices]
+
+
+def at_threshold(scores: np.ndarray, labels: np.ndarray, threshold: float) -> dict:
+    """Metrics for a single threshold, e.g. the one being served"""
+    flagged = scores < threshold
+    n, positives = len(scores), int(labels.sum())
+    true_positives = int((flagged & labels).sum())
+    false_positives = int(flagged.sum()) - true_positives
+    return {
+        "threshold": threshold,
+        "flagged": true_positives + false_positives,
+        "true_positives": true_positives,
+        "false_positives": false_positives,
+        "precision": true_positives / (true_positives + false_positives) if flagged.any() else 0.0,
+        "recall": true_positives / positives if positives else 0.0,
+        "f1_score": 2 * true_positives / (true_positives + false_positives + positives) if positives else 0.0,
+        "false_positive_rate": false_positives / (n - positives) if n > positives else 0.0,
+        "alert_rate": (true_positives + false_positives) / n
+    }
+
+
+def analyze(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    current_threshold: Optional[float],
+    points: int = 200,
+    **constraints
+) -> dict:
+    """Curve, best-F1 point, constrained target point and the current threshold's
+    metrics (None when the current threshold is unknown)"""
+    labels = labels.astype(bool)
+    curve = sweep(scores, labels)
+    return {
+        "labeled_rows": len(scores),
+        "fraud_rows": int(labels.sum()),
+        "current": at_threshold(scores, labels, current_threshold) if current_threshold is not None else None,
+        "best_f1": operating_point(curve),
+        "target": operating_point(curve, **constraints),
+        "curve": downsample(curve, points)
+    }
@@ -0,0 +1,67 @@
+from typing import Dict, List
+from src.core.config import settings
+from src.core.rollup import BufferedRollup
+from src.db.database import AsyncSessionLocal
+from src.db import crud
+
+# Upper bounds (ms) of the latency histogram columns in api_usage_rollup
+LATENCY_BUCKETS_MS = (
+    (10, "latency_10ms"),
+    (50, "latency_50ms"),
+    (100, "latency_100ms"),
+    (250, "latency_250ms"),
+    (500, "latency_500ms"),
+    (1000, "latency_1000ms"),
+)
+
+
+class UsageAggregator(BufferedRollup):
+    """
+    Accumulates per-(api_key, route, method, minute) usage in memory and writes it to
+    api_usage_rollup with one bulk upsert per flush interval, instead of one INSERT
+    and commit per request.
+    """
+
+    name = "usage"
+    key_columns = ("api_key", "endpoint", "method")
+    max_columns = frozenset({"latency_max_ms"})
+
+    def _empty_row(self) -> Dict[str, float]:
+        row = {
+            "request_count": 0,
+            "status_2xx": 0,
+            "status_3xx": 0,
+            "status_4xx": 0,
+            "status_5xx": 0,
+            "latency_sum_ms": 0.0,
+            "latency_max_ms": 0.0,
+            "latency_inf": 0
+        }
+        for _, column in LATENCY_BUCKETS_MS:
+            row[column] = 0
+        return row
+
+    async def _upsert(self, rows: List[dict]):
+        async with AsyncSessionLocal() as db:
+            await crud.upsert_api_usage_rollups(db, rows)
+
+    def record(self, api_key: str, endpoint: str, method: str, status_code: int, duration_ms: float):
+        row = self._row(api_key, endpoint, method)
+
+        row["request_count"] += 1
+        status_class = f"status_{status_code // 100}xx"
+        if status_class in row:
+            row[status_class] += 1
+        row["latency_sum_ms"] += duration_ms
+        if duration_ms > row["latency_max_ms"]:
+            row["latency_max_ms"] = duration_ms
+
+        for bound, column in LATENCY_BUCKETS_MS:
+            if duration_ms <= bound:
+                row[column] += 1
+                break
+        else:
+            row["latency_inf"] += 1
+
+
+usage_aggregator = UsageAggregator(flush_interval=settings.USAGE_FLUSH_INTERVAL)
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from typing import Optional
+import numpy as np
+from sqlalchemy import text
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.core.cache import cache
+from src.db.database import async_engine, async_read_engine
+import structlog
+
+logger = structlog.get_logger()
+
+
+class Readiness:
+    """Tracks whether startup warmup has finished, for the /ready probe"""
+    
+    def __init__(self):
+        self.ready = False
+        self.checks: dict = {}
+        self.duration_ms: Optional[float] = None
+    
+    def mark_ready(self, checks: dict, duration_ms: float):
+        self.checks = checks
+        self.duration_ms = duration_ms
+        self.ready = True
+
+
+readiness = Readiness()
+
+
+def _warm_model(batch_size: int):
+    """Load artifacts and push a synthetic batch and a single row through the
+    scaler and model so first requests don't pay lazy initialisation"""
+    model_loader.load()
+    n_features = model_loader.get_metadata()["n_features"]
+    features = np.random.default_rng(0).standard_normal((batch_size, n_features))
+    
+    model_loader.get_scaler().transform([[0.0]])
+    model_loader.predict_batch(features)
+    model_loader.predict(features[:1])
+
+
+async def _warm_redis() -> str:
+    await cache.connect()
+    if not cache.redis_client:
+        return "unavailable"
+    # Through the breaker like every other Redis call, so a failure here counts too
+    if not await cache.run("ping", lambda client: client.ping()):
+        return "unavailable"
+    return "ok"
+
+
+async def _warm_db_pool(engine, connections: int) -> str:
+    """Open several pooled connections at once so the pool is populated up front"""
+    opened = []
+    
+    async def open_connection():
+        conn = await engine.connect()
+        opened.append(conn)
+        await conn.execute(text("SELECT 1"))
+    
+    try:
+        results = await asyncio.gather(
+            *(open_connection() for _ in range(connections)),
+            return_exceptions=True
+        )
+    finally:
+        # Also when the warmup timeout cancels the gather: opened connections go back to the pool
+        for conn in opened:
+            await conn.close()
+    errors = [result for result in results if isinstance(result, Exception)]
+    
+    if errors:
+        logger.warning("warmup_db_failed", error=str(errors[0]), failed=len(errors))
+        return "unavailable"
+    return "ok"
+
+
+async def _with_timeout(name: str, coro) -> str:
+    try:
+        return await asyncio.wait_for(coro, timeout=settings.WARMUP_TIMEOUT)
+    except Exception as e:
+        logger.warning("warmup_step_failed", step=name, error=str(e) or type(e).__name__)
+        return "unavailable"
+
+
+async def run_warmup():
+    """
+    Warm the model, Redis and the database pools, then mark the process ready.
+    
+    Only the model is required: Redis and Postgres failures are reported in the
+    checks, matching how requests degrade without them.
+    """
+    start = time.perf_counter()
+    checks = {}
+    
+    try:
+        await asyncio.to_thread(_warm_model, settings.WARMUP_BATCH_SIZE)
+        checks["model"] = "ok"
+    except Exception as e:
+        logger.error("warmup_model_failed", error=str(e))
+        readiness.checks = {"model": "failed"}
+        return
+    
+    steps = {
+        "redis": _warm_redis(),
+        "database": _warm_db_pool(async_engine, settings.WARMUP_DB_CONNECTIONS)
+    }
+    if async_read_engine is not async_engine:
+        steps["database_replica"] = _warm_db_pool(async_read_engine, settings.WARMUP_DB_CONNECTIONS)
+    
+    results = await asyncio.gather(*(_with_timeout(name, coro) for name, coro in steps.items()))
+    checks.update(zip(steps, results))
+    
+    duration_ms = (time.perf_counter() - start) * 1000
+    readiness.mark_ready(checks, round(duration_ms, 2))
+    logger.info("warmup_complete", duration_ms=round(duration_ms, 2), **checks)
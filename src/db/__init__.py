@@ -1,4 +1,4 @@
-from src.db.database import get_db, engine
-from src.db.models import Prediction, Feedback, APIUsage, ModelVersion
+from src.db.database import get_db, get_read_db, get_sync_engine
+from src.db.models import Prediction, Feedback, APIUsage, APIUsageRollup, ModelVersion, PredictionStats
 
-__all__ = ["get_db", "engine", "Prediction", "Feedback", "APIUsage", "ModelVersion"]
+__all__ = ["get_db", "get_read_db", "get_sync_engine", "Prediction", "Feedback", "APIUsage", "APIUsageRollup", "ModelVersion", "PredictionStats"]
@@ -1,9 +1,13 @@
-from typing import Optional, List
+from typing import AsyncIterator, Dict, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime
-from sqlalchemy import select, and_, desc
+import numpy as np
+from sqlalchemy import select, and_, or_, delete, desc, exists, func, insert, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.db.models import Prediction, Feedback, APIUsage, ModelVersion
+from sqlalchemy.orm import selectinload
+from src.core.cache import invalidate_prediction_cache, invalidate_prediction_cache_many
+from src.db.models import Prediction, Feedback, APIUsage, APIUsageRollup, ModelVersion, PredictionStats
 
 async def create_prediction(
     db: AsyncSession,
@@ -16,6 +20,7 @@ async def create_prediction(
     model_version: str,
     features: dict
 ) -> Prediction:
+    created_at = datetime.utcnow()
     db_prediction = Prediction(
         transaction_id=transaction_id,
         prediction=prediction,
@@ -24,16 +29,152 @@ async def create_prediction(
         anomaly_score=anomaly_score,
         threshold_used=threshold,
         model_version=model_version,
-        features=features
+        features=features,
+        created_at=created_at
     )
     db.add(db_prediction)
+    # Counted into prediction_stats by PredictionStatsAggregator once stored
     await db.commit()
     await db.refresh(db_prediction)
     return db_prediction
 
+_STATS_COUNTERS = (
+    "total_count", "fraud_count", "low_count", "medium_count", "high_count",
+    "fraud_probability_sum", "anomaly_score_sum"
+)
+
+def _prediction_stats_upsert(rows: List[dict]):
+    """INSERT .. ON CONFLICT that adds pre-aggregated rows into their (minute, model_version) buckets"""
+    stmt = pg_insert(PredictionStats).values(rows)
+    return stmt.on_conflict_do_update(
+        constraint="uq_prediction_stats_bucket_model",
+        set_={key: getattr(PredictionStats, key) + stmt.excluded[key] for key in _STATS_COUNTERS}
+    )
+
+async def upsert_prediction_stats(db: AsyncSession, rows: List[dict]):
+    """Merge pre-aggregated stats rows into prediction_stats with one multi-row upsert"""
+    if not rows:
+        return
+    await db.execute(_prediction_stats_upsert(rows))
+    await db.commit()
+
+def _prediction_stats_rebuild(start: datetime, end: datetime):
+    """INSERT .. SELECT that recounts the predictions created in [start, end) by minute"""
+    # A literal unit, so the SELECT and GROUP BY expressions are identical once bound
+    minute = func.date_trunc(literal_column("'minute'"), Prediction.created_at)
+    counts = select(
+        minute,
+        Prediction.model_version,
+        func.count(),
+        func.count().filter(Prediction.prediction.is_(True)),
+        func.count().filter(Prediction.risk_level == "LOW"),
+        func.count().filter(Prediction.risk_level == "MEDIUM"),
+        func.count().filter(Prediction.risk_level == "HIGH"),
+        func.coalesce(func.sum(Prediction.fraud_probability), 0.0),
+        func.coalesce(func.sum(Prediction.anomaly_score), 0.0)
+    ).where(
+        and_(Prediction.created_at >= start, Prediction.created_at < end)
+    ).group_by(minute, Prediction.model_version)
+    return insert(PredictionStats).from_select(["bucket_start", "model_version", *_STATS_COUNTERS], counts)
+
+async def rebuild_prediction_stats(db: AsyncSession, start: datetime, end: datetime) -> int:
+    """
+    Replace the prediction_stats rows of [start, end) with counts taken from
+    predictions, in one transaction; both bounds are rounded down to the minute.
+    Returns the number of buckets written.
+    """
+    start, end = start.replace(second=0, microsecond=0), end.replace(second=0, microsecond=0)
+    await db.execute(
+        delete(PredictionStats).where(and_(PredictionStats.bucket_start >= start, PredictionStats.bucket_start < end))
+    )
+    result = await db.execute(_prediction_stats_rebuild(start, end))
+    await db.commit()
+    return result.rowcount
+
+async def bulk_create_predictions(
+    db: AsyncSession,
+    rows: List[dict],
+    model_version: str,
+    chunk_size: int = 1000
+) -> int:
+    """
+    Insert many scored predictions and fold them into their stats bucket in one transaction.
+    
+    Rows carry the Prediction columns except model_version and created_at. Rows
+    whose transaction_id already exists are skipped, as the single-row path would
+    fail on them; returns the number inserted.
+    """
+    created_at = datetime.utcnow()
+    inserted = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = [
+            {**row, "model_version": model_version, "created_at": created_at}
+            for row in rows[start:start + chunk_size]
+        ]
+        result = await db.execute(
+            pg_insert(Prediction)
+            .values(chunk)
+            .on_conflict_do_nothing(index_elements=[Prediction.transaction_id])
+            .returning(Prediction.transaction_id)
+        )
+        inserted.extend(result.scalars())
+    
+    if inserted:
+        inserted_ids = set(inserted)
+        counted = [row for row in rows if row["transaction_id"] in inserted_ids]
+        await db.execute(_prediction_stats_upsert([{
+            "bucket_start": created_at.replace(second=0, microsecond=0),
+            "model_version": model_version,
+            "total_count": len(counted),
+            "fraud_count": sum(1 for row in counted if row["prediction"]),
+            "low_count": sum(1 for row in counted if row["risk_level"] == "LOW"),
+            "medium_count": sum(1 for row in counted if row["risk_level"] == "MEDIUM"),
+            "high_count": sum(1 for row in counted if row["risk_level"] == "HIGH"),
+            "fraud_probability_sum": sum(row["fraud_probability"] for row in counted),
+            "anomaly_score_sum": sum(row["anomaly_score"] for row in counted)
+        }]))
+    await db.commit()
+    return len(inserted)
+
+async def get_prediction_stats(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    interval: str = "hour",
+    model_version: Optional[str] = None
+) -> List[dict]:
+    """Aggregate the minute rollups into interval buckets between start and end"""
+    bucket = func.date_trunc(interval, PredictionStats.bucket_start).label("bucket_start")
+    query = (
+        select(
+            bucket,
+            PredictionStats.model_version,
+            func.sum(PredictionStats.total_count).label("total_count"),
+            func.sum(PredictionStats.fraud_count).label("fraud_count"),
+            func.sum(PredictionStats.low_count).label("low_count"),
+            func.sum(PredictionStats.medium_count).label("medium_count"),
+            func.sum(PredictionStats.high_count).label("high_count"),
+            func.sum(PredictionStats.fraud_probability_sum).label("fraud_probability_sum"),
+            func.sum(PredictionStats.anomaly_score_sum).label("anomaly_score_sum")
+        )
+        .where(and_(PredictionStats.bucket_start >= start, PredictionStats.bucket_start < end))
+        .group_by(bucket, PredictionStats.model_version)
+        .order_by(bucket, PredictionStats.model_version)
+    )
+    
+    if model_version:
+        query = query.where(PredictionStats.model_version == model_version)
+    
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
+
 async def get_prediction(db: AsyncSession, prediction_id: UUID) -> Optional[Prediction]:
+    # Feedback is loaded eagerly so serializing the response never triggers a
+    # lazy load on the async session
     result = await db.execute(
-        select(Prediction).where(Prediction.id == prediction_id)
+        select(Prediction)
+        .options(selectinload(Prediction.feedback_entries))
+        .where(Prediction.id == prediction_id)
     )
     return result.scalar_one_or_none()
 
@@ -42,7 +183,15 @@ async def get_prediction_by_transaction_id(
     transaction_id: str
 ) -> Optional[Prediction]:
     result = await db.execute(
-        select(Prediction).where(Prediction.transaction_id == transaction_id)
+        select(Prediction)
+        .options(selectinload(Prediction.feedback_entries))
+        .where(Prediction.transaction_id == transaction_id)
+    )
+    return result.scalar_one_or_none()
+
+async def get_prediction_transaction_id(db: AsyncSession, prediction_id: UUID) -> Optional[str]:
+    result = await db.execute(
+        select(Prediction.transaction_id).where(Prediction.id == prediction_id)
     )
     return result.scalar_one_or_none()
 
@@ -52,7 +201,11 @@ async def get_predictions(
     limit: int = 100,
     fraud_only: bool = False
 ) -> List[Prediction]:
-    query = select(Prediction).order_by(desc(Prediction.created_at))
+    query = (
+        select(Prediction)
+        .options(selectinload(Prediction.feedback_entries))
+        .order_by(desc(Prediction.created_at))
+    )
     
     if fraud_only:
         query = query.where(Prediction.prediction == True)
@@ -66,8 +219,11 @@ async def create_feedback(
     prediction_id: UUID,
     actual_label: bool,
     feedback_source: str,
-    notes: Optional[str] = None
+    notes: Optional[str] = None,
+    transaction_id: Optional[str] = None
 ) -> Feedback:
+    """Store a label and drop the prediction's cached copies, which embed the latest
+    feedback; pass transaction_id when known to skip looking it up"""
     db_feedback = Feedback(
         prediction_id=prediction_id,
         actual_label=actual_label,
@@ -77,8 +233,48 @@ async def create_feedback(
     db.add(db_feedback)
     await db.commit()
     await db.refresh(db_feedback)
+    if transaction_id is None:
+        transaction_id = await get_prediction_transaction_id(db, prediction_id)
+    await invalidate_prediction_cache(prediction_id, transaction_id)
     return db_feedback
 
+async def resolve_prediction_ids(
+    db: AsyncSession,
+    prediction_ids: List[UUID],
+    transaction_ids: List[str]
+) -> List[tuple]:
+    """Look up (id, transaction_id) for a set of ids and transaction ids in one query"""
+    conditions = []
+    if prediction_ids:
+        conditions.append(Prediction.id.in_(prediction_ids))
+    if transaction_ids:
+        conditions.append(Prediction.transaction_id.in_(transaction_ids))
+    if not conditions:
+        return []
+    
+    result = await db.execute(
+        select(Prediction.id, Prediction.transaction_id).where(or_(*conditions))
+    )
+    return result.all()
+
+async def bulk_create_feedback(
+    db: AsyncSession,
+    rows: List[dict],
+    transaction_ids: Optional[Dict[UUID, str]] = None
+) -> int:
+    """Insert many feedback rows as a multi-row INSERT and commit them together, then
+    drop the predictions' cached copies; transaction_ids maps prediction ids to their
+    transaction ids when known, to skip looking them up"""
+    if not rows:
+        return 0
+    await db.execute(insert(Feedback), rows)
+    await db.commit()
+    if transaction_ids is None:
+        matches = await resolve_prediction_ids(db, list({row["prediction_id"] for row in rows}), [])
+        transaction_ids = dict(matches)
+    await invalidate_prediction_cache_many(transaction_ids)
+    return len(rows)
+
 async def log_api_usage(
     db: AsyncSession,
     api_key: str,
@@ -97,6 +293,53 @@ async def log_api_usage(
     db.add(db_usage)
     await db.commit()
 
+# Counters summed on conflict; latency_max_ms takes the greatest instead
+_USAGE_COUNTERS = (
+    "request_count", "status_2xx", "status_3xx", "status_4xx", "status_5xx", "latency_sum_ms",
+    "latency_10ms", "latency_50ms", "latency_100ms", "latency_250ms",
+    "latency_500ms", "latency_1000ms", "latency_inf"
+)
+
+async def upsert_api_usage_rollups(db: AsyncSession, rows: List[dict]):
+    """Merge pre-aggregated usage rows into api_usage_rollup with one multi-row upsert"""
+    if not rows:
+        return
+    stmt = pg_insert(APIUsageRollup).values(rows)
+    set_ = {key: getattr(APIUsageRollup, key) + stmt.excluded[key] for key in _USAGE_COUNTERS}
+    set_["latency_max_ms"] = func.greatest(APIUsageRollup.latency_max_ms, stmt.excluded.latency_max_ms)
+    await db.execute(
+        stmt.on_conflict_do_update(constraint="uq_api_usage_rollup_bucket", set_=set_)
+    )
+    await db.commit()
+
+async def get_api_usage(
+    db: AsyncSession,
+    api_key: str,
+    start: datetime,
+    end: datetime,
+    interval: str = "hour"
+) -> List[dict]:
+    bucket = func.date_trunc(interval, APIUsageRollup.bucket_start).label("bucket_start")
+    columns = [func.sum(getattr(APIUsageRollup, key)).label(key) for key in _USAGE_COUNTERS]
+    query = (
+        select(
+            bucket,
+            APIUsageRollup.endpoint,
+            APIUsageRollup.method,
+            *columns,
+            func.max(APIUsageRollup.latency_max_ms).label("latency_max_ms")
+        )
+        .where(and_(
+            APIUsageRollup.api_key == api_key,
+            APIUsageRollup.bucket_start >= start,
+            APIUsageRollup.bucket_start < end
+        ))
+        .group_by(bucket, APIUsageRollup.endpoint, APIUsageRollup.method)
+        .order_by(bucket, APIUsageRollup.endpoint, APIUsageRollup.method)
+    )
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
+
 async def create_model_version(
     db: AsyncSession,
     version: str,
@@ -120,6 +363,73 @@ async def create_model_version(
     await db.refresh(db_model)
     return db_model
 
+async def stream_unlabeled_features(
+    db: AsyncSession,
+    chunk_size: int = 5000,
+    since: Optional[datetime] = None
+) -> AsyncIterator[List[dict]]:
+    """Feature dicts of predictions without feedback, in lists of up to chunk_size,
+    read through a server-side cursor so memory doesn't grow with the table"""
+    query = select(Prediction.features).where(
+        ~exists().where(Feedback.prediction_id == Prediction.id)
+    )
+    if since:
+        query = query.where(Prediction.created_at >= since)
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield [row.features for row in partition]
+
+def _latest_labels():
+    """Each prediction's most recent feedback label"""
+    return (
+        select(Feedback.prediction_id, Feedback.actual_label)
+        .distinct(Feedback.prediction_id)
+        .order_by(Feedback.prediction_id, desc(Feedback.created_at))
+        .subquery()
+    )
+
+async def stream_labeled_features(
+    db: AsyncSession,
+    chunk_size: int = 5000
+) -> AsyncIterator[List[tuple]]:
+    """(features, actual_label) of predictions with feedback, using each one's latest
+    label, through a server-side cursor"""
+    latest = _latest_labels()
+    query = select(Prediction.features, latest.c.actual_label).join(latest, latest.c.prediction_id == Prediction.id)
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield [(row.features, row.actual_label) for row in partition]
+
+async def get_labeled_scores(
+    db: AsyncSession,
+    model_version: str,
+    since: Optional[datetime] = None,
+    chunk_size: int = 50000
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(anomaly_scores, labels) of labeled predictions made by model_version, as
+    arrays filled partition by partition from a server-side cursor"""
+    latest = _latest_labels()
+    query = (
+        select(Prediction.anomaly_score, latest.c.actual_label)
+        .join(latest, latest.c.prediction_id == Prediction.id)
+        .where(Prediction.model_version == model_version)
+    )
+    if since:
+        query = query.where(Prediction.created_at >= since)
+    scores, labels = [], []
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        columns = list(zip(*partition))
+        scores.append(np.fromiter(columns[0], dtype=np.float64, count=len(partition)))
+        labels.append(np.fromiter(columns[1], dtype=bool, count=len(partition)))
+    if not scores:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=bool)
+    return np.concatenate(scores), np.concatenate(labels)
+
+async def get_model_version(db: AsyncSession, version: str) -> Optional[ModelVersion]:
+    result = await db.execute(select(ModelVersion).where(ModelVersion.version == version))
+    return result.scalar_one_or_none()
+
 async def get_active_model_version(db: AsyncSession) -> Optional[ModelVersion]:
     result = await db.execute(
         select(ModelVersion).where(ModelVersion.is_active == True)
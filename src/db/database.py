@@ -1,39 +1,184 @@
-from sqlalchemy import create_engine
+import asyncio
+import time
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.core.circuit_breaker import CircuitBreaker, create_circuit_breaker
 from src.core.config import settings
+from src.core.metrics import register_db_pool, db_replica_lag
+from src.db.instrumentation import instrument_engine, instrumented_pool
+import structlog
+
+logger = structlog.get_logger()
 
 Base = declarative_base()
 
-# Sync engine for migrations
-engine = create_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://"),
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
-)
+
+@lru_cache()
+def get_sync_engine():
+    """Sync engine for migrations and scripts, created on first use so the API
+    never imports psycopg2 or opens a second pool it doesn't need"""
+    return create_engine(
+        settings.DATABASE_URL.replace("postgresql://", "postgresql+psycopg2://"),
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20
+    )
+
+
+@lru_cache()
+def get_sync_sessionmaker() -> sessionmaker:
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=get_sync_engine()
+    )
+
+
+def __getattr__(name: str):
+    # Keep `engine` and `SessionLocal` importable without building them at import time
+    if name == "engine":
+        return get_sync_engine()
+    if name == "SessionLocal":
+        return get_sync_sessionmaker()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def guarded_pool(pool_class, breaker: CircuitBreaker):
+    """Subclass a pool class so checkouts go through a circuit breaker.
+    
+    While the database is down, checkouts raise CircuitOpenError at once instead
+    of every request waiting out DB_CONNECT_TIMEOUT on its own.
+    """
+    
+    class GuardedPool(pool_class):
+        def connect(self):
+            breaker.before_call()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                # An exhausted pool is load, not a database failure
+                breaker.record_ignored()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return connection
+    
+    GuardedPool.__name__ = f"Guarded{pool_class.__name__}"
+    return GuardedPool
+
+
+db_breakers = {
+    "primary": create_circuit_breaker("postgres_primary"),
+    "replica": create_circuit_breaker("postgres_replica")
+}
+
+
+def _async_pool_class(engine_name: str):
+    pool_class = AsyncAdaptedQueuePool
+    if settings.DB_INSTRUMENTATION_ENABLED:
+        pool_class = instrumented_pool(pool_class, engine_name)
+    return guarded_pool(pool_class, db_breakers[engine_name])
+
 
 # Async engine for API
 async_engine = create_async_engine(
     settings.DATABASE_URL.replace("postgresql://", "postgresql+psycopg://"),
+    poolclass=_async_pool_class("primary"),
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT},
     echo=False
 )
 
+# Async engine for read-only endpoints, pointed at a replica when one is configured
+if settings.DATABASE_READ_URL:
+    async_read_engine = create_async_engine(
+        settings.DATABASE_READ_URL.replace("postgresql://", "postgresql+psycopg://"),
+        poolclass=_async_pool_class("replica"),
+        pool_pre_ping=True,
+        pool_size=settings.DB_READ_POOL_SIZE,
+        max_overflow=settings.DB_READ_MAX_OVERFLOW,
+        connect_args={"connect_timeout": settings.DB_CONNECT_TIMEOUT},
+        echo=False
+    )
+else:
+    async_read_engine = async_engine
+
+register_db_pool("primary", async_engine)
+if async_read_engine is not async_engine:
+    register_db_pool("replica", async_read_engine)
+
+if settings.DB_INSTRUMENTATION_ENABLED:
+    instrument_engine(async_engine, "primary")
+    if async_read_engine is not async_engine:
+        instrument_engine(async_read_engine, "replica")
+
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
 )
 
+
+class ReplicaLagMonitor:
+    """Decides whether the replica is fresh enough to serve reads.
+
+    Lag is sampled at most once per DB_READ_LAG_CHECK_INTERVAL and reused by every
+    request in between, so routing costs nothing on the hot path.
+    """
+
+    # Zero when the replica has replayed everything it received, so an idle
+    # primary doesn't make the replica look stale. NULL on a non-replica.
+    LAG_QUERY = text(
+        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+    )
+
+    def __init__(self):
+        self.lag_seconds: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        async with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                async with async_read_engine.connect() as conn:
+                    result = await conn.execute(self.LAG_QUERY)
+                    self.lag_seconds = float(result.scalar() or 0)
+                db_replica_lag.set(self.lag_seconds)
+            except Exception as e:
+                logger.warning("replica_lag_check_failed", error=str(e))
+                self.lag_seconds = None
+
+    async def replica_usable(self) -> bool:
+        if settings.DB_READ_STALENESS_TOLERANT:
+            return True
+
+        stale_check = time.monotonic() - self._checked_at >= settings.DB_READ_LAG_CHECK_INTERVAL
+        if stale_check and not self._lock.locked():
+            await self.refresh()
+
+        return self.lag_seconds is not None and self.lag_seconds <= settings.DB_READ_MAX_LAG_SECONDS
+
+
+replica_monitor = ReplicaLagMonitor()
+
+
 async def get_db():
     async with AsyncSessionLocal() as session:
         try:
@@ -41,8 +186,24 @@ async def get_db():
         finally:
             await session.close()
 
+async def get_read_db():
+    """Session for read-only endpoints: the replica when configured and fresh, else the primary"""
+    session_factory = AsyncSessionLocal
+    if (
+        async_read_engine is not async_engine
+        and db_breakers["replica"].available
+        and await replica_monitor.replica_usable()
+    ):
+        session_factory = AsyncReadSessionLocal
+
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
 def get_sync_db():
-    db = SessionLocal()
+    db = get_sync_sessionmaker()()
     try:
         yield db
     finally:
@@ -0,0 +1,90 @@
+import re
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from src.core.config import settings
+from src.core.metrics import record_db_query, record_pool_checkout
+import structlog
+
+logger = structlog.get_logger()
+
+_STATEMENT_TYPES = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAMS = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \(\?(?:, \?)*\)", re.IGNORECASE)
+_VALUES_ROWS = re.compile(r"(\(\?(?:, \?)*\))(?:, \(\?(?:, \?)*\))+")
+
+
+def normalize_statement(statement: str, max_length: int = 1000) -> str:
+    """Collapse whitespace, parameters, literals, IN lists and multi-row VALUES so
+    slow queries group by shape rather than by value"""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _PARAMS.sub("?", normalized)
+    normalized = _LITERALS.sub("?", normalized)
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _VALUES_ROWS.sub(r"\1, ...", normalized)
+    return normalized[:max_length]
+
+
+def statement_type(statement: str) -> str:
+    keyword = statement.lstrip()[:6].upper()
+    return keyword if keyword in _STATEMENT_TYPES else "OTHER"
+
+
+def instrumented_pool(pool_class, engine_name: str):
+    """Subclass a pool class so every checkout records how long it waited.
+
+    The subclass is kept when the engine recreates its pool after dispose().
+    """
+
+    class InstrumentedPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return super().connect()
+            except PoolTimeoutError:
+                timed_out = True
+                raise
+            finally:
+                record_pool_checkout(engine_name, time.perf_counter() - start, timed_out=timed_out)
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def instrument_engine(engine, engine_name: str):
+    """Attach per-statement timing and slow-query logging to a (sync or async) engine.
+
+    Each statement costs two perf_counter() calls and one histogram observation;
+    normalization only runs for statements above DB_SLOW_QUERY_THRESHOLD_MS.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+    slow_threshold = settings.DB_SLOW_QUERY_THRESHOLD_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info["query_start_time"].pop()
+        record_db_query(statement_type(statement), duration, engine=engine_name)
+
+        if duration >= slow_threshold:
+            logger.warning(
+                "slow_query",
+                engine=engine_name,
+                duration_ms=round(duration * 1000, 2),
+                executemany=executemany,
+                statement=normalize_statement(statement)
+            )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # Keep the timing stack balanced when a statement raises
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, Float, Integer, DateTime, ForeignKey, Text, JSON
+from typing import Optional
+from sqlalchemy import Column, String, Boolean, Float, Integer, BigInteger, DateTime, ForeignKey, Text, JSON, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from src.db.database import Base
@@ -20,7 +21,15 @@ class Prediction(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    feedback = relationship("Feedback", back_populates="prediction", uselist=False)
+    # Every label received, newest first; a prediction can be relabeled
+    feedback_entries = relationship(
+        "Feedback", back_populates="prediction", order_by="desc(Feedback.created_at)"
+    )
+    
+    @property
+    def feedback(self) -> Optional["Feedback"]:
+        """The latest label, the one that counts"""
+        return self.feedback_entries[0] if self.feedback_entries else None
 
 class Feedback(Base):
     __tablename__ = "feedback"
@@ -32,7 +41,7 @@ class Feedback(Base):
     notes = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
-    prediction = relationship("Prediction", back_populates="feedback")
+    prediction = relationship("Prediction", back_populates="feedback_entries")
 
 class APIUsage(Base):
     __tablename__ = "api_usage"
@@ -54,3 +63,49 @@ class ModelVersion(Base):
     metrics = Column(JSONB, nullable=False)
     deployed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     is_active = Column(Boolean, default=False, nullable=False)
+
+class PredictionStats(Base):
+    """Per-minute, per-model-version rollup, flushed in batches by the prediction write paths"""
+    __tablename__ = "prediction_stats"
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "model_version", name="uq_prediction_stats_bucket_model"),
+    )
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    model_version = Column(String(50), nullable=False)
+    total_count = Column(BigInteger, default=0, nullable=False)
+    fraud_count = Column(BigInteger, default=0, nullable=False)
+    low_count = Column(BigInteger, default=0, nullable=False)
+    medium_count = Column(BigInteger, default=0, nullable=False)
+    high_count = Column(BigInteger, default=0, nullable=False)
+    fraud_probability_sum = Column(Float, default=0.0, nullable=False)
+    anomaly_score_sum = Column(Float, default=0.0, nullable=False)
+
+class APIUsageRollup(Base):
+    """Per-minute request counts and latency histogram per (api_key, route, method)"""
+    __tablename__ = "api_usage_rollup"
+    __table_args__ = (
+        UniqueConstraint("bucket_start", "api_key", "endpoint", "method", name="uq_api_usage_rollup_bucket"),
+    )
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    api_key = Column(String(255), nullable=False, index=True)
+    endpoint = Column(String(255), nullable=False)
+    method = Column(String(10), nullable=False)
+    request_count = Column(BigInteger, default=0, nullable=False)
+    status_2xx = Column(BigInteger, default=0, nullable=False)
+    status_3xx = Column(BigInteger, default=0, nullable=False)
+    status_4xx = Column(BigInteger, default=0, nullable=False)
+    status_5xx = Column(BigInteger, default=0, nullable=False)
+    latency_sum_ms = Column(Float, default=0.0, nullable=False)
+    latency_max_ms = Column(Float, default=0.0, nullable=False)
+    # Non-cumulative latency histogram: requests in (previous bound, bound]
+    latency_10ms = Column(BigInteger, default=0, nullable=False)
+    latency_50ms = Column(BigInteger, default=0, nullable=False)
+    latency_100ms = Column(BigInteger, default=0, nullable=False)
+    latency_250ms = Column(BigInteger, default=0, nullable=False)
+    latency_500ms = Column(BigInteger, default=0, nullable=False)
+    latency_1000ms = Column(BigInteger, default=0, nullable=False)
+    latency_inf = Column(BigInteger, default=0, nullable=False)
@@ -0,0 +1 @@
+"""Asynchronous bulk scoring jobs"""
@@ -0,0 +1,167 @@
+import io
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from src.core.columnar import ColumnarBatch
+from src.core.config import settings
+
+CSV = "csv"
+NDJSON = "ndjson"
+PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    "text/csv": CSV,
+    "application/x-ndjson": NDJSON,
+    "application/jsonl": NDJSON,
+    "application/vnd.apache.parquet": PARQUET,
+    "application/x-parquet": PARQUET,
+}
+
+
+class JobInputError(ValueError):
+    pass
+
+
+def input_format(content_type: str) -> Optional[str]:
+    return MEDIA_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+
+
+def job_dir(job_id: str) -> Path:
+    return Path(settings.JOBS_DIR) / job_id
+
+
+def input_path(job_id: str) -> Path:
+    return job_dir(job_id) / "input.arrow"
+
+
+def result_path(job_id: str, index: int) -> Path:
+    return job_dir(job_id) / "results" / f"{index:06d}.arrow"
+
+
+# NDJSON is parsed this many bytes at a time (rounded to whole lines)
+NDJSON_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def _ndjson_blocks(source: Path, block_size: int) -> Iterator[bytes]:
+    """The file in blocks of about block_size bytes, each ending at a line break;
+    a line longer than a block is carried over until it is complete"""
+    with open(source, "rb") as f:
+        carry = b""
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            data = carry + data
+            cut = data.rfind(b"\n") + 1
+            carry = data[cut:]
+            if data[:cut].strip():
+                yield data[:cut]
+        if carry.strip():
+            yield carry
+
+
+def _read_batches(source: Path, kind: str, feature_names: List[str]) -> Iterator:
+    """Record batches of any supported file, each read incrementally"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+
+    columns = ["transaction_id", *feature_names]
+    if kind == CSV:
+        reader = pa_csv.open_csv(
+            str(source),
+            convert_options=pa_csv.ConvertOptions(
+                # Ids stay strings, so leading zeros survive
+                column_types={"transaction_id": pa.string()},
+                include_columns=columns
+            )
+        )
+        yield from reader
+    elif kind == PARQUET:
+        yield from pq.ParquetFile(str(source)).iter_batches(columns=columns)
+    else:
+        empty = True
+        for block in _ndjson_blocks(source, NDJSON_BLOCK_BYTES):
+            empty = False
+            # Column types are inferred per block; convert_input casts them to the schema
+            yield from pa_json.read_json(io.BytesIO(block)).select(columns).to_batches()
+        if empty:
+            raise pa.ArrowInvalid("Empty JSON file")
+
+
+def convert_input(source: Path, kind: str, dest: Path, feature_names: List[str]) -> int:
+    """
+    Convert an uploaded file to an Arrow IPC file holding transaction_id and the
+    feature columns in model order; returns the row count.
+
+    Workers memory-map the result and slice out their chunk, so no chunk needs
+    the upload to be parsed again.
+    """
+    # Imported in each function: pyarrow is only needed once jobs are used
+    import pyarrow as pa
+
+    schema = pa.schema([("transaction_id", pa.string()), *((name, pa.float64()) for name in feature_names)])
+    rows = 0
+    tmp = dest.with_suffix(".tmp")
+    try:
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in _read_batches(source, kind, feature_names):
+                # Nulls become NaN and are reported as invalid rows when scored
+                writer.write_batch(pa.RecordBatch.from_arrays(
+                    [batch.column(field.name).cast(field.type) for field in schema],
+                    schema=schema
+                ))
+                rows += batch.num_rows
+    except (pa.ArrowException, KeyError) as e:
+        tmp.unlink(missing_ok=True)
+        raise JobInputError(f"Invalid {kind} file: {e}")
+    os.replace(tmp, dest)
+    return rows
+
+
+def read_chunk(job_id: str, start: int, length: int) -> ColumnarBatch:
+    """Rows [start, start + length) of a job's input as a ColumnarBatch"""
+    import pyarrow as pa
+
+    with pa.memory_map(str(input_path(job_id))) as source:
+        table = pa.ipc.open_file(source).read_all().slice(start, length)
+        transaction_ids = np.asarray(table.column(0).to_numpy(zero_copy_only=False), dtype=str)
+        features = np.column_stack([
+            table.column(i).to_numpy(zero_copy_only=False).astype(np.float64) for i in range(1, table.num_columns)
+        ])
+    return ColumnarBatch(transaction_ids, features)
+
+
+def write_result(job_id: str, index: int, transaction_ids: np.ndarray, results: Dict[str, np.ndarray]):
+    """Write a chunk's results atomically, so a retried chunk simply replaces them"""
+    import pyarrow as pa
+
+    path = result_path(job_id, index)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.table({"transaction_id": transaction_ids, **results})
+    tmp = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def iter_results(job_id: str) -> Iterator[bytes]:
+    """Every chunk's results, in chunk order, as one Arrow IPC stream"""
+    import pyarrow as pa
+
+    buffer = io.BytesIO()
+    writer = None
+    for path in sorted((job_dir(job_id) / "results").glob("*.arrow")):
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+            if writer is None:
+                writer = pa.ipc.new_stream(buffer, table.schema)
+            writer.write_table(table)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if writer is not None:
+        writer.close()
+        yield buffer.getvalue()
@@ -0,0 +1,251 @@
+import math
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import redis.asyncio as redis
+from src.core.cache import cache
+from src.core.config import settings
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+# Returned by the scripts for a job whose hash is gone (TTL expired); a None
+# from them means Redis itself was unavailable
+EXPIRED = "expired"
+
+# Where results go: Arrow files under JOBS_DIR, the predictions table, or both
+OUTPUT_FILE = "file"
+OUTPUT_DB = "db"
+OUTPUT_BOTH = "both"
+
+# One stream entry per chunk, read by a consumer group: a chunk is only removed
+# once a worker acknowledges it, and chunks a crashed worker left pending are
+# claimed by another worker after JOBS_CHUNK_TIMEOUT
+STREAM = "jobs:chunks"
+GROUP = "scoring-workers"
+
+COUNTERS = ("processed_rows", "invalid_rows", "fraud_detected", "inserted_rows")
+_INT_FIELDS = ("total_rows", "total_chunks", "chunk_size", "completed_chunks", *COUNTERS)
+
+START_SCRIPT = """
+-- KEYS[1] job hash; ARGV[1] timestamp. Returns the job's status after the call.
+local status = redis.call('HGET', KEYS[1], 'status')
+if not status then
+    return 'expired'
+end
+if status == 'queued' then
+    redis.call('HSET', KEYS[1], 'status', 'running', 'started_at', ARGV[1])
+    return 'running'
+end
+return status
+"""
+
+COMPLETE_SCRIPT = """
+-- KEYS[1] job hash, KEYS[2] set of finished chunk indexes
+-- ARGV[1] chunk index, ARGV[2] timestamp, then counter/increment pairs.
+-- A chunk is counted once however often it is delivered.
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 'expired'
+end
+if redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+    redis.call('EXPIRE', KEYS[2], math.max(redis.call('TTL', KEYS[1]), 1))
+    for i = 3, #ARGV, 2 do
+        redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+    local completed = redis.call('HINCRBY', KEYS[1], 'completed_chunks', 1)
+    local total = tonumber(redis.call('HGET', KEYS[1], 'total_chunks'))
+    if completed >= total and redis.call('HGET', KEYS[1], 'status') == 'running' then
+        redis.call('HSET', KEYS[1], 'status', 'completed', 'finished_at', ARGV[2])
+    end
+end
+return redis.call('HGET', KEYS[1], 'status')
+"""
+
+FINISH_SCRIPT = """
+-- KEYS[1] job hash; ARGV[1] new status, ARGV[2] timestamp, ARGV[3] error.
+-- Only queued or running jobs change; returns the status after the call.
+local status = redis.call('HGET', KEYS[1], 'status')
+if status == 'queued' or status == 'running' then
+    redis.call('HSET', KEYS[1], 'status', ARGV[1], 'finished_at', ARGV[2])
+    if ARGV[3] ~= '' then
+        redis.call('HSET', KEYS[1], 'error', ARGV[3])
+    end
+    return ARGV[1]
+end
+return status
+"""
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _done_key(job_id: str) -> str:
+    return f"job:{job_id}:done"
+
+
+def _attempts_key(job_id: str) -> str:
+    return f"job:{job_id}:attempts"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _text(value) -> Optional[str]:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _decode_job(raw: dict) -> dict:
+    job = {_text(key): _text(value) for key, value in raw.items()}
+    for field in _INT_FIELDS:
+        job[field] = int(job.get(field) or 0)
+    job["progress"] = round(job["completed_chunks"] / job["total_chunks"], 4) if job["total_chunks"] else 1.0
+    return job
+
+
+class JobQueue:
+    """Job state in Redis hashes and chunk work items in a Redis stream"""
+
+    def __init__(self, stream: str = STREAM, group: str = GROUP):
+        self.stream = stream
+        self.group = group
+
+    async def create_group(self) -> bool:
+        async def command(client):
+            try:
+                await client.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+            return True
+
+        return bool(await cache.run("xgroup_create", command, default=False, key=self.stream))
+
+    async def submit(self, job_id: str, kind: str, output: str, total_rows: int, chunk_size: int) -> Optional[dict]:
+        """Store the job and queue one entry per chunk in one transaction; None if Redis is unavailable"""
+        if not await self.create_group():
+            return None
+
+        total_chunks = math.ceil(total_rows / chunk_size)
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "format": kind,
+            "output": output,
+            "total_rows": total_rows,
+            "total_chunks": total_chunks,
+            "chunk_size": chunk_size,
+            "completed_chunks": 0,
+            **{counter: 0 for counter in COUNTERS},
+            "created_at": _now()
+        }
+
+        def command(client):
+            pipe = client.pipeline(transaction=True)
+            pipe.hset(_job_key(job_id), mapping=job)
+            pipe.expire(_job_key(job_id), settings.JOBS_TTL)
+            for index in range(total_chunks):
+                pipe.xadd(self.stream, {"job_id": job_id, "index": index})
+            return pipe.execute()
+
+        if await cache.run("job_submit", command, job_id=job_id) is None:
+            return None
+        return _decode_job(job)
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        raw = await cache.run("job_get", lambda client: client.hgetall(_job_key(job_id)), job_id=job_id)
+        return _decode_job(raw) if raw else None
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued or running job; returns its status afterwards. Chunks
+        already being scored finish, the rest are dropped by the workers."""
+        status = await cache.run_script(FINISH_SCRIPT, [_job_key(job_id)], [CANCELLED, _now(), ""])
+        return _text(status)
+
+    async def claim(self, consumer: str) -> Optional[Tuple[str, str, int]]:
+        """Next chunk for `consumer` as (message_id, job_id, index): first one abandoned
+        by a crashed worker, otherwise a new one"""
+        def command(client):
+            return client.xautoclaim(
+                self.stream,
+                self.group,
+                consumer,
+                min_idle_time=int(settings.JOBS_CHUNK_TIMEOUT * 1000),
+                count=1
+            )
+
+        claimed = await cache.run("job_claim", command, key=self.stream)
+        messages = claimed[1] if claimed else []
+        if not messages:
+            read = await cache.run(
+                "job_claim",
+                lambda client: client.xreadgroup(self.group, consumer, {self.stream: ">"}, count=1),
+                key=self.stream
+            )
+            messages = read[0][1] if read else []
+        if not messages:
+            return None
+
+        message_id, fields = messages[0]
+        fields = {_text(key): _text(value) for key, value in fields.items()}
+        return _text(message_id), fields["job_id"], int(fields["index"])
+
+    async def start(self, job_id: str) -> Optional[str]:
+        """Mark a queued job running; returns its status, EXPIRED if the job is gone,
+        or None if Redis is unavailable"""
+        return _text(await cache.run_script(START_SCRIPT, [_job_key(job_id)], [_now()]))
+
+    async def ack(self, message_id: str):
+        def command(client):
+            pipe = client.pipeline(transaction=False)
+            pipe.xack(self.stream, self.group, message_id)
+            pipe.xdel(self.stream, message_id)
+            return pipe.execute()
+
+        await cache.run("job_ack", command, key=self.stream)
+
+    async def complete(self, job_id: str, index: int, message_id: str, counts: Dict[str, int]) -> Optional[str]:
+        """Record a finished chunk, then acknowledge it; returns the job's status.
+        If Redis is unavailable (None) the chunk stays pending, to be reclaimed."""
+        args = [index, _now()]
+        for counter in COUNTERS:
+            args.extend([counter, counts.get(counter, 0)])
+        status = await cache.run_script(COMPLETE_SCRIPT, [_job_key(job_id), _done_key(job_id)], args)
+        if status is not None:
+            await self.ack(message_id)
+        return _text(status)
+
+    async def retry(self, job_id: str, index: int, message_id: str, error: str) -> bool:
+        """Requeue a failed chunk, or fail the job after JOBS_MAX_ATTEMPTS; True if requeued"""
+        def count_attempt(client):
+            pipe = client.pipeline(transaction=True)
+            pipe.hincrby(_attempts_key(job_id), index, 1)
+            pipe.expire(_attempts_key(job_id), settings.JOBS_TTL)
+            return pipe.execute()
+
+        result = await cache.run("job_retry", count_attempt, job_id=job_id)
+        attempts = result[0] if result else settings.JOBS_MAX_ATTEMPTS
+        if attempts >= settings.JOBS_MAX_ATTEMPTS:
+            await cache.run_script(
+                FINISH_SCRIPT,
+                [_job_key(job_id)],
+                [FAILED, _now(), f"Chunk {index} failed {attempts} times: {error}"]
+            )
+            await self.ack(message_id)
+            return False
+
+        def requeue(client):
+            pipe = client.pipeline(transaction=True)
+            pipe.xack(self.stream, self.group, message_id)
+            pipe.xdel(self.stream, message_id)
+            pipe.xadd(self.stream, {"job_id": job_id, "index": index})
+            return pipe.execute()
+
+        await cache.run("job_retry", requeue, job_id=job_id)
+        return True
+
+
+job_queue = JobQueue()
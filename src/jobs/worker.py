@@ -0,0 +1,132 @@
+import asyncio
+import os
+import signal
+import socket
+from typing import Dict, Optional
+from src.core import columnar
+from src.core.config import settings
+from src.core.drift import drift_monitor
+from src.core.model_loader import model_loader
+from src.db.database import AsyncSessionLocal
+from src.db import crud
+from src.jobs import files
+from src.jobs.queue import EXPIRED, FINISHED, OUTPUT_DB, OUTPUT_FILE, COUNTERS, JobQueue, job_queue
+import structlog
+
+logger = structlog.get_logger()
+
+
+class JobWorker:
+    """
+    Scores job chunks from the queue, one at a time, with the same columnar
+    pipeline as /predict/batch/columnar.
+
+    A chunk is acknowledged only after its results are written, so a worker that
+    dies mid-chunk loses only that chunk, which another worker picks up. Writes
+    are idempotent: result files are replaced and duplicate transaction ids are
+    skipped on insert.
+    """
+
+    def __init__(self, queue: JobQueue = job_queue, consumer: Optional[str] = None):
+        self.queue = queue
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self._stopping = False
+
+    async def score_chunk(self, job: dict, index: int) -> Dict[str, int]:
+        job_id = job["job_id"]
+        feature_names = model_loader.get_feature_names()
+        batch = await asyncio.to_thread(files.read_chunk, job_id, index * job["chunk_size"], job["chunk_size"])
+
+        # Invalid rows are counted and skipped rather than failing the chunk
+        invalid = columnar.invalid_mask(batch, feature_names)
+        valid = columnar.ColumnarBatch(batch.transaction_ids[~invalid], batch.features[~invalid])
+        counts = dict.fromkeys(COUNTERS, 0)
+        counts["processed_rows"] = len(batch.transaction_ids)
+        counts["invalid_rows"] = int(invalid.sum())
+        if not len(valid.transaction_ids):
+            return counts
+
+        results = await asyncio.to_thread(columnar.score, valid, feature_names)
+        counts["fraud_detected"] = int(results["prediction"].sum())
+
+        if job["output"] != OUTPUT_DB:
+            await asyncio.to_thread(files.write_result, job_id, index, valid.transaction_ids, results)
+        if job["output"] != OUTPUT_FILE:
+            rows = columnar.prediction_rows(valid, results, feature_names, model_loader.get_threshold())
+            async with AsyncSessionLocal() as db:
+                counts["inserted_rows"] = await crud.bulk_create_predictions(db, rows, model_version=settings.APP_VERSION)
+        return counts
+
+    async def run_once(self) -> bool:
+        """Process one chunk; False if there was nothing to do"""
+        claimed = await self.queue.claim(self.consumer)
+        if claimed is None:
+            return False
+        message_id, job_id, index = claimed
+
+        status = await self.queue.start(job_id)
+        if status == EXPIRED or status in FINISHED:
+            # Cancelled, failed or expired
+            await self.queue.ack(message_id)
+            return True
+        job = await self.queue.get(job_id) if status is not None else None
+        if job is None:
+            # Redis unavailable: leave the chunk pending, it is reclaimed after JOBS_CHUNK_TIMEOUT
+            logger.warning("job_chunk_deferred", job_id=job_id, chunk=index)
+            return False
+
+        try:
+            counts = await self.score_chunk(job, index)
+        except Exception as e:
+            requeued = await self.queue.retry(job_id, index, message_id, str(e))
+            logger.warning("job_chunk_failed", job_id=job_id, chunk=index, error=str(e), requeued=requeued)
+            return True
+
+        status = await self.queue.complete(job_id, index, message_id, counts)
+        if status is None:
+            logger.warning("job_chunk_unrecorded", job_id=job_id, chunk=index)
+            return False
+        logger.info("job_chunk_completed", job_id=job_id, chunk=index, status=status, **counts)
+        return True
+
+    async def run(self):
+        await self.queue.create_group()
+        logger.info("job_worker_started", consumer=self.consumer)
+        while not self._stopping:
+            try:
+                worked = await self.run_once()
+            except Exception as e:
+                logger.error("job_worker_error", error=str(e))
+                worked = False
+            if not worked:
+                await asyncio.sleep(settings.JOBS_POLL_INTERVAL)
+        logger.info("job_worker_stopped", consumer=self.consumer)
+
+    def stop(self):
+        """Finish the current chunk, then return from run()"""
+        self._stopping = True
+
+
+async def serve():
+    from src.core.cache import cache
+    from src.core.logging_setup import setup_logging
+
+    setup_logging()
+    await cache.connect()
+    await asyncio.to_thread(model_loader.load)
+    if settings.DRIFT_ENABLED and drift_monitor.load():
+        drift_monitor.start()
+
+    worker = JobWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await drift_monitor.stop()
+        await cache.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
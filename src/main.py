@@ -1,19 +1,47 @@
-from fastapi import FastAPI, HTTPException, Security, Depends, Request
+from fastapi import FastAPI, HTTPException, Security, Depends, Query, Request, Response, WebSocket, status
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import APIKeyHeader
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime
-import numpy as np
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+import os
+import secrets
+import shutil
 import time
+import uuid
 from pathlib import Path
 
 from src.core.config import get_settings, settings
 from src.core.model_loader import model_loader
-from src.core.cache import cache, get_health_cache, set_health_cache
-from src.core.rate_limiter import check_rate_limit
-from src.core.logging_setup import setup_logging, log_prediction, logger
+from src.core.cache import (
+    cache,
+    get_health_cache,
+    set_health_cache,
+    get_prediction_cache,
+    set_prediction_cache
+)
+from src.core.circuit_breaker import CircuitOpenError
+from src.core.rate_limiter import check_rate_limit, rate_limiter
+from src.core.logging_setup import setup_logging, logger
 from src.core.middleware import MonitoringMiddleware
-from src.db.database import get_db
+from src.core.admission import AdmissionMiddleware
+from src.core.bulk_feedback import BulkFeedbackInputError, ingest_feedback
+from src.core.drift import drift_monitor
+from src.core.loop_monitor import loop_monitor
+from src.core.profiler import ProfilerBusyError, StackSampler, dump_tasks
+from src.core import columnar, thresholds
+from src.core.scoring import score_transaction
+from src.core.stream_scoring import ScoringChannel
+from src.core.usage import usage_aggregator, LATENCY_BUCKETS_MS
+from src.core.prediction_stats import prediction_stats_aggregator
+from src.core.warmup import readiness, run_warmup
+from src.core.metrics import metrics_endpoint
+from src.jobs import files as job_files
+from src.jobs.queue import job_queue, CANCELLED, COMPLETED, OUTPUT_BOTH, OUTPUT_DB
+from src.db.database import get_db, get_read_db
 from src.db import crud
 from src.api.schemas import (
     PredictionRequest,
@@ -21,15 +49,28 @@ from src.api.schemas import (
     BatchPredictionRequest,
     BatchPredictionResponse,
     HealthResponse,
+    ReadinessResponse,
     SimpleTransactionRequest,
     SimpleTransactionInput
 )
+from src.api.serialization import ValidatedBody
 from src.api.prediction_schemas import (
     FeedbackCreate,
     FeedbackResponse,
-    PredictionDetail
+    BulkFeedbackResponse,
+    PredictionDetail,
+    StatsBucket,
+    StatsResponse,
+    UsageBucket,
+    UsageResponse,
+    JobResponse,
+    DriftResponse,
+    ThresholdTarget,
+    ThresholdAnalysisResponse,
+    ThresholdVersionCreate,
+    ModelVersionResponse
 )
-from typing import List
+from typing import List, Literal, Optional
 from uuid import UUID
 
 setup_logging()
@@ -53,15 +94,59 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so shed requests skip everything else
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+if settings.ENABLE_METRICS:
+    app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """A dependency behind an open breaker: answer at once and say when to come back"""
+    logger.warning("circuit_open_rejected", breaker=exc.name, path=request.url.path)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable, retry later"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 @app.on_event("startup")
 async def startup_event():
-    await cache.connect()
+    # Warmup runs in the background so liveness probes are answered while
+    # /ready holds traffic back until the model and pools are warm
+    if settings.WARMUP_ENABLED:
+        app.state.warmup_task = asyncio.create_task(run_warmup())
+    else:
+        await cache.connect()
+        readiness.mark_ready({}, 0.0)
+    if settings.ENABLE_USAGE_TRACKING:
+        usage_aggregator.start()
+    prediction_stats_aggregator.start()
+    if settings.DRIFT_ENABLED and drift_monitor.load():
+        drift_monitor.start()
+    rate_limiter.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    if settings.GRPC_ENABLED:
+        # Imported here so grpc is only loaded when the service is enabled
+        from src.rpc.server import start_server
+        app.state.grpc_server, _ = await start_server(f"{settings.GRPC_HOST}:{settings.GRPC_PORT}")
     logger.info("application_startup", version=settings.APP_VERSION)
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    grpc_server = getattr(app.state, "grpc_server", None)
+    if grpc_server is not None:
+        await grpc_server.stop(settings.GRPC_SHUTDOWN_GRACE)
+    await usage_aggregator.stop()
+    await prediction_stats_aggregator.stop()
+    await drift_monitor.stop()
+    await rate_limiter.stop()
+    await loop_monitor.stop()
     await cache.disconnect()
     logger.info("application_shutdown")
 
@@ -69,10 +154,19 @@ async def verify_api_key(request: Request, api_key: str = Security(api_key_heade
     if api_key != settings.API_KEY:
         raise HTTPException(status_code=403, detail="Invalid API Key")
     
+    request.state.api_key = api_key
     await check_rate_limit(request, api_key)
     return api_key
 
 
+async def verify_admin_key(api_key: str = Security(api_key_header)):
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    if api_key is None or not secrets.compare_digest(api_key, settings.ADMIN_API_KEY):
+        raise HTTPException(status_code=403, detail="Invalid admin API Key")
+    return api_key
+
+
 @app.get("/", tags=["Root"])
 async def root():
     return {
@@ -101,6 +195,8 @@ async def health_check():
         if cached_health:
             return HealthResponse(**cached_health)
         
+        # Loads off the event loop if a request arrives before warmup has
+        await asyncio.to_thread(model_loader.load)
         metadata = model_loader.get_metadata()
         health_data = {
             "status": "healthy",
@@ -116,111 +212,62 @@ async def health_check():
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
 
+@app.get("/ready", response_model=ReadinessResponse, tags=["Health"])
+async def readiness_check():
+    """Readiness probe: 503 until startup warmup has finished"""
+    if not readiness.ready:
+        return JSONResponse(
+            status_code=503,
+            content=ReadinessResponse(status="starting", checks=readiness.checks).model_dump()
+        )
+    return ReadinessResponse(
+        status="ready",
+        checks=readiness.checks,
+        warmup_duration_ms=readiness.duration_ms
+    )
+
+
+predict_body = ValidatedBody(PredictionRequest)
+simple_predict_body = ValidatedBody(SimpleTransactionRequest)
+batch_predict_body = ValidatedBody(BatchPredictionRequest)
+
+
+async def _predict(request: PredictionRequest, db: AsyncSession, timestamp: Optional[datetime] = None) -> dict:
+    try:
+        # V1-V28, Time, Amount in field order, already floats
+        return await score_transaction(db, request.transaction_id, request.transaction.model_dump(), timestamp)
+    except Exception as e:
+        logger.error("prediction_error", error=str(e), transaction_id=request.transaction_id)
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
 @app.post(
     f"{settings.API_V1_PREFIX}/predict",
     response_model=PredictionResponse,
-    tags=["Prediction"]
+    tags=["Prediction"],
+    openapi_extra=predict_body.openapi
 )
 async def predict_fraud(
-    request: PredictionRequest,
-    db: AsyncSession = Depends(get_db),
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: PredictionRequest = Depends(predict_body),
+    db: AsyncSession = Depends(get_db)
 ):
-    try:
-        transaction = request.transaction
-        start_time = time.time()
-        
-        # Extract V1-V28 features
-        v_features = [
-            transaction.V1, transaction.V2, transaction.V3, transaction.V4,
-            transaction.V5, transaction.V6, transaction.V7, transaction.V8,
-            transaction.V9, transaction.V10, transaction.V11, transaction.V12,
-            transaction.V13, transaction.V14, transaction.V15, transaction.V16,
-            transaction.V17, transaction.V18, transaction.V19, transaction.V20,
-            transaction.V21, transaction.V22, transaction.V23, transaction.V24,
-            transaction.V25, transaction.V26, transaction.V27, transaction.V28
-        ]
-        
-        # Scale Time and Amount separately (matching training process)
-        scaler = model_loader.get_scaler()
-        time_scaled = scaler.transform([[transaction.Time]])[0][0]
-        amount_scaled = scaler.transform([[transaction.Amount]])[0][0]
-        
-        # Build final feature array: V1-V28, Time_scaled, Amount_scaled
-        features = np.array([v_features + [time_scaled, amount_scaled]])
-        
-        model = model_loader.get_model()
-        anomaly_score = model.decision_function(features)[0]
-        threshold = model_loader.get_threshold()
-        
-        prediction = 1 if anomaly_score < threshold else 0
-        fraud_probability = max(0, min(1, (threshold - anomaly_score) / (threshold + 0.1)))
-        
-        if fraud_probability >= 0.7:
-            risk_level = "HIGH"
-        elif fraud_probability >= 0.3:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
-        
-        prediction_time = time.time() - start_time
-        
-        log_prediction(
-            transaction_id=request.transaction_id,
-            prediction=bool(prediction),
-            probability=float(fraud_probability),
-            risk_level=risk_level
-        )
-        
-        features_dict = {
-            **{f"V{i+1}": float(transaction.dict()[f"V{i+1}"]) for i in range(28)},
-            "Time": float(transaction.Time),
-            "Amount": float(transaction.Amount)
-        }
-        
-        # Try to save to database, but don't fail if database is unavailable
-        try:
-            await crud.create_prediction(
-                db=db,
-                transaction_id=request.transaction_id,
-                prediction=bool(prediction),
-                fraud_probability=float(fraud_probability),
-                risk_level=risk_level,
-                anomaly_score=float(anomaly_score),
-                threshold=float(threshold),
-                model_version=settings.APP_VERSION,
-                features=features_dict
-            )
-        except Exception as db_error:
-            logger.warning("database_save_failed", error=str(db_error), transaction_id=request.transaction_id)
-        
-        return PredictionResponse(
-            transaction_id=request.transaction_id,
-            prediction=prediction,
-            fraud_probability=round(fraud_probability, 4),
-            risk_level=risk_level,
-            anomaly_score=round(float(anomaly_score), 4),
-            threshold=round(threshold, 4),
-            timestamp=datetime.now(),
-            model_version=settings.APP_VERSION
-        )
-        
-    except Exception as e:
-        logger.error("prediction_error", error=str(e), transaction_id=request.transaction_id)
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+    # Returning a Response skips FastAPI's response_model validation and jsonable_encoder
+    return ORJSONResponse(await _predict(request, db))
 
 
 @app.post(
     f"{settings.API_V1_PREFIX}/predict/simple",
     response_model=PredictionResponse,
     tags=["Prediction"],
+    openapi_extra=simple_predict_body.openapi,
     summary="Simple Fraud Check (User-Friendly)",
     description="Easy-to-use fraud detection endpoint. Just provide transaction amount and optionally time of day. Perfect for non-technical users!"
 )
 async def predict_fraud_simple(
-    request: SimpleTransactionRequest,
-    db: AsyncSession = Depends(get_db),
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: SimpleTransactionRequest = Depends(simple_predict_body),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Simplified fraud detection endpoint for regular users.
@@ -245,78 +292,13 @@ async def predict_fraud_simple(
         
         # Use neutral/average values for V1-V28 features
         # These are median values from the training dataset
-        default_v_features = [
-            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
-            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
-            0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        ]
-        
-        start_time = time.time()
-        
-        # Scale Time and Amount
-        scaler = model_loader.get_scaler()
-        time_scaled = scaler.transform([[time_value]])[0][0]
-        amount_scaled = scaler.transform([[request.transaction.amount]])[0][0]
-        
-        # Build feature array
-        features = np.array([default_v_features + [time_scaled, amount_scaled]])
-        
-        # Make prediction
-        model = model_loader.get_model()
-        anomaly_score = model.decision_function(features)[0]
-        threshold = model_loader.get_threshold()
-        
-        prediction = 1 if anomaly_score < threshold else 0
-        fraud_probability = max(0, min(1, (threshold - anomaly_score) / (threshold + 0.1)))
-        
-        if fraud_probability >= 0.7:
-            risk_level = "HIGH"
-        elif fraud_probability >= 0.3:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
-        
-        prediction_time = time.time() - start_time
-        
-        log_prediction(
-            transaction_id=request.transaction_id,
-            prediction=bool(prediction),
-            probability=float(fraud_probability),
-            risk_level=risk_level
-        )
-        
-        features_dict = {
+        features = {
             **{f"V{i+1}": 0.0 for i in range(28)},
             "Time": float(time_value),
             "Amount": float(request.transaction.amount)
         }
         
-        # Try to save to database
-        try:
-            await crud.create_prediction(
-                db=db,
-                transaction_id=request.transaction_id,
-                prediction=bool(prediction),
-                fraud_probability=float(fraud_probability),
-                risk_level=risk_level,
-                anomaly_score=float(anomaly_score),
-                threshold=float(threshold),
-                model_version=settings.APP_VERSION,
-                features=features_dict
-            )
-        except Exception as db_error:
-            logger.warning("database_save_failed", error=str(db_error), transaction_id=request.transaction_id)
-        
-        return PredictionResponse(
-            transaction_id=request.transaction_id,
-            prediction=prediction,
-            fraud_probability=round(fraud_probability, 4),
-            risk_level=risk_level,
-            anomaly_score=round(float(anomaly_score), 4),
-            threshold=round(threshold, 4),
-            timestamp=datetime.now(),
-            model_version=settings.APP_VERSION
-        )
+        return ORJSONResponse(await score_transaction(db, request.transaction_id, features))
         
     except Exception as e:
         logger.error("prediction_error", error=str(e), transaction_id=request.transaction_id)
@@ -326,38 +308,147 @@ async def predict_fraud_simple(
 @app.post(
     f"{settings.API_V1_PREFIX}/predict/batch",
     response_model=BatchPredictionResponse,
-    tags=["Prediction"]
+    tags=["Prediction"],
+    openapi_extra=batch_predict_body.openapi
 )
 async def predict_batch(
-    request: BatchPredictionRequest,
-    db: AsyncSession = Depends(get_db),
-    api_key: str = Depends(verify_api_key)
+    api_key: str = Depends(verify_api_key),
+    request: BatchPredictionRequest = Depends(batch_predict_body),
+    db: AsyncSession = Depends(get_db)
 ):
     start_time = time.time()
     
     try:
         predictions = []
         fraud_count = 0
+        timestamp = datetime.now()
         
         for txn_request in request.transactions:
-            result = await predict_fraud(txn_request, db, api_key)
+            result = await _predict(txn_request, db, timestamp)
             predictions.append(result)
-            if result.prediction == 1:
-                fraud_count += 1
+            fraud_count += result["prediction"]
         
         processing_time = (time.time() - start_time) * 1000
         
-        return BatchPredictionResponse(
-            predictions=predictions,
-            total_processed=len(predictions),
-            fraud_detected=fraud_count,
-            processing_time_ms=round(processing_time, 2)
-        )
+        # Items are already PredictionResponse-shaped; skip revalidating each one
+        return ORJSONResponse({
+            "predictions": predictions,
+            "total_processed": len(predictions),
+            "fraud_detected": fraud_count,
+            "processing_time_ms": round(processing_time, 2)
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
 
 
+@app.post(
+    f"{settings.API_V1_PREFIX}/predict/batch/columnar",
+    response_class=Response,
+    tags=["Prediction"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                columnar.ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}},
+                columnar.NPZ: {"schema": {"type": "string", "format": "binary"}}
+            }
+        }
+    }
+)
+async def predict_batch_columnar(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Score a columnar batch: an Arrow IPC stream or an .npz archive.
+    
+    Arrow bodies carry a `transaction_id` column plus one float column per name in
+    the model metadata's `feature_names`. .npz bodies carry `transaction_id` (n,)
+    and `features` (n, n_features) in that same order. Rows are validated and
+    scored as whole arrays. Results come back in the request's format, with
+    columns transaction_id, prediction, fraud_probability, risk_level and
+    anomaly_score.
+    """
+    kind = columnar.media_type(request.headers.get("content-type", ""))
+    if kind is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Expected {columnar.ARROW_STREAM} or {columnar.NPZ}"
+        )
+    
+    feature_names = model_loader.get_feature_names()
+    try:
+        batch = columnar.decode(await request.body(), kind, feature_names)
+        columnar.validate(batch, feature_names, settings.COLUMNAR_BATCH_MAX_ROWS)
+    except columnar.ColumnarInputError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "rows": e.rows})
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Arrow input requires pyarrow on the server")
+    
+    # One decision_function call over the whole matrix; off the loop so it doesn't stall other requests
+    results = await asyncio.to_thread(columnar.score, batch, feature_names)
+    threshold = model_loader.get_threshold()
+    
+    try:
+        await crud.bulk_create_predictions(
+            db,
+            columnar.prediction_rows(batch, results, feature_names, threshold),
+            model_version=settings.APP_VERSION
+        )
+    except Exception as db_error:
+        logger.warning("database_save_failed", error=str(db_error), rows=len(batch.transaction_ids))
+    
+    logger.info(
+        "columnar_batch_scored",
+        format=kind,
+        rows=len(batch.transaction_ids),
+        fraud_detected=int(results["prediction"].sum())
+    )
+    
+    return Response(
+        content=columnar.encode(kind, batch.transaction_ids, results),
+        media_type=kind,
+        headers={"X-Model-Version": settings.APP_VERSION, "X-Threshold": str(round(threshold, 4))}
+    )
+
+
+# Close code for a connection refused by the rate limiter (4000-4999 are application codes)
+WS_RATE_LIMITED = 4429
+
+
+@app.websocket(f"{settings.API_V1_PREFIX}/predict/stream")
+async def predict_stream(websocket: WebSocket):
+    """
+    Persistent scoring channel for high-frequency clients.
+    
+    The API key (X-API-Key header or `api_key` query parameter) and the rate limit
+    are checked once, when the connection opens. Each text or binary frame is a
+    PredictionRequest; each answer is a PredictionResponse frame, or a frame with
+    `transaction_id` and `detail` for an invalid or failed one. Frames may be
+    pipelined; see ScoringChannel for batching and in-flight limits.
+    """
+    api_key = websocket.headers.get("x-api-key") or websocket.query_params.get("api_key")
+    if api_key != settings.API_KEY:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    try:
+        await rate_limiter.check_rate_limit(api_key, f"WS:{websocket.url.path}")
+    except HTTPException as e:
+        await websocket.close(code=WS_RATE_LIMITED, reason=f"{e.detail}; retry after {e.headers['Retry-After']} s")
+        return
+    
+    channel = ScoringChannel(websocket)
+    logger.info("scoring_channel_opened")
+    try:
+        await channel.run()
+    finally:
+        logger.info("scoring_channel_closed", frames=channel.frames, batches=channel.batches)
+
+
 @app.get(
     f"{settings.API_V1_PREFIX}/predictions/{{prediction_id}}",
     response_model=PredictionDetail,
@@ -365,13 +456,43 @@ async def predict_batch(
 )
 async def get_prediction(
     prediction_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     api_key: str = Depends(verify_api_key)
 ):
+    cached_prediction = await get_prediction_cache(prediction_id=prediction_id)
+    if cached_prediction:
+        return cached_prediction
+    
     prediction = await crud.get_prediction(db, prediction_id)
     if not prediction:
         raise HTTPException(status_code=404, detail="Prediction not found")
-    return prediction
+    
+    detail = PredictionDetail.model_validate(prediction)
+    await set_prediction_cache(detail.model_dump(mode="json"))
+    return detail
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/predictions/by-transaction/{{transaction_id}}",
+    response_model=PredictionDetail,
+    tags=["Predictions"]
+)
+async def get_prediction_by_transaction_id(
+    transaction_id: str,
+    db: AsyncSession = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)
+):
+    cached_prediction = await get_prediction_cache(transaction_id=transaction_id)
+    if cached_prediction:
+        return cached_prediction
+    
+    prediction = await crud.get_prediction_by_transaction_id(db, transaction_id)
+    if not prediction:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    
+    detail = PredictionDetail.model_validate(prediction)
+    await set_prediction_cache(detail.model_dump(mode="json"))
+    return detail
 
 
 @app.get(
@@ -383,7 +504,7 @@ async def list_predictions(
     skip: int = 0,
     limit: int = 100,
     fraud_only: bool = False,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     api_key: str = Depends(verify_api_key)
 ):
     predictions = await crud.get_predictions(db, skip=skip, limit=limit, fraud_only=fraud_only)
@@ -400,8 +521,14 @@ async def submit_feedback(
     db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_api_key)
 ):
-    prediction = await crud.get_prediction(db, feedback.prediction_id)
-    if not prediction:
+    # Existence check: served from the prediction cache when warm, otherwise a
+    # single-column lookup instead of loading the whole row
+    cached_prediction = await get_prediction_cache(prediction_id=feedback.prediction_id)
+    if cached_prediction:
+        transaction_id = cached_prediction["transaction_id"]
+    else:
+        transaction_id = await crud.get_prediction_transaction_id(db, feedback.prediction_id)
+    if not transaction_id:
         raise HTTPException(status_code=404, detail="Prediction not found")
     
     db_feedback = await crud.create_feedback(
@@ -409,7 +536,8 @@ async def submit_feedback(
         prediction_id=feedback.prediction_id,
         actual_label=feedback.actual_label,
         feedback_source=feedback.feedback_source,
-        notes=feedback.notes
+        notes=feedback.notes,
+        transaction_id=transaction_id
     )
     
     logger.info(
@@ -422,31 +550,473 @@ async def submit_feedback(
     return db_feedback
 
 
+@app.post(
+    f"{settings.API_V1_PREFIX}/feedback/bulk",
+    response_model=BulkFeedbackResponse,
+    tags=["Feedback"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/x-ndjson": {"schema": {"type": "string"}},
+                "text/csv": {"schema": {"type": "string"}}
+            }
+        }
+    }
+)
+async def submit_feedback_bulk(
+    request: Request,
+    feedback_source: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Ingest a file of labels as NDJSON or CSV.
+    
+    Each row carries `prediction_id` or `transaction_id`, `actual_label` and
+    `feedback_source` (or `source`); the `feedback_source` query parameter is used
+    for rows without one. Invalid or unknown rows are reported by line number
+    without aborting the batch.
+    """
+    content_type = request.headers.get("content-type", "")
+    if not any(kind in content_type for kind in ("csv", "ndjson", "jsonl")):
+        raise HTTPException(
+            status_code=415,
+            detail="Expected text/csv or application/x-ndjson"
+        )
+    
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > settings.FEEDBACK_BULK_MAX_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Upload exceeds {settings.FEEDBACK_BULK_MAX_BYTES} bytes"
+            )
+    
+    try:
+        result = await ingest_feedback(db, bytes(body), content_type, default_source=feedback_source)
+    except BulkFeedbackInputError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    logger.info(
+        "bulk_feedback_submitted",
+        total_rows=result.total_rows,
+        inserted=result.inserted,
+        failed=result.failed
+    )
+    
+    return result
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Query datetimes as naive UTC, like the DateTime columns they are compared with"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/stats",
+    response_model=StatsResponse,
+    tags=["Monitoring"]
+)
+async def prediction_stats(
+    interval: Literal["minute", "hour", "day"] = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    model_version: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Time-bucketed fraud statistics served from the per-minute rollup table.
+    
+    Defaults to the last 24 hours, in UTC; timestamps with an offset are converted.
+    Cost scales with the number of buckets in the window, not with the number of
+    stored predictions. The most recent flush interval may not be included yet.
+    """
+    end = _utc_naive(end) or datetime.utcnow()
+    start = _utc_naive(start) or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    rows = await crud.get_prediction_stats(
+        db, start=start, end=end, interval=interval, model_version=model_version
+    )
+    
+    buckets = []
+    for row in rows:
+        total = row["total_count"] or 0
+        buckets.append(StatsBucket(
+            bucket_start=row["bucket_start"],
+            model_version=row["model_version"],
+            total_count=total,
+            fraud_count=row["fraud_count"],
+            fraud_rate=round(row["fraud_count"] / total, 6) if total else 0.0,
+            low_count=row["low_count"],
+            medium_count=row["medium_count"],
+            high_count=row["high_count"],
+            avg_fraud_probability=round(row["fraud_probability_sum"] / total, 6) if total else 0.0,
+            avg_anomaly_score=round(row["anomaly_score_sum"] / total, 6) if total else 0.0
+        ))
+    
+    return StatsResponse(interval=interval, start=start, end=end, buckets=buckets)
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/usage",
+    response_model=UsageResponse,
+    tags=["Monitoring"]
+)
+async def api_usage(
+    interval: Literal["minute", "hour", "day"] = "hour",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Request counts, status classes and latency histogram for the calling API key,
+    per route and time bucket. Defaults to the last 24 hours, in UTC; timestamps
+    with an offset are converted. The most recent flush interval may not be
+    included yet.
+    """
+    end = _utc_naive(end) or datetime.utcnow()
+    start = _utc_naive(start) or end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    rows = await crud.get_api_usage(db, api_key=api_key, start=start, end=end, interval=interval)
+    
+    histogram_columns = [column for _, column in LATENCY_BUCKETS_MS] + ["latency_inf"]
+    buckets = [
+        UsageBucket(
+            bucket_start=row["bucket_start"],
+            endpoint=row["endpoint"],
+            method=row["method"],
+            request_count=row["request_count"],
+            status_2xx=row["status_2xx"],
+            status_3xx=row["status_3xx"],
+            status_4xx=row["status_4xx"],
+            status_5xx=row["status_5xx"],
+            avg_latency_ms=round(row["latency_sum_ms"] / row["request_count"], 2) if row["request_count"] else 0.0,
+            max_latency_ms=round(row["latency_max_ms"], 2),
+            latency_histogram={column.replace("latency_", "le_"): row[column] for column in histogram_columns}
+        )
+        for row in rows
+    ]
+    
+    return UsageResponse(interval=interval, start=start, end=end, buckets=buckets)
+
+
 @app.get(
     f"{settings.API_V1_PREFIX}/cache/stats",
     tags=["Monitoring"]
 )
 async def cache_stats(api_key: str = Depends(verify_api_key)):
+    """Hit ratios by key prefix and near-cache state, tracked in-process (this worker only)"""
+    return cache.get_stats()
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/drift",
+    response_model=DriftResponse,
+    tags=["Monitoring"]
+)
+async def drift_report(
+    hours: int = Query(settings.DRIFT_WINDOW_HOURS, ge=1, le=settings.DRIFT_RETENTION_HOURS),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    PSI and binned KS distance of each feature and of the anomaly score over the
+    last `hours` hours, against the training reference. Counts from all workers
+    are merged through Redis; without Redis, only this worker's are reported
+    (`scope`). PSI status: stable below 0.1, moderate below 0.25, then significant.
+    """
+    report = await drift_monitor.report(hours)
+    if report is None:
+        raise HTTPException(status_code=404, detail="No drift reference loaded")
+    return report
+
+
+async def _threshold_analysis(
+    db: AsyncSession,
+    model_version: str,
+    since: Optional[datetime],
+    target: ThresholdTarget,
+    points: int = 200
+) -> dict:
+    since = _utc_naive(since)
+    scores, labels = await crud.get_labeled_scores(db, model_version=model_version, since=since)
+    if not labels.any() or labels.all():
+        raise HTTPException(
+            status_code=422,
+            detail=f"Need labeled predictions of both classes for model version {model_version}, "
+                   f"have {len(labels)} ({int(labels.sum())} fraud)"
+        )
+    if model_version == settings.APP_VERSION:
+        current_threshold = model_loader.get_threshold()
+    else:
+        registered = await crud.get_model_version(db, model_version)
+        current_threshold = registered.threshold if registered else None
+    # The sort is the expensive part; keep it off the event loop
+    analysis = await asyncio.to_thread(
+        thresholds.analyze, scores, labels, current_threshold, points, **target.model_dump()
+    )
+    return {"model_version": model_version, **analysis}
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/thresholds/analysis",
+    response_model=ThresholdAnalysisResponse,
+    tags=["Monitoring"]
+)
+async def threshold_analysis(
+    objective: Literal["f1", "recall", "precision"] = "f1",
+    min_precision: Optional[float] = Query(None, ge=0, le=1),
+    min_recall: Optional[float] = Query(None, ge=0, le=1),
+    max_alert_rate: Optional[float] = Query(None, ge=0, le=1),
+    since: Optional[datetime] = None,
+    model_version: str = settings.APP_VERSION,
+    points: int = Query(200, ge=2, le=5000),
+    db: AsyncSession = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Precision, recall, F1 and alert volume at every threshold, from the anomaly
+    scores of predictions with feedback (latest label each).
+
+    `target` is the point maximizing `objective` among those meeting every given
+    constraint (null if none does). `current` is the serving threshold, or for
+    another `model_version` its threshold in model_versions (null if it is not
+    registered). The curve is thinned to `points` entries; both operating points
+    come from the full curve.
+    """
+    target = ThresholdTarget(
+        objective=objective, min_precision=min_precision, min_recall=min_recall, max_alert_rate=max_alert_rate
+    )
+    return await _threshold_analysis(db, model_version, since, target, points)
+
+
+@app.post(
+    f"{settings.API_V1_PREFIX}/thresholds/model-versions",
+    response_model=ModelVersionResponse,
+    status_code=201,
+    tags=["Monitoring"]
+)
+async def create_threshold_version(
+    request: ThresholdVersionCreate,
+    db: AsyncSession = Depends(get_db),
+    api_key: str = Depends(verify_admin_key)
+):
+    """
+    Register a model version with the serving model and the threshold picked by
+    the analysis for the given target; requires the admin key. `activate` marks
+    it active in model_versions; the threshold in model_metadata.json keeps
+    serving until it is updated.
+    """
+    target = ThresholdTarget(**request.model_dump(include=set(ThresholdTarget.model_fields)))
+    analysis = await _threshold_analysis(db, settings.APP_VERSION, request.since, target, points=2)
+    point = analysis["target"]
+    if point is None:
+        raise HTTPException(status_code=422, detail="No threshold meets the target constraints")
+
     try:
-        if not cache.redis_client:
-            await cache.connect()
-        
-        info = await cache.redis_client.info()
-        return {
-            "connected": True,
-            "used_memory": info.get("used_memory_human"),
-            "total_keys": await cache.redis_client.dbsize(),
-            "hits": info.get("keyspace_hits", 0),
-            "misses": info.get("keyspace_misses", 0),
-            "hit_rate": round(
-                info.get("keyspace_hits", 0) / 
-                max(info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0), 1) * 100,
-                2
-            )
+        model_version = await crud.create_model_version(
+            db,
+            version=request.version,
+            threshold=point["threshold"],
+            metrics={
+                **{k: point[k] for k in ("precision", "recall", "f1_score", "false_positive_rate", "alert_rate")},
+                "base_version": settings.APP_VERSION,
+                "target": target.model_dump(),
+                "labeled_rows": analysis["labeled_rows"],
+                "fraud_rows": analysis["fraud_rows"]
+            },
+            is_active=request.activate
+        )
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=f"Model version {request.version} already exists")
+
+    logger.info("threshold_version_created", version=request.version, threshold=point["threshold"], f1_score=point["f1_score"])
+    return model_version
+
+
+@app.post(
+    f"{settings.API_V1_PREFIX}/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    tags=["Jobs"],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                media_type: {"schema": {"type": "string", "format": "binary"}}
+                for media_type in job_files.MEDIA_TYPES
+            }
         }
-    except Exception as e:
-        return {"connected": False, "error": str(e)}
+    }
+)
+async def submit_job(
+    request: Request,
+    output: Literal["file", "db", "both"] = OUTPUT_BOTH,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Queue a file of transactions for scoring: CSV, NDJSON or Parquet with a
+    `transaction_id` column and one column per name in the model metadata's
+    `feature_names`.
+    
+    The file is split into chunks scored by job workers (`python -m src.jobs.worker`).
+    `output` picks where results go: Arrow files served by `/jobs/{job_id}/results`,
+    the predictions table, or both. Poll `/jobs/{job_id}` for progress.
+    """
+    kind = job_files.input_format(request.headers.get("content-type", ""))
+    if kind is None:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Expected one of {', '.join(job_files.MEDIA_TYPES)}"
+        )
+    
+    job_id = uuid.uuid4().hex
+    directory = job_files.job_dir(job_id)
+    directory.mkdir(parents=True)
+    upload = directory / f"upload.{kind}"
+    try:
+        # Streamed to disk, so a large upload is never held in memory
+        size = 0
+        with open(upload, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.JOBS_MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {settings.JOBS_MAX_UPLOAD_BYTES} bytes")
+                f.write(chunk)
+        
+        total_rows = await asyncio.to_thread(
+            job_files.convert_input, upload, kind, job_files.input_path(job_id), model_loader.get_feature_names()
+        )
+        if total_rows == 0:
+            raise HTTPException(status_code=422, detail="File has no rows")
+        
+        job = await job_queue.submit(job_id, kind, output, total_rows, settings.JOBS_CHUNK_SIZE)
+        if job is None:
+            raise HTTPException(status_code=503, detail="Job queue unavailable")
+    except job_files.JobInputError as e:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise HTTPException(status_code=422, detail=str(e))
+    except BaseException:
+        # Any failure, including a cancelled request, leaves nothing behind
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+    finally:
+        upload.unlink(missing_ok=True)
+    
+    logger.info("job_submitted", job_id=job_id, format=kind, output=output, rows=total_rows, chunks=job["total_chunks"])
+    return job
+
+
+async def _get_job(job_id: str) -> dict:
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/jobs/{{job_id}}",
+    response_model=JobResponse,
+    tags=["Jobs"]
+)
+async def get_job(job_id: str, api_key: str = Depends(verify_api_key)):
+    """Status and progress of a job"""
+    return await _get_job(job_id)
+
 
+@app.post(
+    f"{settings.API_V1_PREFIX}/jobs/{{job_id}}/cancel",
+    response_model=JobResponse,
+    tags=["Jobs"]
+)
+async def cancel_job(job_id: str, api_key: str = Depends(verify_api_key)):
+    """Cancel a queued or running job; chunks already scored keep their results"""
+    await _get_job(job_id)
+    job_status = await job_queue.cancel(job_id)
+    if job_status != CANCELLED:
+        raise HTTPException(status_code=409, detail=f"Job is {job_status}")
+    logger.info("job_cancelled", job_id=job_id)
+    return await _get_job(job_id)
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/jobs/{{job_id}}/results",
+    response_class=StreamingResponse,
+    tags=["Jobs"]
+)
+async def get_job_results(job_id: str, api_key: str = Depends(verify_api_key)):
+    """
+    Results of a completed job as one Arrow IPC stream with columns transaction_id,
+    prediction, fraud_probability, risk_level and anomaly_score. Invalid rows are
+    left out and counted in the job's `invalid_rows`.
+    """
+    job = await _get_job(job_id)
+    if job["output"] == OUTPUT_DB:
+        raise HTTPException(status_code=404, detail="Job results were written to the database only")
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return StreamingResponse(job_files.iter_results(job_id), media_type=columnar.ARROW_STREAM)
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/admin/profile",
+    tags=["Admin"]
+)
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=settings.PROFILER_MIN_INTERVAL_MS, le=1000),
+    format: Literal["collapsed", "speedscope"] = "collapsed",
+    pid: Optional[int] = None,
+    api_key: str = Depends(verify_admin_key)
+):
+    """
+    Sample the Python stacks of every thread in the worker serving this request
+    for `seconds`, every `interval_ms`. Returns folded stacks (text, for
+    flamegraph.pl) or a speedscope JSON file. Each sample costs tens of
+    microseconds, so the default 10 ms interval stays around 1% of a core;
+    requests keep being served while it runs. One profile per worker at a time.
+
+    With several workers, `pid` names the one to profile: a request that lands
+    on another worker gets a 409 naming it, so retry until X-Worker-PID matches.
+    """
+    if pid is not None and pid != os.getpid():
+        raise HTTPException(status_code=409, detail=f"Served by worker {os.getpid()}, not {pid}")
+    try:
+        sampler = await StackSampler(interval_ms / 1000).profile(seconds)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    overhead = sampler.overhead()
+    logger.info("profile_completed", seconds=seconds, format=format, **overhead)
+
+    headers = {
+        "X-Worker-PID": str(os.getpid()),
+        "X-Profile-Samples": str(overhead["samples"]),
+        "X-Profile-Sample-Cost-Us": str(overhead["mean_sample_us"])
+    }
+    if format == "speedscope":
+        return JSONResponse(sampler.speedscope(f"worker {os.getpid()}, {seconds:g}s"), headers=headers)
+    return PlainTextResponse(sampler.collapsed(), headers=headers)
+
+
+@app.get(
+    f"{settings.API_V1_PREFIX}/admin/tasks",
+    tags=["Admin"]
+)
+async def asyncio_tasks(response: Response, api_key: str = Depends(verify_admin_key)):
+    """Every asyncio task in this worker and the frame it is suspended in"""
+    response.headers["X-Worker-PID"] = str(os.getpid())
+    tasks = dump_tasks()
+    return {"pid": os.getpid(), "count": len(tasks), "tasks": tasks}
 
 if __name__ == "__main__":
     import uvicorn
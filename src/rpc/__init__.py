@@ -0,0 +1 @@
+"""gRPC scoring service"""
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: src/rpc/scoring.proto
+# Protobuf Python Version: 5.27.2
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    27,
+    2,
+    '',
+    'src/rpc/scoring.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x15src/rpc/scoring.proto\x12\x08\x66raud.v1\"<\n\x0cScoreRequest\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x14\n\x08\x66\x65\x61tures\x18\x02 \x03(\x01\x42\x02\x10\x01\"\xc1\x01\n\rScoreResponse\x12\x16\n\x0etransaction_id\x18\x01 \x01(\t\x12\x12\n\nprediction\x18\x02 \x01(\x05\x12\x19\n\x11\x66raud_probability\x18\x03 \x01(\x01\x12\x12\n\nrisk_level\x18\x04 \x01(\t\x12\x15\n\ranomaly_score\x18\x05 \x01(\x01\x12\x11\n\tthreshold\x18\x06 \x01(\x01\x12\x15\n\rmodel_version\x18\x07 \x01(\t\x12\x14\n\x0ctimestamp_ms\x18\x08 \x01(\x03\x32\x87\x01\n\x07Scoring\x12\x38\n\x05Score\x12\x16.fraud.v1.ScoreRequest\x1a\x17.fraud.v1.ScoreResponse\x12\x42\n\x0bScoreStream\x12\x16.fraud.v1.ScoreRequest\x1a\x17.fraud.v1.ScoreResponse(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'src.rpc.scoring_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_SCOREREQUEST'].fields_by_name['features']._loaded_options = None
+  _globals['_SCOREREQUEST'].fields_by_name['features']._serialized_options = b'\020\001'
+  _globals['_SCOREREQUEST']._serialized_start=35
+  _globals['_SCOREREQUEST']._serialized_end=95
+  _globals['_SCORERESPONSE']._serialized_start=98
+  _globals['_SCORERESPONSE']._serialized_end=291
+  _globals['_SCORING']._serialized_start=294
+  _globals['_SCORING']._serialized_end=429
+# @@protoc_insertion_point(module_scope)
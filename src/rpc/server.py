@@ -0,0 +1,135 @@
+import asyncio
+import math
+from typing import AsyncIterator, Dict, Tuple
+import grpc
+from fastapi import HTTPException
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.core.rate_limiter import rate_limiter
+from src.core.scoring import score_transaction
+from src.db.database import AsyncSessionLocal
+from src.rpc import scoring_pb2, scoring_pb2_grpc
+import structlog
+
+logger = structlog.get_logger()
+
+# gRPC scores draw on the same per-key budget as REST /predict
+RATE_LIMIT_ENDPOINT = f"POST:{settings.API_V1_PREFIX}/predict"
+
+
+def _to_response(payload: dict) -> scoring_pb2.ScoreResponse:
+    return scoring_pb2.ScoreResponse(
+        transaction_id=payload["transaction_id"],
+        prediction=payload["prediction"],
+        fraud_probability=payload["fraud_probability"],
+        risk_level=payload["risk_level"],
+        anomaly_score=payload["anomaly_score"],
+        threshold=payload["threshold"],
+        model_version=payload["model_version"],
+        timestamp_ms=int(payload["timestamp"].timestamp() * 1000)
+    )
+
+
+class ScoringService(scoring_pb2_grpc.ScoringServicer):
+    """
+    Scoring over gRPC through the same pipeline as REST /predict: score_transaction
+    for scoring, logging and storage, the x-api-key check and the shared rate limiter.
+    """
+
+    async def _authorize(self, context: grpc.aio.ServicerContext) -> str:
+        api_key = dict(context.invocation_metadata()).get("x-api-key")
+        if api_key != settings.API_KEY:
+            await context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid API Key")
+        return api_key
+
+    async def _check_rate_limit(self, api_key: str, context: grpc.aio.ServicerContext):
+        try:
+            result = await rate_limiter.check_rate_limit(api_key, RATE_LIMIT_ENDPOINT)
+        except HTTPException as e:
+            # Same RateLimit-* and Retry-After values as REST, as trailing metadata
+            context.set_trailing_metadata(tuple((name.lower(), value) for name, value in e.headers.items()))
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, e.detail)
+        context.set_trailing_metadata(tuple((name.lower(), value) for name, value in result["headers"].items()))
+
+    async def _features(self, request: scoring_pb2.ScoreRequest, context: grpc.aio.ServicerContext) -> Dict[str, float]:
+        """The same rules as TransactionFeatures: every feature present and finite, Amount >= 0"""
+        feature_names = model_loader.get_feature_names()
+        if not request.transaction_id or len(request.transaction_id) > 255:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "transaction_id must be 1-255 characters")
+        if len(request.features) != len(feature_names):
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"Expected {len(feature_names)} features ({', '.join(feature_names)}), got {len(request.features)}"
+            )
+        features = dict(zip(feature_names, request.features))
+        if not all(math.isfinite(value) for value in request.features):
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "features must be finite")
+        if features["Amount"] < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Amount must be >= 0")
+        return features
+
+    async def _score(self, db, request: scoring_pb2.ScoreRequest, context: grpc.aio.ServicerContext) -> scoring_pb2.ScoreResponse:
+        features = await self._features(request, context)
+        try:
+            payload = await score_transaction(db, request.transaction_id, features)
+        except Exception as e:
+            logger.error("prediction_error", error=str(e), transaction_id=request.transaction_id)
+            await context.abort(grpc.StatusCode.INTERNAL, f"Prediction failed: {str(e)}")
+        return _to_response(payload)
+
+    async def Score(self, request, context):
+        api_key = await self._authorize(context)
+        await self._check_rate_limit(api_key, context)
+        async with AsyncSessionLocal() as db:
+            return await self._score(db, request, context)
+
+    async def ScoreStream(self, request_iterator, context) -> AsyncIterator[scoring_pb2.ScoreResponse]:
+        """
+        Each message is rate limited and stored like one REST request, with its own
+        session, so a long stream holds no pooled connection between messages.
+        The first invalid message ends the stream.
+        """
+        api_key = await self._authorize(context)
+        async for request in request_iterator:
+            await self._check_rate_limit(api_key, context)
+            async with AsyncSessionLocal() as db:
+                response = await self._score(db, request, context)
+            yield response
+
+
+async def start_server(address: str) -> Tuple[grpc.aio.Server, int]:
+    """Start the service on `address` and return the server and its bound port.
+
+    so_reuseport lets every uvicorn worker bind the same port, and the kernel
+    spreads connections between them.
+    """
+    server = grpc.aio.server(options=[("grpc.so_reuseport", 1)])
+    scoring_pb2_grpc.add_ScoringServicer_to_server(ScoringService(), server)
+    port = server.add_insecure_port(address)
+    await server.start()
+    logger.info("grpc_server_started", address=address, port=port)
+    return server, port
+
+
+async def serve():
+    """Run the gRPC service on its own, without the HTTP app"""
+    from src.core.cache import cache
+    from src.core.logging_setup import setup_logging
+    from src.core.prediction_stats import prediction_stats_aggregator
+
+    setup_logging()
+    await cache.connect()
+    await asyncio.to_thread(model_loader.load)
+    rate_limiter.start()
+    prediction_stats_aggregator.start()
+    server, _ = await start_server(f"{settings.GRPC_HOST}:{settings.GRPC_PORT}")
+    try:
+        await server.wait_for_termination()
+    finally:
+        await rate_limiter.stop()
+        await prediction_stats_aggregator.stop()
+        await cache.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve())
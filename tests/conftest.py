@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+from src.core.cache import cache
+from src.db.database import Base
+from src.db import models  # noqa: F401  (registers the tables)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def sessionmaker():
+    """In-memory SQLite with the app's tables, for CRUD behavior tests"""
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def create():
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create())
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """The shared cache backed by an in-memory Redis, reset afterwards"""
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(cache, "redis_client", fakeredis.aioredis.FakeRedis())
+    # Scripts are registered per client, and the breaker may be open from an earlier test
+    monkeypatch.setattr(cache, "_scripts", {})
+    cache.breaker.reset()
+    yield cache
+    cache.breaker.reset()
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from src.core.admission import AdmissionController, AdmissionMiddleware, Lane, build_controller
+
+
+def controller(realtime_limit=2, batch_limit=1) -> AdmissionController:
+    return AdmissionController(
+        [
+            Lane("realtime", 0.1, realtime_limit, 1, 10),
+            Lane("default", 0.5, 4, 1, 10),
+            Lane("batch", 1.0, batch_limit, 1, 10),
+        ],
+        routes={"/api/v1/predict": "realtime", "/api/v1/predict/batch": "batch"},
+        default="default"
+    )
+
+
+def test_routes_pick_the_longest_prefix_and_exempt_probes():
+    admission = controller()
+    assert admission.lane_for("/api/v1/predict").name == "realtime"
+    assert admission.lane_for("/api/v1/predict/batch/columnar").name == "batch"
+    assert admission.lane_for("/api/v1/predictions").name == "default"
+    assert admission.lane_for("/health") is None and admission.lane_for("/ready") is None
+
+
+def test_limit_grows_when_used_and_backs_off_when_slow():
+    lane = Lane("realtime", 0.1, 4, 2, 5)
+    for _ in range(40):
+        for _ in range(int(lane.limit)):
+            assert lane.try_acquire()
+        assert not lane.try_acquire()
+        for _ in range(int(lane.limit)):
+            lane.release(0.01)
+    assert lane.limit == 5
+
+    # A burst of slow completions within one target latency backs off once
+    lane.try_acquire(), lane.try_acquire()
+    lane.release(0.5)
+    lane.release(0.5)
+    assert lane.limit == 4.5
+    for step in range(1, 20):
+        lane.decrease(now=time.monotonic() + step)
+    assert lane.limit == 2
+
+
+def test_congestion_in_a_lane_shrinks_the_lanes_below_it():
+    admission = controller(realtime_limit=8, batch_limit=8)
+    realtime, default, batch = (admission.lanes[name] for name in ("realtime", "default", "batch"))
+    batch.decrease(now=100.0)
+    assert (realtime.limit, batch.limit) == (8, 7.2)
+    realtime.decrease(now=200.0)
+    assert (realtime.limit, default.limit, batch.limit) == (7.2, 3.6, 7.2 * 0.9)
+
+
+def test_middleware_sheds_a_full_lane_with_503_and_admits_probes():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        if scope["path"] != "/health":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def request(middleware, path):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware({"type": "http", "path": path}, None, send)
+        return messages[0]["status"], dict(messages[0]["headers"])
+
+    async def run():
+        middleware = AdmissionMiddleware(app, controller(realtime_limit=1, batch_limit=1))
+        held = [
+            asyncio.create_task(request(middleware, "/api/v1/predict")),
+            asyncio.create_task(request(middleware, "/api/v1/predict/batch")),
+        ]
+        await asyncio.sleep(0)
+        shed_status, shed_headers = await request(middleware, "/api/v1/predict")
+        batch_status, _ = await request(middleware, "/api/v1/predict/batch")
+        health_status, _ = await request(middleware, "/health")
+        release.set()
+        held_statuses = [status for status, _ in await asyncio.gather(*held)]
+        return shed_status, shed_headers, batch_status, health_status, held_statuses, middleware.controller
+
+    shed_status, shed_headers, batch_status, health_status, held_statuses, admission = asyncio.run(run())
+    assert shed_status == 503 and shed_headers[b"retry-after"] == b"1"
+    assert batch_status == 503
+    assert health_status == 200
+    assert held_statuses == [200, 200]
+    assert all(lane.in_flight == 0 for lane in admission.lanes.values())
+
+
+def test_slow_endpoints_stay_out_of_the_latency_feedback():
+    admission = build_controller()
+    assert admission.lane_for("/api/v1/admin/profile") is None
+    for path in ("/api/v1/jobs", "/api/v1/jobs/abc/results", "/api/v1/feedback/bulk", "/api/v1/thresholds/analysis"):
+        assert admission.lane_for(path).name == "bulk"
+
+    bulk, default = admission.lanes["bulk"], admission.lanes["default"]
+    limits = (bulk.limit, default.limit)
+    # A minute-long upload neither shrinks its own lane nor anyone else's
+    assert bulk.try_acquire()
+    bulk.release(60.0)
+    assert (bulk.limit, default.limit) == limits
+    admission.lanes["realtime"].decrease(now=time.monotonic() + 10)
+    assert bulk.limit == limits[0] and default.limit < limits[1]
@@ -1,4 +1,5 @@
 import requests
+import time
 
 API_URL = "http://localhost:8000"
 API_KEY = "dev-key-12345"
@@ -33,4 +34,38 @@ def test_predict_without_api_key():
         }
     }
     response = requests.post(f"{API_URL}/api/v1/predict", json=transaction)
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+def test_get_prediction_by_transaction_without_api_key():
+    response = requests.get(f"{API_URL}/api/v1/predictions/by-transaction/TEST-001")
+    assert response.status_code == 403
+
+
+def test_stats_without_api_key():
+    response = requests.get(f"{API_URL}/api/v1/stats")
+    assert response.status_code == 403
+
+
+def test_metrics_endpoint():
+    response = requests.get(f"{API_URL}/metrics")
+    assert response.status_code == 200
+    assert "db_pool_checked_out" in response.text
+
+
+def test_usage_without_api_key():
+    response = requests.get(f"{API_URL}/api/v1/usage")
+    assert response.status_code == 403
+
+
+def test_readiness_after_warmup():
+    for _ in range(100):
+        response = requests.get(f"{API_URL}/ready")
+        if response.status_code == 200:
+            break
+        assert response.status_code == 503
+        time.sleep(0.1)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["model"] == "ok"
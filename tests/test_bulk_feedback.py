@@ -0,0 +1,95 @@
+import asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from src.core.bulk_feedback import ingest_feedback
+from src.core.cache import get_prediction_cache, set_prediction_cache
+from src.core.config import settings
+from src.db.database import get_db
+from src.db.models import Feedback, Prediction
+from src.main import app, verify_api_key
+
+def prediction(transaction_id: str) -> Prediction:
+    return Prediction(
+        transaction_id=transaction_id, prediction=False, fraud_probability=0.1, risk_level="LOW",
+        anomaly_score=0.1, threshold_used=0.0, model_version="1.0.0", features={"V1": 1.0}
+    )
+
+def test_invalid_rows_are_reported_without_aborting():
+    body = (
+        b'{"transaction_id": "TXN-1", "actual_label": "maybe", "source": "bank"}\n'
+        b'not json\n'
+        b'\n'
+        b'{"actual_label": true, "source": "bank"}\n'
+    )
+    
+    result = asyncio.run(ingest_feedback(None, body, "application/x-ndjson"))
+    
+    assert result.total_rows == 3
+    assert result.inserted == 0
+    assert [error.row for error in result.errors] == [1, 2, 4]
+
+def test_csv_rows_use_default_source():
+    body = b"transaction_id,actual_label\n,true\n"
+    
+    result = asyncio.run(ingest_feedback(None, body, "text/csv", default_source="chargeback"))
+    
+    assert result.failed == 1
+    assert "prediction_id or transaction_id" in result.errors[0].error
+
+def test_rows_are_resolved_inserted_and_uncached(sessionmaker, fake_redis):
+    async def run():
+        async with sessionmaker() as db:
+            by_id, by_transaction, untouched = prediction("TXN-1"), prediction("TXN-2"), prediction("TXN-3")
+            db.add_all([by_id, by_transaction, untouched])
+            await db.commit()
+        for row in (by_id, by_transaction, untouched):
+            await set_prediction_cache({"id": str(row.id), "transaction_id": row.transaction_id})
+        
+        body = (
+            f'{{"prediction_id": "{by_id.id}", "actual_label": true, "source": "chargeback"}}\n'
+            '{"transaction_id": "TXN-2", "actual_label": false}\n'
+            '{"transaction_id": "TXN-404", "actual_label": true}\n'
+        ).encode()
+        async with sessionmaker() as db:
+            result = await ingest_feedback(db, body, "application/x-ndjson", default_source="analyst")
+            feedback = (await db.execute(select(Feedback.prediction_id, Feedback.feedback_source))).all()
+        
+        cached = [
+            await get_prediction_cache(transaction_id=row.transaction_id) is not None
+            for row in (by_id, by_transaction, untouched)
+        ]
+        cached_by_id = await get_prediction_cache(prediction_id=by_id.id)
+        return result, sorted(feedback, key=lambda row: row[1]), cached, cached_by_id, (by_id, by_transaction)
+    
+    result, feedback, cached, cached_by_id, (by_id, by_transaction) = asyncio.run(run())
+    
+    assert (result.total_rows, result.inserted, result.failed) == (3, 2, 1)
+    assert result.errors[0].row == 3 and result.errors[0].error == "Prediction not found"
+    # Both rows went in, one resolved by id and one by transaction id
+    assert feedback == [(by_transaction.id, "analyst"), (by_id.id, "chargeback")]
+    assert cached == [False, False, True]
+    assert cached_by_id is None
+
+def test_non_utf8_and_oversized_uploads_are_rejected(monkeypatch):
+    async def no_db():
+        yield None
+    
+    monkeypatch.setattr(settings, "FEEDBACK_BULK_MAX_BYTES", 64)
+    app.dependency_overrides[verify_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_db] = no_db
+    try:
+        client = TestClient(app)
+        latin1 = client.post(
+            "/api/v1/feedback/bulk", content="transaction_id,actual_label\nTXN-é,true\n".encode("latin-1"),
+            headers={"Content-Type": "text/csv"}
+        )
+        oversized = client.post(
+            "/api/v1/feedback/bulk", content=b'{"transaction_id": "TXN-1", "actual_label": true}\n' * 3,
+            headers={"Content-Type": "application/x-ndjson"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert latin1.status_code == 422
+    assert "UTF-8" in latin1.json()["detail"]
+    assert oversized.status_code == 413
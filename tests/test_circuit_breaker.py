@@ -0,0 +1,131 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from src.core.cache import cache
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from src.db.database import get_read_db, guarded_pool
+from src.main import app, verify_api_key
+
+
+async def failing():
+    raise ConnectionError("down")
+
+
+async def succeeding():
+    return "ok"
+
+
+def test_opens_on_failure_rate_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_rate_threshold=0.5, minimum_calls=4, recovery_timeout=60)
+    calls = []
+    
+    async def tracked():
+        calls.append(1)
+        raise ConnectionError("down")
+    
+    async def run():
+        await breaker.call(succeeding)
+        await breaker.call(succeeding)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(tracked)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(tracked)
+    
+    asyncio.run(run())
+    
+    assert breaker.state == OPEN
+    assert len(calls) == 2
+    assert not breaker.available
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", minimum_calls=1, recovery_timeout=0.05)
+    
+    async def run():
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+        assert breaker.state == OPEN
+        
+        await asyncio.sleep(0.06)
+        assert breaker.available
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+        assert breaker.state == OPEN
+        
+        await asyncio.sleep(0.06)
+        assert await breaker.call(succeeding) == "ok"
+    
+    asyncio.run(run())
+    
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_one_probe_at_a_time():
+    breaker = CircuitBreaker("test", minimum_calls=1, recovery_timeout=0.01)
+    breaker.trip()
+    time.sleep(0.02)
+    
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    
+    breaker.record_ignored()
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_call_timeout_counts_as_failure():
+    breaker = CircuitBreaker("test", minimum_calls=1, call_timeout=0.01)
+    
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(asyncio.sleep, 1)
+    
+    asyncio.run(run())
+    
+    assert breaker.state == OPEN
+
+
+def test_cache_skips_redis_while_breaker_is_open():
+    class ExplodingClient:
+        def __getattr__(self, name):
+            raise AssertionError(f"Redis called while the breaker is open: {name}")
+    
+    cache.redis_client = ExplodingClient()
+    cache.redis_available = False
+    try:
+        async def run():
+            return await cache.get("key"), await cache.incr("key"), await cache.run_script("return 1", ["k"], [])
+        
+        assert asyncio.run(run()) == (None, 1, None)
+    finally:
+        cache.redis_client = None
+        cache.redis_available = True
+
+
+def test_open_database_breaker_is_a_fast_503():
+    pytest.importorskip("aiosqlite")
+    breaker = CircuitBreaker("test_db", recovery_timeout=30)
+    breaker.trip()
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=guarded_pool(AsyncAdaptedQueuePool, breaker))
+
+    async def guarded_db():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app.dependency_overrides[verify_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_read_db] = guarded_db
+    try:
+        response = TestClient(app).get("/api/v1/predictions/by-transaction/TXN-1")
+    finally:
+        app.dependency_overrides.clear()
+        asyncio.run(engine.dispose())
+
+    assert response.status_code == 503
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from click.testing import CliRunner
+from src.cli import cli
+from src.core.model_loader import model_loader
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+@pytest.fixture
+def transactions_csv(tmp_path):
+    feature_names = model_loader.get_feature_names()
+    features = np.random.default_rng(1).standard_normal((250, len(feature_names)))
+    features[:, -1] = np.abs(features[:, -1]) * 100
+    lines = [",".join(["id", *feature_names, "Class"])]
+    for i, row in enumerate(features):
+        values = [str(v) for v in row]
+        if i == 7:
+            values[0] = ""
+        lines.append(",".join([f"TX{i:04d}", *values, "0"]))
+    path = tmp_path / "transactions.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_score_matches_across_worker_counts(transactions_csv, tmp_path):
+    runner = CliRunner()
+    outputs = []
+    for workers in (1, 2):
+        output = tmp_path / f"scores-{workers}.parquet"
+        result = runner.invoke(cli, [
+            "score", str(transactions_csv), str(output),
+            "--workers", str(workers), "--chunk-size", "60", "--id-column", "id"
+        ])
+        assert result.exit_code == 0, result.output
+        assert "Scored 249 of 250 rows (1 invalid" in result.output
+        assert "rows/s" in result.output and "Peak RSS" in result.output
+        outputs.append(pq.read_table(output))
+
+    single, pooled = outputs
+    assert single.column_names == ["transaction_id", "prediction", "fraud_probability", "risk_level", "anomaly_score"]
+    assert single.equals(pooled)
+    ids = single.column("transaction_id").to_pylist()
+    assert ids[:3] == ["TX0000", "TX0001", "TX0002"]
+    assert "TX0007" not in ids
+
+
+def test_arrow_output_uses_row_numbers_without_id_column(transactions_csv, tmp_path):
+    output = tmp_path / "scores.arrow"
+    result = CliRunner().invoke(cli, ["score", str(transactions_csv), str(output), "--workers", "1"])
+    assert result.exit_code == 0, result.output
+
+    with pa.memory_map(str(output)) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.num_rows == 249
+    assert table.column("transaction_id").to_pylist()[6:8] == ["6", "8"]
+
+
+def test_unknown_formats_are_rejected(transactions_csv, tmp_path):
+    result = CliRunner().invoke(cli, ["score", str(transactions_csv), str(tmp_path / "scores.json")])
+    assert result.exit_code == 2
+    assert "OUTPUT_PATH" in result.output
@@ -0,0 +1,90 @@
+import io
+import numpy as np
+import pytest
+from src.core import columnar
+from src.core.model_loader import model_loader
+
+FEATURE_NAMES = [f"V{i}" for i in range(1, 29)] + ["Time", "Amount"]
+
+
+def make_batch(n: int = 50):
+    features = np.random.default_rng(0).standard_normal((n, len(FEATURE_NAMES)))
+    features[:, -1] = np.abs(features[:, -1]) * 100
+    transaction_ids = np.array([f"TXN-{i}" for i in range(n)])
+    return transaction_ids, features
+
+
+def npz_body(**arrays) -> bytes:
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def test_npz_round_trip_scores_like_single_predictions():
+    transaction_ids, features = make_batch()
+    batch = columnar.decode(npz_body(features=features, transaction_id=transaction_ids), columnar.NPZ, FEATURE_NAMES)
+    columnar.validate(batch, FEATURE_NAMES, max_rows=100)
+    results = columnar.score(batch, FEATURE_NAMES)
+    
+    scaler = model_loader.get_scaler()
+    row = features[7].copy()
+    row[-2] = scaler.transform([[row[-2]]])[0][0]
+    row[-1] = scaler.transform([[row[-1]]])[0][0]
+    prediction, fraud_probability, risk_level = model_loader.predict(row.reshape(1, -1))
+    
+    assert results["prediction"][7] == prediction
+    assert results["fraud_probability"][7] == pytest.approx(fraud_probability)
+    assert results["risk_level"][7] == risk_level
+    
+    decoded = np.load(io.BytesIO(columnar.encode(columnar.NPZ, batch.transaction_ids, results)))
+    assert decoded["transaction_id"].tolist() == transaction_ids.tolist()
+
+
+def test_validate_reports_invalid_rows():
+    transaction_ids, features = make_batch()
+    features[3, -1] = -5
+    features[8, 0] = np.inf
+    transaction_ids[12] = transaction_ids[11]
+    batch = columnar.ColumnarBatch(transaction_ids, features)
+    
+    with pytest.raises(columnar.ColumnarInputError) as exc:
+        columnar.validate(batch, FEATURE_NAMES, max_rows=100)
+    
+    rows = {row["row"]: row["errors"] for row in exc.value.rows}
+    assert rows == {
+        3: ["Amount must be >= 0"],
+        8: ["features must be finite"],
+        11: ["duplicate transaction_id"],
+        12: ["duplicate transaction_id"]
+    }
+
+
+def test_npz_rejects_wrong_shape_and_feature_order():
+    transaction_ids, features = make_batch()
+    
+    with pytest.raises(columnar.ColumnarInputError, match="shape"):
+        columnar.decode(npz_body(features=features[:, :29], transaction_id=transaction_ids), columnar.NPZ, FEATURE_NAMES)
+    with pytest.raises(columnar.ColumnarInputError, match="feature_names"):
+        columnar.decode(
+            npz_body(features=features, transaction_id=transaction_ids, feature_names=np.array(FEATURE_NAMES[::-1])),
+            columnar.NPZ,
+            FEATURE_NAMES
+        )
+
+
+def test_arrow_columns_are_matched_by_name():
+    pa = pytest.importorskip("pyarrow")
+    transaction_ids, features = make_batch()
+    # Columns in reverse order: they're picked by name, not position
+    table = pa.table({
+        **{name: features[:, i] for i, name in reversed(list(enumerate(FEATURE_NAMES)))},
+        "transaction_id": transaction_ids
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    
+    batch = columnar.decode(sink.getvalue().to_pybytes(), columnar.ARROW_STREAM, FEATURE_NAMES)
+    
+    np.testing.assert_array_equal(batch.features, features)
+    assert batch.transaction_ids.tolist() == transaction_ids.tolist()
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timedelta
+from src.api.prediction_schemas import PredictionDetail
+from src.core.cache import get_prediction_cache, set_prediction_cache
+from src.db import crud
+from src.db.models import Feedback, Prediction
+
+
+def prediction(transaction_id: str, **fields) -> Prediction:
+    return Prediction(**{
+        "transaction_id": transaction_id, "prediction": True, "fraud_probability": 0.9, "risk_level": "HIGH",
+        "anomaly_score": -0.2, "threshold_used": 0.0, "model_version": "1.0.0", "features": {"V1": 1.0},
+        **fields
+    })
+
+
+def test_relabeled_prediction_reads_its_latest_feedback(sessionmaker):
+    async def run():
+        async with sessionmaker() as db:
+            relabeled = prediction("txn-1")
+            db.add_all([relabeled, prediction("txn-2")])
+            await db.flush()
+            now = datetime.utcnow()
+            db.add_all([
+                Feedback(prediction_id=relabeled.id, actual_label=True, feedback_source="analyst", created_at=now - timedelta(hours=1)),
+                Feedback(prediction_id=relabeled.id, actual_label=False, feedback_source="chargeback", created_at=now),
+            ])
+            await db.commit()
+
+        async with sessionmaker() as db:
+            by_id = await crud.get_prediction(db, relabeled.id)
+            by_transaction = await crud.get_prediction_by_transaction_id(db, "txn-1")
+            listed = await crud.get_predictions(db, limit=2)
+        return by_id, by_transaction, listed
+
+    by_id, by_transaction, listed = asyncio.run(run())
+    assert by_id.feedback.feedback_source == "chargeback"
+    assert by_transaction.feedback.actual_label is False
+    # One row per prediction, so the page is full
+    assert sorted(prediction.transaction_id for prediction in listed) == ["txn-1", "txn-2"]
+    assert PredictionDetail.model_validate(by_id).feedback.feedback_source == "chargeback"
+
+
+def test_feedback_writes_drop_cached_predictions(sessionmaker, fake_redis):
+    async def run():
+        async with sessionmaker() as db:
+            single, bulk = prediction("txn-1"), prediction("txn-2")
+            db.add_all([single, bulk])
+            await db.commit()
+            for row in (single, bulk):
+                await set_prediction_cache({"id": str(row.id), "transaction_id": row.transaction_id})
+
+            await crud.create_feedback(db, single.id, actual_label=False, feedback_source="analyst")
+            await crud.bulk_create_feedback(
+                db, [{"prediction_id": bulk.id, "actual_label": True, "feedback_source": "chargeback", "notes": None}]
+            )
+        return [
+            await get_prediction_cache(prediction_id=row.id) or await get_prediction_cache(transaction_id=row.transaction_id)
+            for row in (single, bulk)
+        ]
+
+    assert asyncio.run(run()) == [None, None]
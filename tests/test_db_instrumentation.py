@@ -0,0 +1,22 @@
+from src.db.instrumentation import normalize_statement, statement_type
+
+def test_normalize_statement_groups_by_shape():
+    statement = """
+        SELECT predictions.id FROM predictions
+        WHERE predictions.id IN (%(id_1)s, %(id_2)s, %(id_3)s) AND risk_level = 'HIGH' LIMIT 100
+    """
+    
+    assert normalize_statement(statement) == (
+        "SELECT predictions.id FROM predictions "
+        "WHERE predictions.id IN (...) AND risk_level = ? LIMIT ?"
+    )
+
+def test_normalize_statement_collapses_multi_row_values():
+    statement = "INSERT INTO feedback (a, b) VALUES (%(a__0)s, %(b__0)s), (%(a__1)s, %(b__1)s), (%(a__2)s, %(b__2)s)"
+    
+    assert normalize_statement(statement) == "INSERT INTO feedback (a, b) VALUES (?, ?), ..."
+
+def test_statement_type():
+    assert statement_type("  select 1") == "SELECT"
+    assert statement_type("INSERT INTO x VALUES (1)") == "INSERT"
+    assert statement_type("BEGIN") == "OTHER"
@@ -0,0 +1,98 @@
+import asyncio
+import numpy as np
+import pytest
+from src.core import drift
+from src.core.drift import DriftMonitor
+
+NAMES = ["V1", "V2", "Amount"]
+
+
+@pytest.fixture
+def reference():
+    rng = np.random.default_rng(0)
+    features = np.column_stack([rng.standard_normal(20000), rng.standard_normal(20000), rng.exponential(50, 20000)])
+    # Many repeated amounts collapse some quantile edges
+    features[:5000, 2] = 0.0
+    return drift.build_reference(features, rng.normal(0.1, 0.05, 20000), NAMES, bins=10)
+
+
+def live(n: int, seed: int, shift: float = 0.0):
+    rng = np.random.default_rng(seed)
+    features = np.column_stack([rng.standard_normal(n) + shift, rng.standard_normal(n), rng.exponential(50, n)])
+    features[:n // 4, 2] = 0.0
+    return features, rng.normal(0.1, 0.05, n)
+
+
+def test_histogram_matches_per_value_binning(reference):
+    edges = np.array([[np.inf if e is None else e for e in row] for row in reference["edges"]])
+    values = np.column_stack([*live(500, 1)[0].T, live(500, 1)[1]])
+    counts = drift.histogram(values, edges)
+    for column in range(values.shape[1]):
+        expected = np.bincount([int(np.sum(value > edges[column])) for value in values[:, column]], minlength=10)
+        np.testing.assert_array_equal(counts[column], expected)
+    assert reference["names"] == [*NAMES, drift.SCORE]
+    assert np.allclose(np.sum(reference["expected"], axis=1), 1.0)
+
+
+def test_shifted_feature_is_flagged(reference):
+    monitor = DriftMonitor()
+    monitor.set_reference(reference, "test")
+    features, scores = live(5000, 2, shift=1.0)
+    monitor.record(features, scores)
+
+    results = drift.compare(monitor._totals, monitor._expected, monitor.names)
+    assert results["V1"]["status"] == "significant"
+    assert results["V1"]["ks"] > 0.3
+    for name in ("V2", "Amount", drift.SCORE):
+        assert results[name]["status"] == "stable"
+        assert results[name]["count"] == 5000
+
+
+def test_counts_from_workers_are_merged_through_redis(reference, fake_redis):
+    workers = [DriftMonitor(), DriftMonitor()]
+    for seed, monitor in enumerate(workers):
+        monitor.set_reference(reference, "test")
+        monitor.record(*live(1000, seed + 10))
+
+    async def run():
+        await workers[0].flush()
+        return await workers[1].report(hours=1)
+
+    report = asyncio.run(run())
+    assert report["scope"] == "all_workers"
+    assert report["features"]["V1"]["count"] == 2000
+    assert report["features"]["V1"]["status"] == "stable"
+
+
+def test_report_falls_back_to_this_worker_without_redis(reference):
+    monitor = DriftMonitor()
+    monitor.set_reference(reference, "test")
+    monitor.record(*live(300, 3))
+
+    report = asyncio.run(monitor.report(hours=1))
+    assert report["scope"] == "this_worker"
+    assert report["features"][drift.SCORE]["count"] == 300
+    # Unsent counts are kept for the next flush
+    assert monitor._pending.sum() == 300 * len(monitor.names)
+
+
+def test_counts_recorded_from_threads_during_flushes_are_kept_once(reference, fake_redis):
+    monitor = DriftMonitor()
+    monitor.set_reference(reference, "test")
+    batch = live(50, 4)
+
+    async def run():
+        def record_many():
+            for _ in range(200):
+                monitor.record(*batch)
+
+        recording = asyncio.gather(*(asyncio.to_thread(record_many) for _ in range(4)))
+        while not recording.done():
+            await monitor.flush()
+            await asyncio.sleep(0)
+        await recording
+        await monitor.flush()
+        return await monitor.window_counts(hours=1)
+
+    counts = asyncio.run(run())
+    assert counts.sum() == 4 * 200 * 50 * len(monitor.names)
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from pathlib import Path
+import pytest
+
+grpc = pytest.importorskip("grpc")
+
+from sqlalchemy import select
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.core.scoring import score_transaction
+from src.db.models import Prediction
+from src.rpc import scoring_pb2, scoring_pb2_grpc, server
+from src.rpc.server import start_server
+
+SAMPLE = json.loads((Path(__file__).resolve().parent.parent / "sample_transaction.json").read_text())["transaction"]
+METADATA = (("x-api-key", settings.API_KEY),)
+
+
+def score_request(transaction_id: str, **overrides) -> scoring_pb2.ScoreRequest:
+    values = {**SAMPLE, **overrides}
+    return scoring_pb2.ScoreRequest(
+        transaction_id=transaction_id,
+        features=[values[name] for name in model_loader.get_feature_names()]
+    )
+
+
+def with_stub(test):
+    """Run test(stub) against a server on a free local port"""
+    async def run():
+        server, port = await start_server("127.0.0.1:0")
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                return await test(scoring_pb2_grpc.ScoringStub(channel))
+        finally:
+            await server.stop(None)
+    return asyncio.run(run())
+
+
+def test_score_matches_rest_payload():
+    async def test(stub):
+        return await stub.Score(score_request("GRPC-1"), metadata=METADATA)
+
+    response = with_stub(test)
+    assert response.transaction_id == "GRPC-1"
+    assert response.prediction in (0, 1)
+    assert 0 <= response.fraud_probability <= 1
+    assert response.risk_level in ("LOW", "MEDIUM", "HIGH")
+    assert response.model_version == settings.APP_VERSION
+    assert response.timestamp_ms > 0
+
+
+def test_score_stream_answers_in_order():
+    async def test(stub):
+        requests = [score_request(f"GRPC-S{i}", Amount=10.0 * i) for i in range(5)]
+        return [response async for response in stub.ScoreStream(iter(requests), metadata=METADATA)]
+
+    responses = with_stub(test)
+    assert [r.transaction_id for r in responses] == [f"GRPC-S{i}" for i in range(5)]
+
+
+def test_invalid_api_key_is_unauthenticated():
+    async def test(stub):
+        with pytest.raises(grpc.aio.AioRpcError) as error:
+            await stub.Score(score_request("GRPC-2"), metadata=(("x-api-key", "wrong"),))
+        return error.value.code()
+
+    assert with_stub(test) == grpc.StatusCode.UNAUTHENTICATED
+
+
+def test_invalid_features_are_rejected():
+    async def test(stub):
+        codes = []
+        for request in (
+            scoring_pb2.ScoreRequest(transaction_id="GRPC-3", features=[0.0] * 3),
+            score_request("GRPC-4", Amount=-1.0),
+            score_request("GRPC-5", V1=float("nan")),
+            score_request(""),
+        ):
+            with pytest.raises(grpc.aio.AioRpcError) as error:
+                await stub.Score(request, metadata=METADATA)
+            codes.append(error.value.code())
+        return codes
+
+    assert with_stub(test) == [grpc.StatusCode.INVALID_ARGUMENT] * 4
+
+
+def test_duplicate_transaction_id_mid_stream_does_not_stop_storing(sessionmaker, monkeypatch):
+    monkeypatch.setattr(server, "AsyncSessionLocal", sessionmaker)
+
+    async def test(stub):
+        requests = [score_request(transaction_id) for transaction_id in ("DUP-A", "DUP-B", "DUP-A", "DUP-C")]
+        responses = [response async for response in stub.ScoreStream(iter(requests), metadata=METADATA)]
+        async with sessionmaker() as db:
+            stored = (await db.execute(select(Prediction.transaction_id))).scalars().all()
+        return responses, stored
+
+    responses, stored = with_stub(test)
+    assert [r.transaction_id for r in responses] == ["DUP-A", "DUP-B", "DUP-A", "DUP-C"]
+    assert sorted(stored) == ["DUP-A", "DUP-B", "DUP-C"]
+
+
+def test_failed_save_leaves_the_session_usable(sessionmaker):
+    async def run():
+        async with sessionmaker() as db:
+            for transaction_id in ("SHARED-A", "SHARED-A", "SHARED-B"):
+                await score_transaction(db, transaction_id, dict(SAMPLE))
+            return (await db.execute(select(Prediction.transaction_id))).scalars().all()
+
+    assert sorted(asyncio.run(run())) == ["SHARED-A", "SHARED-B"]
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from src.core.cache import cache
+from src.core.config import settings
+from src.core.model_loader import model_loader
+from src.jobs import files
+from src.jobs import queue as queue_module
+from src.jobs.queue import JobQueue, CANCELLED, COMPLETED, FAILED, OUTPUT_FILE
+from src.jobs.worker import JobWorker
+from src.main import app, job_queue, verify_api_key
+
+pa = pytest.importorskip("pyarrow")
+pa_json = pytest.importorskip("pyarrow.json")
+
+
+@pytest.fixture
+def job_env(tmp_path, monkeypatch, fake_redis):
+    monkeypatch.setattr(settings, "JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "JOBS_POLL_INTERVAL", 0.01)
+    return tmp_path
+
+
+def write_csv(path, n: int, invalid_rows=()):
+    feature_names = model_loader.get_feature_names()
+    features = np.random.default_rng(0).standard_normal((n, len(feature_names)))
+    features[:, -1] = np.abs(features[:, -1]) * 100
+    for i in invalid_rows:
+        features[i, -1] = -1.0
+    lines = [",".join(["transaction_id", *feature_names])]
+    lines += [",".join([f"0{i:05d}", *map(str, row)]) for i, row in enumerate(features)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+async def submit(tmp_path, queue: JobQueue, job_id: str, n: int, chunk_size: int, invalid_rows=()) -> dict:
+    files.job_dir(job_id).mkdir(parents=True)
+    upload = tmp_path / f"{job_id}.csv"
+    write_csv(upload, n, invalid_rows)
+    total_rows = files.convert_input(upload, files.CSV, files.input_path(job_id), model_loader.get_feature_names())
+    return await queue.submit(job_id, files.CSV, OUTPUT_FILE, total_rows, chunk_size)
+
+
+async def drain(worker: JobWorker):
+    while await worker.run_once():
+        pass
+
+
+def read_results(job_id: str):
+    return pa.ipc.open_stream(b"".join(files.iter_results(job_id))).read_all()
+
+
+def test_job_is_scored_chunk_by_chunk(job_env):
+    queue = JobQueue()
+
+    async def run():
+        job = await submit(job_env, queue, "job-1", n=25, chunk_size=10, invalid_rows=[3, 17])
+        await drain(JobWorker(queue, consumer="worker-1"))
+        return job, await queue.get("job-1")
+
+    submitted, job = asyncio.run(run())
+
+    assert submitted["total_chunks"] == 3
+    assert job["status"] == COMPLETED
+    assert job["progress"] == 1.0
+    assert job["processed_rows"] == 25
+    assert job["invalid_rows"] == 2
+
+    results = read_results("job-1")
+    ids = results.column("transaction_id").to_pylist()
+    assert len(ids) == 23
+    # Ids keep their leading zeros and chunk order
+    assert ids[:3] == ["000000", "000001", "000002"]
+    assert "000003" not in ids
+    assert sum(results.column("prediction").to_pylist()) == job["fraud_detected"]
+
+
+def test_chunk_abandoned_by_a_crashed_worker_is_reclaimed_once(job_env, monkeypatch):
+    queue = JobQueue()
+
+    async def run():
+        await submit(job_env, queue, "job-2", n=20, chunk_size=10)
+        # worker-1 takes a chunk and dies without acknowledging it
+        message_id, job_id, index = await queue.claim("worker-1")
+
+        monkeypatch.setattr(settings, "JOBS_CHUNK_TIMEOUT", 0)
+        await drain(JobWorker(queue, consumer="worker-2"))
+
+        # A late completion from worker-1 isn't counted again
+        await queue.complete(job_id, index, message_id, {"processed_rows": 10})
+        return await queue.get("job-2")
+
+    job = asyncio.run(run())
+
+    assert job["status"] == COMPLETED
+    assert job["completed_chunks"] == 2
+    assert job["processed_rows"] == 20
+
+
+def test_cancelled_job_chunks_are_dropped(job_env):
+    queue = JobQueue()
+
+    async def run():
+        await submit(job_env, queue, "job-3", n=30, chunk_size=10)
+        worker = JobWorker(queue, consumer="worker-1")
+        await worker.run_once()
+        status = await queue.cancel("job-3")
+        await drain(worker)
+        return status, await queue.get("job-3"), await queue.cancel("job-3")
+
+    status, job, second = asyncio.run(run())
+
+    assert status == CANCELLED
+    assert job["status"] == CANCELLED
+    assert job["completed_chunks"] == 1
+    assert second == CANCELLED
+
+
+def test_failing_chunk_is_retried_then_fails_the_job(job_env, monkeypatch):
+    queue = JobQueue()
+    monkeypatch.setattr(settings, "JOBS_MAX_ATTEMPTS", 2)
+    calls = []
+
+    async def broken(job, index):
+        calls.append(index)
+        raise RuntimeError("disk full")
+
+    async def run():
+        await submit(job_env, queue, "job-4", n=5, chunk_size=10)
+        worker = JobWorker(queue, consumer="worker-1")
+        monkeypatch.setattr(worker, "score_chunk", broken)
+        await drain(worker)
+        return await queue.get("job-4")
+
+    job = asyncio.run(run())
+
+    assert calls == [0, 0]
+    assert job["status"] == FAILED
+    assert "disk full" in job["error"]
+
+
+@pytest.mark.parametrize("script", ["START_SCRIPT", "COMPLETE_SCRIPT"])
+def test_chunk_is_kept_when_redis_fails_mid_chunk(job_env, monkeypatch, script):
+    queue = JobQueue()
+    real_run_script = cache.run_script
+    failed = []
+
+    async def flaky_run_script(source, keys, args):
+        if source == getattr(queue_module, script) and not failed:
+            failed.append(keys[0])
+            return None
+        return await real_run_script(source, keys, args)
+
+    async def run():
+        await submit(job_env, queue, "job-6", n=5, chunk_size=10)
+        worker = JobWorker(queue, consumer="worker-1")
+        monkeypatch.setattr(cache, "run_script", flaky_run_script)
+        deferred = await worker.run_once()
+        unrecorded = await queue.get("job-6")
+        # Left pending, so the chunk is reclaimed rather than lost
+        monkeypatch.setattr(settings, "JOBS_CHUNK_TIMEOUT", 0)
+        await drain(worker)
+        return deferred, unrecorded, await queue.get("job-6")
+
+    deferred, unrecorded, job = asyncio.run(run())
+
+    assert failed and deferred is False
+    assert unrecorded["completed_chunks"] == 0
+    assert job["status"] == COMPLETED
+    assert job["completed_chunks"] == 1
+
+
+def test_chunks_of_an_expired_job_are_dropped(job_env, fake_redis):
+    queue = JobQueue()
+
+    async def run():
+        await submit(job_env, queue, "job-7", n=5, chunk_size=10)
+        await fake_redis.redis_client.delete("job:job-7")
+        worker = JobWorker(queue, consumer="worker-1")
+        return await worker.run_once(), await worker.run_once()
+
+    assert asyncio.run(run()) == (True, False)
+
+
+def test_missing_columns_are_rejected(job_env):
+    upload = job_env / "bad.csv"
+    upload.write_text("transaction_id,V1\nA,1.0\n")
+    with pytest.raises(files.JobInputError):
+        files.convert_input(upload, files.CSV, job_env / "input.arrow", model_loader.get_feature_names())
+    assert not (job_env / "input.tmp").exists()
+
+
+def test_ndjson_is_converted_block_by_block(job_env, monkeypatch):
+    feature_names = model_loader.get_feature_names()
+    lines = [
+        json.dumps({"transaction_id": f"0{i:04d}", **{name: float(i) for name in feature_names}, "note": "x" * (i % 7)})
+        for i in range(500)
+    ]
+    upload = job_env / "input.ndjson"
+    upload.write_text("\n".join(lines) + "\n\n")
+    # Blocks smaller than a line as well as many-line blocks
+    monkeypatch.setattr(files, "NDJSON_BLOCK_BYTES", 4096)
+    parsed = []
+    real_read_json = pa_json.read_json
+
+    def counting_read_json(source, *args, **kwargs):
+        parsed.append(len(source.getvalue()))
+        return real_read_json(source, *args, **kwargs)
+
+    monkeypatch.setattr(pa_json, "read_json", counting_read_json)
+    rows = files.convert_input(upload, files.NDJSON, job_env / "input.arrow", feature_names)
+
+    assert rows == 500
+    assert len(parsed) > 1 and max(parsed) < 4096 + len(lines[-1]) + 1
+    with pa.memory_map(str(job_env / "input.arrow")) as source:
+        table = pa.ipc.open_file(source).read_all()
+    assert table.column("transaction_id").to_pylist()[:2] == ["00000", "00001"]
+    assert table.column(feature_names[0]).to_pylist()[-1] == 499.0
+
+
+def test_failed_submission_leaves_no_job_directory(job_env, monkeypatch):
+    async def broken_submit(*args, **kwargs):
+        raise RuntimeError("queue exploded")
+
+    upload = job_env / "upload.csv"
+    write_csv(upload, 5)
+    monkeypatch.setattr(job_queue, "submit", broken_submit)
+    app.dependency_overrides[verify_api_key] = lambda: "test-key"
+    try:
+        response = TestClient(app, raise_server_exceptions=False).post(
+            "/api/v1/jobs", content=upload.read_bytes(), headers={"Content-Type": "text/csv"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 500
+    assert [path.name for path in job_env.iterdir()] == ["upload.csv"]
@@ -0,0 +1,44 @@
+import random
+from src.api.schemas import BatchPredictionRequest, PredictionRequest, SimpleTransactionRequest
+from src.api.prediction_schemas import FeedbackCreate
+from benchmarks.loadtest import payloads, slo
+
+
+def test_payloads_are_valid_requests():
+    rng = random.Random(0)
+    requests = [PredictionRequest.model_validate(payloads.predict_request(rng)) for _ in range(200)]
+    assert len({request.transaction_id for request in requests}) == 200
+    assert all(request.transaction.Amount >= 0 for request in requests)
+
+    SimpleTransactionRequest.model_validate(payloads.simple_request(rng))
+    assert len(BatchPredictionRequest.model_validate(payloads.batch_request(100, rng)).transactions) == 100
+    FeedbackCreate.model_validate(payloads.feedback_request("6f1c3c9e-5b7a-4a4e-9a53-0f2f1f7f8e11", True, rng))
+
+
+def test_fraud_transactions_are_shifted():
+    rng = random.Random(1)
+    fraud = [payloads.transaction(rng, fraud=True)["V14"] for _ in range(500)]
+    legit = [payloads.transaction(rng, fraud=False)["V14"] for _ in range(500)]
+    assert sum(fraud) / 500 < -5 < sum(legit) / 500
+
+
+def stats(name, requests=1000, failures=0, p95=10.0, p99=20.0, rps=100.0):
+    return slo.EndpointStats(name, requests, failures, p95, p99, rps)
+
+
+def test_slo_report_passes_and_fails():
+    report = slo.evaluate([stats("predict"), stats("health", p95=5, p99=8)], stats("Aggregated", requests=2000))
+    assert report["passed"]
+
+    report = slo.evaluate([stats("predict", p99=150)], stats("Aggregated", failures=50))
+    failed = {(c["scope"], c["metric"]) for c in report["checks"] if not c["passed"]}
+    assert failed == {("predict", "p99_ms"), ("total", "error_rate")}
+    assert "FAIL" in slo.format_report(report)
+
+
+def test_slo_targets_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SLO_PREDICT_BATCH_10_P99_MS", "1000")
+    monkeypatch.setenv("SLO_DEFAULT_P95_MS", "5")
+    assert slo.target("predict/batch [10]") == slo.LatencyTarget(150, 1000)
+    assert slo.target("unlisted").p95_ms == 5
+    assert not slo.evaluate([], stats("Aggregated", requests=0))["passed"]
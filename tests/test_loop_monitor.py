@@ -0,0 +1,76 @@
+import asyncio
+import os
+import time
+from prometheus_client import REGISTRY
+from src.core import loop_monitor as loop_monitor_module
+from src.core.loop_monitor import LoopMonitor
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.events = []
+
+    def info(self, event, **fields):
+        pass
+
+    def warning(self, event, **fields):
+        self.events.append((event, fields))
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_blocking_callback_is_logged_with_its_stack(monkeypatch):
+    log = RecordingLogger()
+    monkeypatch.setattr(loop_monitor_module, "logger", log)
+    blocks_before = sample("event_loop_blocks_total")
+
+    async def run():
+        monitor = LoopMonitor(interval=0.01, block_threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+    blocked = [fields for event, fields in log.events if event == "event_loop_blocked"]
+    # One report for the whole stall, naming the blocking function
+    assert len(blocked) == 1
+    assert "block_the_loop" in blocked[0]["stack"]
+    assert blocked[0]["blocked_ms"] >= 50
+    assert sample("event_loop_blocks_total") == blocks_before + 1
+
+
+def test_lag_and_utilization_are_recorded(monkeypatch):
+    monkeypatch.setattr(loop_monitor_module, "logger", RecordingLogger())
+    lag_count_before = sample("event_loop_lag_seconds_count")
+    slow_before = lag_count_before - sample("event_loop_lag_seconds_bucket", le="0.1")
+
+    async def run():
+        monitor = LoopMonitor(interval=0.01, block_threshold=1.0, utilization_window=0.1)
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.15)
+        # Busy CPU on the loop thread for the rest of the window
+        deadline = time.monotonic() + 0.15
+        while time.monotonic() < deadline:
+            sum(range(1000))
+            await asyncio.sleep(0)
+        await monitor.stop()
+
+    asyncio.run(run())
+    count = sample("event_loop_lag_seconds_count")
+    assert count - lag_count_before >= 3
+    # The 150 ms sleep shows up as one late wake-up
+    assert (count - sample("event_loop_lag_seconds_bucket", le="0.1")) - slow_before == 1
+    assert 0 < sample("event_loop_utilization", pid=str(os.getpid())) <= 1
+
+
+def test_stop_without_start_is_a_no_op():
+    asyncio.run(LoopMonitor().stop())
@@ -0,0 +1,108 @@
+import asyncio
+import time
+import pytest
+from src.core.cache import RedisCache
+from src.core.near_cache import NearCache, CacheStats
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def coherent_cache(**kwargs) -> NearCache:
+    near_cache = NearCache(**kwargs)
+    near_cache.coherent = True
+    return near_cache
+
+
+def test_evicts_least_recently_used_past_max_entries():
+    near_cache = coherent_cache(max_entries=2)
+    near_cache.put("a", b"1")
+    near_cache.put("b", b"2")
+    near_cache.get("a")
+    near_cache.put("c", b"3")
+    
+    assert near_cache.get("a") == b"1"
+    assert near_cache.get("b") is None
+    assert near_cache.evictions == 1
+
+
+def test_bounded_by_bytes():
+    near_cache = coherent_cache(max_bytes=1000)
+    for i in range(10):
+        near_cache.put(f"key:{i}", b"x" * 200)
+    
+    assert near_cache.size_bytes <= 1000
+    assert len(near_cache) == 2
+    assert near_cache.get("key:9") is not None
+
+
+def test_entries_expire_with_redis_ttl():
+    near_cache = coherent_cache(ttl=60)
+    near_cache.put("short", b"1", ttl=0.01)
+    near_cache.put("long", b"2")
+    time.sleep(0.02)
+    
+    assert near_cache.get("short") is None
+    assert near_cache.get("long") == b"2"
+
+
+def test_serves_nothing_unless_coherent():
+    near_cache = coherent_cache()
+    near_cache.put("a", b"1")
+    near_cache.coherent = False
+    
+    assert near_cache.get("a") is None
+
+
+def test_stats_by_prefix():
+    stats = CacheStats()
+    stats.record("prediction:id:1", "local_hits")
+    stats.record("prediction:id:2", "remote_hits")
+    stats.record("prediction:id:3", "misses")
+    stats.record("health:status", "misses")
+    
+    snapshot = stats.snapshot()
+    
+    assert snapshot["prediction:id"]["lookups"] == 3
+    assert snapshot["prediction:id"]["hit_rate"] == 66.67
+    assert snapshot["health"]["hit_rate"] == 0
+
+
+def test_writes_invalidate_other_workers():
+    server = fakeredis.FakeServer()
+    
+    def worker() -> RedisCache:
+        worker_cache = RedisCache()
+        worker_cache.redis_client = fakeredis.aioredis.FakeRedis(server=server)
+        worker_cache.near_cache = NearCache()
+        return worker_cache
+    
+    async def run():
+        first, second = worker(), worker()
+        for worker_cache in (first, second):
+            worker_cache._listener = asyncio.create_task(worker_cache._listen_for_invalidations())
+        while not (first.near_cache.coherent and second.near_cache.coherent):
+            await asyncio.sleep(0.01)
+        
+        await first.set_value("prediction:id:1", {"fraud": False}, expire=60)
+        # Let the invalidation for the first write arrive before reading
+        await asyncio.sleep(0.05)
+        assert await second.get_value("prediction:id:1") == {"fraud": False}
+        assert await second.get_value("prediction:id:1") == {"fraud": False}
+        
+        await first.set_value("prediction:id:1", {"fraud": True}, expire=60)
+        for _ in range(100):
+            if "prediction:id:1" not in second.near_cache._entries:
+                break
+            await asyncio.sleep(0.01)
+        value = await second.get_value("prediction:id:1")
+        stats = second.get_stats()["prefixes"]["prediction:id"]
+        
+        for worker_cache in (first, second):
+            await worker_cache.disconnect()
+        return value, stats
+    
+    value, stats = asyncio.run(run())
+    
+    assert value == {"fraud": True}
+    assert stats["local_hits"] == 1
+    assert stats["remote_hits"] == 2
@@ -0,0 +1,93 @@
+from datetime import datetime
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from src.cli import cli
+from src.core.prediction_stats import PredictionStatsAggregator
+from src.db import crud
+from src.db.database import get_read_db
+from src.main import app, verify_api_key
+
+
+def test_predictions_are_aggregated_per_minute_and_model_version():
+    aggregator = PredictionStatsAggregator()
+    aggregator.record("1.0.0", True, "HIGH", 0.9, -0.2)
+    aggregator.record("1.0.0", False, "LOW", 0.1, 0.1)
+    aggregator.record("2.0.0", False, "MEDIUM", 0.4, 0.0)
+
+    rows = {row["model_version"]: row for row in aggregator.drain()}
+    assert rows["1.0.0"]["total_count"] == 2
+    assert rows["1.0.0"]["fraud_count"] == 1
+    assert (rows["1.0.0"]["high_count"], rows["1.0.0"]["low_count"]) == (1, 1)
+    assert rows["1.0.0"]["fraud_probability_sum"] == 1.0
+    assert rows["2.0.0"]["medium_count"] == 1
+    assert rows["1.0.0"]["bucket_start"].second == 0
+    assert aggregator.drain() == []
+
+
+def test_failed_flush_rows_are_merged_back():
+    aggregator = PredictionStatsAggregator()
+    aggregator.record("1.0.0", True, "HIGH", 0.9, -0.2)
+    rows = aggregator.drain()
+    aggregator.record("1.0.0", False, "LOW", 0.1, 0.1)
+    aggregator._restore(rows)
+
+    [row] = aggregator.drain()
+    assert (row["total_count"], row["fraud_count"], row["low_count"], row["high_count"]) == (2, 1, 1, 1)
+
+
+def test_stats_upsert_adds_into_existing_buckets():
+    sql = str(crud._prediction_stats_upsert([
+        {"bucket_start": datetime(2024, 1, 1), "model_version": "1.0.0", **dict.fromkeys(crud._STATS_COUNTERS, 1)},
+        {"bucket_start": datetime(2024, 1, 1, 0, 1), "model_version": "1.0.0", **dict.fromkeys(crud._STATS_COUNTERS, 2)},
+    ]).compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT ON CONSTRAINT uq_prediction_stats_bucket_model DO UPDATE" in sql
+    for column in crud._STATS_COUNTERS:
+        assert f"{column} = (prediction_stats.{column} + excluded.{column})" in sql
+
+
+def test_stats_accepts_timestamps_with_offsets(monkeypatch):
+    calls = []
+
+    async def get_prediction_stats(db, **kwargs):
+        calls.append(kwargs)
+        return [{
+            "bucket_start": datetime(2024, 1, 1, 10), "model_version": "1.0.0", "total_count": 4, "fraud_count": 1,
+            "low_count": 3, "medium_count": 0, "high_count": 1, "fraud_probability_sum": 1.2, "anomaly_score_sum": 0.4
+        }]
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(crud, "get_prediction_stats", get_prediction_stats)
+    app.dependency_overrides[verify_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_read_db] = no_db
+    try:
+        client = TestClient(app)
+        response = client.get(
+            "/api/v1/stats", params={"start": "2024-01-01T10:00:00Z", "end": "2024-01-01T14:00:00+02:00"}
+        )
+        only_start = client.get("/api/v1/stats", params={"start": "2099-01-01T00:00:00+00:00"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert calls[0]["start"] == datetime(2024, 1, 1, 10) and calls[0]["end"] == datetime(2024, 1, 1, 12)
+    assert response.json()["buckets"][0]["fraud_rate"] == 0.25
+    # Aware start against the default (naive) end is a 400, not a TypeError
+    assert only_start.status_code == 400
+
+
+def test_rebuild_recounts_whole_minutes_from_predictions():
+    sql = str(crud._prediction_stats_rebuild(datetime(2024, 1, 1), datetime(2024, 1, 2)).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO prediction_stats (bucket_start, model_version, total_count")
+    # Same expression in SELECT and GROUP BY, with no bind parameter to tell them apart
+    assert sql.count("date_trunc('minute', predictions.created_at)") == 2
+    assert "count(*) FILTER (WHERE predictions.prediction IS true)" in sql
+
+
+def test_backfill_refuses_minutes_workers_may_still_flush():
+    now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    result = CliRunner().invoke(cli, ["backfill-stats", "--since", "2024-01-01", "--until", now])
+    assert result.exit_code == 2
+    assert "--until" in result.output
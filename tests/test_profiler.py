@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import pytest
+from src.core.profiler import ProfilerBusyError, StackSampler, dump_tasks
+
+
+def spin_until(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def profile_spinning_thread(seconds: float = 0.3) -> StackSampler:
+    stop = threading.Event()
+    worker = threading.Thread(target=spin_until, args=(stop,), name="spinner")
+    worker.start()
+    try:
+        return asyncio.run(StackSampler(0.005).profile(seconds))
+    finally:
+        stop.set()
+        worker.join()
+
+
+def test_sampler_captures_busy_thread_in_collapsed_output():
+    sampler = profile_spinning_thread()
+    lines = sampler.collapsed().splitlines()
+    spinner = [line for line in lines if line.startswith("spinner;")]
+
+    assert sampler.sample_count > 10
+    assert spinner and all("spin_until (" in line for line in spinner)
+    # Each line ends in its sample count, and no line is the sampler's own thread
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in spinner) <= sampler.sample_count
+    assert not any(line.startswith("stack-sampler;") for line in lines)
+
+
+def test_speedscope_output_references_shared_frames():
+    sampler = profile_spinning_thread()
+    document = sampler.speedscope("test")
+    frames = document["shared"]["frames"]
+    profiles = {profile["name"]: profile for profile in document["profiles"]}
+
+    assert document["profiles"][0]["name"] == "MainThread"
+    spinner = profiles["spinner"]
+    assert spinner["type"] == "sampled" and len(spinner["samples"]) == len(spinner["weights"])
+    assert all(0 <= index < len(frames) for sample in spinner["samples"] for index in sample)
+    assert any(frames[sample[-1]]["name"] in ("spin_until", "Event.is_set") for sample in spinner["samples"])
+    assert spinner["endValue"] == pytest.approx(sum(spinner["weights"]))
+
+
+def test_one_profile_at_a_time():
+    async def run():
+        first = asyncio.create_task(StackSampler(0.01).profile(0.2))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ProfilerBusyError):
+            await StackSampler(0.01).profile(0.1)
+        await first
+        # Released once the first run is over
+        await StackSampler(0.01).profile(0.05)
+
+    asyncio.run(run())
+
+
+def test_dump_tasks_shows_where_tasks_wait():
+    async def parked(event: asyncio.Event):
+        await event.wait()
+
+    async def run():
+        event = asyncio.Event()
+        task = asyncio.create_task(parked(event), name="parked-task")
+        await asyncio.sleep(0)
+        tasks = {task["name"]: task for task in dump_tasks()}
+        event.set()
+        await task
+        return tasks
+
+    tasks = asyncio.run(run())
+    assert tasks["parked-task"]["coroutine"].endswith("parked")
+    assert not tasks["parked-task"]["done"]
+    assert "parked" in tasks["parked-task"]["stack"][-1]
@@ -0,0 +1,80 @@
+import json
+import pickle
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+from src.core import pruning
+from src.core.config import settings
+from src.core.pruning import SizeReport
+
+
+@pytest.fixture(scope="module")
+def forest():
+    rng = np.random.default_rng(0)
+    train = rng.standard_normal((3000, 5))
+    model = IsolationForest(n_estimators=40, contamination=0.01, random_state=0).fit(train)
+    normal = rng.standard_normal((1900, 5))
+    fraud = rng.standard_normal((100, 5)) * 0.5 + 3
+    features = np.vstack([normal, fraud])
+    labels = np.concatenate([np.zeros(1900, dtype=np.int8), np.ones(100, dtype=np.int8)])
+    return model, features, labels
+
+
+def test_pruned_forest_scores_match_the_tree_subset(forest):
+    model, features, _ = forest
+    depths = pruning.tree_depths(model, features)
+    np.testing.assert_allclose(pruning.decision_scores(depths.sum(axis=1), 40, model), model.decision_function(features))
+
+    order = pruning.greedy_order(depths)
+    assert sorted(order) == list(range(40))
+    pruned = pruning.prune(model, order[:12])
+    assert len(pruned.estimators_) == 12 and len(model.estimators_) == 40
+    np.testing.assert_allclose(
+        pruned.decision_function(features),
+        pruning.decision_scores(depths[:, order[:12]].sum(axis=1), 12, model)
+    )
+
+
+def test_report_recalibrates_thresholds_to_the_same_alert_volume(forest):
+    model, features, labels = forest
+    threshold = float(np.quantile(model.decision_function(features), 0.05))
+
+    order, reports = pruning.size_report(model, features, threshold, labels, sizes=[5, 10, 20])
+
+    assert [r.n_estimators for r in reports] == [5, 10, 20, 40]
+    full = reports[-1]
+    assert full.threshold == threshold and full.agreement == 1.0 and full.within_tolerance
+    pruned = pruning.prune(model, order[:20])
+    flagged = (pruned.decision_function(features) < reports[2].threshold).mean()
+    assert flagged == pytest.approx(0.05, abs=0.002)
+    assert all(r.roc_auc > 0.99 and r.latency_single_ms > 0 for r in reports)
+
+
+def test_smallest_size_needs_every_larger_size_within_tolerance():
+    def report(size, ok):
+        return SizeReport(size, 0.1, 1.0, None, None, None, None, 1.0, 1.0, ok)
+
+    assert pruning.smallest_within_tolerance([report(10, True), report(20, False), report(30, True), report(40, True)]).n_estimators == 30
+    assert pruning.smallest_within_tolerance([report(10, False), report(40, True)]).n_estimators == 40
+
+
+def test_pruned_version_is_written_in_the_serving_format(forest, tmp_path, monkeypatch):
+    model, features, labels = forest
+    monkeypatch.setattr(settings, "DRIFT_REFERENCE_PATH", str(tmp_path / "missing.json"))
+    threshold = float(np.quantile(model.decision_function(features), 0.05))
+    order, reports = pruning.size_report(model, features, threshold, labels, sizes=[20])
+    pruned = pruning.prune(model, order[:20])
+    source = {"feature_names": [f"V{i}" for i in range(5)], "n_samples_train": 3000, "test_metrics": {}}
+
+    pruning.write_version(tmp_path / "v", pruned, reports[0], reports[-1], source, StandardScaler().fit(features[:, :1]), len(features))
+
+    with open(tmp_path / "v" / "isolation_forest_model.pkl", "rb") as f:
+        loaded = pickle.load(f)
+    metadata = json.loads((tmp_path / "v" / "model_metadata.json").read_text())
+    assert len(loaded.estimators_) == 20
+    assert metadata["optimal_threshold"] == reports[0].threshold
+    assert metadata["model_parameters"]["n_estimators"] == 20
+    assert metadata["pruned_from"]["n_estimators"] == 40
+    assert {"precision", "recall", "roc_auc", "pr_auc", "agreement"} <= set(metadata["test_metrics"])
+    np.testing.assert_array_equal(loaded.decision_function(features), pruned.decision_function(features))
@@ -0,0 +1,140 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from src.core.cache import cache
+from src.core.rate_limiter import RateLimiter, HybridRateLimiter
+
+
+def test_minute_window_allows_burst_then_rejects(fake_redis):
+    limiter = RateLimiter(requests_per_minute=5, requests_per_hour=100)
+    
+    async def run():
+        results = [await limiter.check_rate_limit("key", "POST:/api/v1/predict") for _ in range(5)]
+        with pytest.raises(HTTPException) as exc:
+            await limiter.check_rate_limit("key", "POST:/api/v1/predict")
+        return results, exc.value
+    
+    results, error = asyncio.run(run())
+    
+    assert [r["minute_remaining"] for r in results] == [4, 3, 2, 1, 0]
+    assert error.status_code == 429
+    assert error.headers["RateLimit-Remaining"] == "0"
+    assert int(error.headers["Retry-After"]) >= 1
+    assert "per minute" in error.detail
+
+
+def test_keys_always_carry_a_ttl(fake_redis):
+    limiter = RateLimiter(requests_per_minute=5, requests_per_hour=100)
+    
+    async def run():
+        await limiter.check_rate_limit("key", "GET:/api/v1/predictions/{prediction_id}")
+        keys = await fake_redis.redis_client.keys("ratelimit:*")
+        return keys, [await fake_redis.redis_client.pttl(key) for key in keys]
+    
+    keys, ttls = asyncio.run(run())
+    
+    assert len(keys) == 2
+    assert all(ttl > 0 for ttl in ttls)
+
+
+def test_hour_window_is_enforced(fake_redis):
+    limiter = RateLimiter(requests_per_minute=100, requests_per_hour=3)
+    
+    async def run():
+        for _ in range(3):
+            await limiter.check_rate_limit("key", "POST:/api/v1/predict")
+        with pytest.raises(HTTPException) as exc:
+            await limiter.check_rate_limit("key", "POST:/api/v1/predict")
+        return exc.value
+    
+    error = asyncio.run(run())
+    
+    assert "per hour" in error.detail
+    assert error.headers["RateLimit-Limit"] == "3"
+
+
+def test_hybrid_workers_never_exceed_shared_limit(fake_redis):
+    limit, lease_size, workers = 50, 5, 4
+    limiters = [
+        HybridRateLimiter(requests_per_minute=limit, requests_per_hour=1000, lease_size=lease_size)
+        for _ in range(workers)
+    ]
+    
+    async def attempt(limiter):
+        try:
+            await limiter.check_rate_limit("key", "POST:/api/v1/predict")
+            return True
+        except HTTPException:
+            return False
+    
+    async def run():
+        admitted = 0
+        for _ in range(limit):
+            results = await asyncio.gather(*(attempt(limiter) for limiter in limiters))
+            admitted += sum(results)
+            for limiter in limiters:
+                await limiter.sync()
+        return admitted
+    
+    admitted = asyncio.run(run())
+    
+    assert admitted <= limit
+    assert admitted >= limit - (workers - 1) * lease_size
+
+
+def test_hybrid_stop_returns_unused_tokens(fake_redis):
+    first = HybridRateLimiter(requests_per_minute=10, requests_per_hour=1000, lease_size=10)
+    second = HybridRateLimiter(requests_per_minute=10, requests_per_hour=1000, lease_size=10)
+    
+    async def run():
+        await first.check_rate_limit("key", "POST:/api/v1/predict")
+        with pytest.raises(HTTPException):
+            await second.check_rate_limit("key", "POST:/api/v1/predict")
+        await first.stop()
+        second._leases.clear()
+        return await second.check_rate_limit("key", "POST:/api/v1/predict")
+    
+    result = asyncio.run(run())
+    
+    assert result["minute_remaining"] == 8
+
+
+def test_falls_back_to_local_limits_without_redis():
+    limiter = RateLimiter(requests_per_minute=6, requests_per_hour=100, local_workers=2)
+    
+    async def run():
+        for _ in range(3):
+            await limiter.check_rate_limit("key", "POST:/api/v1/predict")
+        with pytest.raises(HTTPException) as exc:
+            await limiter.check_rate_limit("key", "POST:/api/v1/predict")
+        return exc.value
+    
+    # Trips the shared Redis breaker; later tests need it closed again
+    cache.redis_available = False
+    try:
+        error = asyncio.run(run())
+    finally:
+        cache.redis_available = True
+    
+    assert error.status_code == 429
+    assert error.headers["RateLimit-Limit"] == "3"
+
+
+def test_hybrid_waiters_fall_back_when_the_lease_fetch_fails(fake_redis, monkeypatch):
+    limiter = HybridRateLimiter(requests_per_minute=6, requests_per_hour=100, local_workers=2, lease_size=5)
+    
+    async def failing_script(script, keys, args):
+        await asyncio.sleep(0)
+        return None
+    
+    monkeypatch.setattr(cache, "run_script", failing_script)
+    
+    async def run():
+        return await asyncio.gather(
+            *(limiter.check_rate_limit("key", "POST:/api/v1/predict") for _ in range(3))
+        )
+    
+    results = asyncio.run(run())
+    
+    # All three went to the local limit of 6 // 2 per minute, not the empty lease
+    assert [r["minute_remaining"] for r in results] == [2, 1, 0]
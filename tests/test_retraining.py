@@ -0,0 +1,76 @@
+import json
+import pickle
+import numpy as np
+import pytest
+from src.core import retraining
+from src.core.retraining import Reservoir, RetrainingError
+
+
+def test_reservoir_keeps_a_bounded_uniform_sample():
+    reservoir = Reservoir(capacity=500, n_features=1, seed=0)
+    for start in range(0, 20000, 1000):
+        reservoir.add(np.arange(start, start + 1000, dtype=np.float64).reshape(-1, 1))
+
+    rows, _ = reservoir.data()
+    assert reservoir.seen == 20000
+    assert rows.shape == (500, 1)
+    assert len(np.unique(rows)) == 500
+    # Every part of the stream is represented, not just the first rows
+    assert 7000 < rows.mean() < 13000
+    assert (rows >= 10000).sum() > 150
+
+
+def make_data(rng, n_normal: int, n_fraud: int, n_features: int = 4):
+    normal = rng.standard_normal((n_normal, n_features))
+    fraud = rng.standard_normal((n_fraud, n_features)) * 0.5 + 4
+    features = np.vstack([normal, fraud])
+    labels = np.concatenate([np.zeros(n_normal, dtype=np.int8), np.ones(n_fraud, dtype=np.int8)])
+    return features, labels
+
+
+def test_candidates_are_ranked_on_labeled_rows():
+    rng = np.random.default_rng(0)
+    train, _ = make_data(rng, 2000, 10)
+    eval_features, eval_labels = make_data(rng, 500, 25)
+    grid = {"n_estimators": [20, 50], "max_samples": [128, 5000]}
+
+    candidates = retraining.select_model(train, eval_features, eval_labels, 0.005, workers=2, grid=grid)
+
+    assert len(candidates) == 4
+    assert [c.metrics["pr_auc"] for c in candidates] == sorted((c.metrics["pr_auc"] for c in candidates), reverse=True)
+    # max_samples is capped at the sample size
+    assert max(c.params["max_samples"] for c in candidates) == len(train)
+    best = candidates[0]
+    assert best.metrics["roc_auc"] > 0.95
+    assert best.metrics["recall"] > 0.8
+    predicted = best.model.decision_function(eval_features) < best.threshold
+    assert predicted[eval_labels == 1].mean() == pytest.approx(best.metrics["recall"])
+
+
+def test_single_class_labels_are_rejected():
+    rng = np.random.default_rng(0)
+    train, _ = make_data(rng, 200, 0)
+    with pytest.raises(RetrainingError):
+        retraining.select_model(train, train[:100], np.zeros(100, dtype=np.int8), 0.01)
+
+
+def test_artifacts_use_the_serving_format(tmp_path):
+    rng = np.random.default_rng(0)
+    feature_names = ["V1", "V2", "Time", "Amount"]
+    train, _ = make_data(rng, 1000, 5)
+    eval_features, eval_labels = make_data(rng, 300, 15)
+    candidate = retraining.select_model(train, eval_features, eval_labels, 0.005, grid={"n_estimators": [30]})[0]
+    scaler = retraining.StandardScaler().fit(train[:, 3:4])
+
+    metadata = retraining.write_artifacts(tmp_path / "v2", candidate, scaler, feature_names, len(train), len(eval_labels))
+
+    with open(tmp_path / "v2" / retraining.MODEL_FILE, "rb") as f:
+        model = pickle.load(f)
+    with open(tmp_path / "v2" / retraining.SCALER_FILE, "rb") as f:
+        assert pickle.load(f).mean_ == pytest.approx(scaler.mean_)
+    stored = json.loads((tmp_path / "v2" / retraining.METADATA_FILE).read_text())
+    assert stored == json.loads(json.dumps(metadata))
+    assert stored["feature_names"] == feature_names
+    assert stored["optimal_threshold"] == candidate.threshold
+    assert set(stored["test_metrics"]) == {"precision", "recall", "f1_score", "roc_auc", "pr_auc"}
+    np.testing.assert_array_equal(model.decision_function(eval_features), candidate.model.decision_function(eval_features))
@@ -0,0 +1,41 @@
+import asyncio
+import json
+from datetime import datetime
+import orjson
+import pytest
+from fastapi.exceptions import RequestValidationError
+from src.api.schemas import PredictionRequest, PredictionResponse
+from src.api.serialization import ValidatedBody
+from src.core.scoring import prediction_payload
+
+
+class FakeRequest:
+    def __init__(self, body: bytes):
+        self._body = body
+    
+    async def body(self) -> bytes:
+        return self._body
+
+
+def test_payload_matches_response_model_json():
+    timestamp = datetime(2024, 11, 10, 10, 30, 0, 123456)
+    payload = prediction_payload("TXN-1", 1, 0.812345, "HIGH", -0.0512345, 0.128412, timestamp)
+    model = PredictionResponse(**payload)
+    
+    assert json.loads(orjson.dumps(payload)) == json.loads(model.model_dump_json())
+
+
+def test_validated_body_reports_errors_under_body():
+    body = ValidatedBody(PredictionRequest)
+    
+    with pytest.raises(RequestValidationError) as exc:
+        asyncio.run(body(FakeRequest(b'{"transaction_id": "TXN-1"}')))
+    
+    assert exc.value.errors()[0]["loc"] == ("body", "transaction")
+
+
+def test_validated_body_openapi_schema_is_self_contained():
+    schema = ValidatedBody(PredictionRequest).openapi["requestBody"]["content"]["application/json"]["schema"]
+    
+    assert "$ref" not in json.dumps(schema)
+    assert "V1" in schema["properties"]["transaction"]["properties"]
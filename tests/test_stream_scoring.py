@@ -0,0 +1,99 @@
+import asyncio
+import json
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from src.core.config import settings
+from src.core.stream_scoring import ScoringChannel
+from src.main import app
+
+SAMPLE = json.loads((Path(__file__).resolve().parent.parent / "sample_transaction.json").read_text())
+PATH = f"{settings.API_V1_PREFIX}/predict/stream"
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def frame(transaction_id: str, **overrides) -> str:
+    return json.dumps({"transaction_id": transaction_id, "transaction": {**SAMPLE["transaction"], **overrides}})
+
+
+def test_pipelined_frames_are_answered_in_order(client):
+    with client.websocket_connect(PATH, headers={"X-API-Key": settings.API_KEY}) as ws:
+        for i in range(20):
+            ws.send_text(frame(f"WS-{i}", Amount=float(i)))
+        responses = [ws.receive_json() for _ in range(20)]
+
+    assert [r["transaction_id"] for r in responses] == [f"WS-{i}" for i in range(20)]
+    assert all(r["risk_level"] in ("LOW", "MEDIUM", "HIGH") for r in responses)
+    assert responses[0]["model_version"] == settings.APP_VERSION
+
+
+def test_invalid_frame_gets_an_error_and_the_channel_stays_open(client):
+    with client.websocket_connect(f"{PATH}?api_key={settings.API_KEY}") as ws:
+        ws.send_text(frame("WS-BAD", Amount=-5))
+        ws.send_text("not json")
+        ws.send_bytes(frame("WS-OK").encode())
+        bad, garbage, ok = ws.receive_json(), ws.receive_json(), ws.receive_json()
+
+    assert bad["transaction_id"] == "WS-BAD"
+    assert bad["detail"][0]["loc"][-1] == "Amount"
+    assert garbage["transaction_id"] is None
+    assert ok["transaction_id"] == "WS-OK" and "prediction" in ok
+
+
+def test_invalid_api_key_is_refused(client):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect(PATH, headers={"X-API-Key": "wrong"}):
+            pass
+    assert error.value.code == 1008
+
+
+def test_reading_stops_at_the_in_flight_limit():
+    class FakeSocket:
+        def __init__(self):
+            self.incoming = asyncio.Queue()
+            self.received = 0
+            self.sent = []
+
+        async def receive(self):
+            message = await self.incoming.get()
+            self.received += 1
+            return message
+
+        async def send_text(self, text):
+            self.sent.append(json.loads(text))
+
+    async def run():
+        socket = FakeSocket()
+        channel = ScoringChannel(socket, max_in_flight=2, max_batch_size=8, max_batch_delay=0.0)
+        release = asyncio.Event()
+        score = channel._score
+
+        async def held_score(requests):
+            await release.wait()
+            return await score(requests)
+
+        channel._score = held_score
+        for i in range(5):
+            socket.incoming.put_nowait({"type": "websocket.receive", "text": frame(f"WS-{i}")})
+        task = asyncio.create_task(channel.run())
+        await asyncio.sleep(0.05)
+        read_while_blocked = socket.received
+
+        release.set()
+        while len(socket.sent) < 5:
+            await asyncio.sleep(0.01)
+        socket.incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+        await task
+        return read_while_blocked, socket.sent, channel.batches
+
+    read_while_blocked, sent, batches = asyncio.run(run())
+
+    assert read_while_blocked == 2
+    assert [r["transaction_id"] for r in sent] == [f"WS-{i}" for i in range(5)]
+    assert batches < 5
@@ -0,0 +1,130 @@
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from src.core import thresholds
+from src.core.config import settings
+from src.db import crud
+from src.db.database import get_db, get_read_db
+from src.main import app, verify_api_key
+
+
+def brute_force(scores, labels, threshold):
+    flagged = scores < threshold
+    tp = int((flagged & labels).sum())
+    return int(flagged.sum()), tp
+
+
+def test_sweep_matches_brute_force_with_ties():
+    rng = np.random.default_rng(0)
+    scores = np.round(rng.normal(0.1, 0.05, 2000), 3)
+    labels = rng.random(2000) < 0.05
+
+    curve = thresholds.sweep(scores, labels)
+
+    assert len(curve["threshold"]) == len(np.unique(scores))
+    assert np.all(np.diff(curve["threshold"]) > 0)
+    assert curve["flagged"][-1] == len(scores)
+    for i in range(0, len(curve["threshold"]), 37):
+        flagged, tp = brute_force(scores, labels, curve["threshold"][i])
+        assert curve["flagged"][i] == flagged
+        assert curve["true_positives"][i] == tp
+        assert curve["precision"][i] == pytest.approx(tp / flagged)
+        assert curve["recall"][i] == pytest.approx(tp / labels.sum())
+
+
+def test_operating_points_respect_constraints():
+    rng = np.random.default_rng(1)
+    labels = rng.random(5000) < 0.02
+    scores = rng.normal(0.15, 0.05, 5000) - labels * 0.12
+    curve = thresholds.sweep(scores, labels)
+
+    best = thresholds.operating_point(curve)
+    assert best["f1_score"] == pytest.approx(curve["f1_score"].max())
+
+    target = thresholds.operating_point(curve, objective="recall", min_precision=0.5)
+    assert target["precision"] >= 0.5
+    feasible = curve["precision"] >= 0.5
+    assert target["recall"] == pytest.approx(curve["recall"][feasible].max())
+
+    capped = thresholds.operating_point(curve, objective="recall", max_alert_rate=0.01)
+    assert capped["alert_rate"] <= 0.01
+
+    assert thresholds.operating_point(curve, min_precision=1.0, min_recall=1.0) is None
+
+
+def test_analysis_reports_serving_threshold_and_thins_the_curve():
+    rng = np.random.default_rng(2)
+    labels = rng.random(10000) < 0.01
+    scores = rng.normal(0.15, 0.05, 10000) - labels * 0.1
+
+    analysis = thresholds.analyze(scores, labels, current_threshold=0.05, points=50, min_recall=0.8)
+
+    flagged, tp = brute_force(scores, labels, 0.05)
+    assert analysis["current"]["flagged"] == flagged
+    assert analysis["current"]["true_positives"] == tp
+    assert len(analysis["curve"]) <= 50
+    assert analysis["curve"][-1]["alert_rate"] == 1.0
+    assert analysis["target"]["recall"] >= 0.8
+
+
+def test_sweep_handles_millions_of_rows():
+    rng = np.random.default_rng(3)
+    labels = rng.random(2_000_000) < 0.002
+    scores = rng.normal(0.15, 0.05, 2_000_000) - labels * 0.1
+
+    start = time.perf_counter()
+    curve = thresholds.sweep(scores, labels)
+    thresholds.operating_point(curve, min_precision=0.3)
+    assert time.perf_counter() - start < 5
+
+
+def labeled_scores(n=2000):
+    rng = np.random.default_rng(1)
+    labels = rng.random(n) < 0.1
+    return np.where(labels, rng.normal(-0.05, 0.05, n), rng.normal(0.1, 0.05, n)), labels
+
+
+@pytest.fixture
+def api(monkeypatch):
+    calls = []
+
+    async def get_labeled_scores(db, model_version, since=None):
+        calls.append(since)
+        return labeled_scores()
+
+    async def get_model_version(db, version):
+        return SimpleNamespace(threshold=0.02) if version == "0.9.0" else None
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(crud, "get_labeled_scores", get_labeled_scores)
+    monkeypatch.setattr(crud, "get_model_version", get_model_version)
+    app.dependency_overrides[verify_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_read_db] = no_db
+    app.dependency_overrides[get_db] = no_db
+    yield TestClient(app), calls
+    app.dependency_overrides.clear()
+
+
+def test_analysis_uses_the_requested_versions_threshold(api):
+    client, calls = api
+    older = client.get("/api/v1/thresholds/analysis", params={"model_version": "0.9.0", "since": "2024-01-01T02:00:00+02:00"})
+    unknown = client.get("/api/v1/thresholds/analysis", params={"model_version": "0.1.0"})
+
+    assert older.status_code == 200
+    assert older.json()["current"]["threshold"] == 0.02
+    assert calls[0] == datetime(2024, 1, 1)
+    assert unknown.status_code == 200 and unknown.json()["current"] is None
+
+
+def test_registering_a_version_needs_the_admin_key(api, monkeypatch):
+    client, _ = api
+    body = {"version": "2.0.0", "min_recall": 0.5}
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+    assert client.post("/api/v1/thresholds/model-versions", json=body, headers={"X-API-Key": settings.API_KEY}).status_code == 403
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "admin-key")
+    assert client.post("/api/v1/thresholds/model-versions", json=body, headers={"X-API-Key": settings.API_KEY}).status_code == 403
@@ -0,0 +1,61 @@
+from datetime import datetime
+from fastapi.testclient import TestClient
+from src.core.usage import UsageAggregator
+from src.db import crud
+from src.db.database import get_read_db
+from src.main import app, verify_api_key
+
+def test_requests_are_aggregated_per_key_route_and_minute():
+    aggregator = UsageAggregator()
+    
+    aggregator.record("key-a", "/api/v1/predict", "POST", 200, 5.0)
+    aggregator.record("key-a", "/api/v1/predict", "POST", 429, 70.0)
+    aggregator.record("key-a", "/api/v1/predict", "POST", 200, 1500.0)
+    aggregator.record("key-b", "/api/v1/predict", "POST", 200, 5.0)
+    
+    rows = {row["api_key"]: row for row in aggregator.drain()}
+    
+    assert len(rows) == 2
+    assert rows["key-a"]["request_count"] == 3
+    assert rows["key-a"]["status_2xx"] == 2
+    assert rows["key-a"]["status_4xx"] == 1
+    assert rows["key-a"]["latency_10ms"] == 1
+    assert rows["key-a"]["latency_100ms"] == 1
+    assert rows["key-a"]["latency_inf"] == 1
+    assert rows["key-a"]["latency_max_ms"] == 1500.0
+    assert aggregator.drain() == []
+
+def test_failed_flush_rows_are_merged_back():
+    aggregator = UsageAggregator()
+    aggregator.record("key-a", "/api/v1/predict", "POST", 200, 5.0)
+    rows = aggregator.drain()
+    
+    aggregator.record("key-a", "/api/v1/predict", "POST", 200, 20.0)
+    aggregator._restore(rows)
+    
+    [row] = aggregator.drain()
+    assert row["request_count"] == 2
+    assert row["latency_max_ms"] == 20.0
+
+def test_usage_accepts_timestamps_with_offsets(monkeypatch):
+    calls = []
+
+    async def get_api_usage(db, **kwargs):
+        calls.append(kwargs)
+        return []
+
+    async def no_db():
+        yield None
+
+    monkeypatch.setattr(crud, "get_api_usage", get_api_usage)
+    app.dependency_overrides[verify_api_key] = lambda: "test-key"
+    app.dependency_overrides[get_read_db] = no_db
+    try:
+        response = TestClient(app).get(
+            "/api/v1/usage", params={"start": "2024-01-01T10:00:00-05:00", "end": "2024-01-02T00:00:00Z"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert calls[0]["start"] == datetime(2024, 1, 1, 15) and calls[0]["end"] == datetime(2024, 1, 2)
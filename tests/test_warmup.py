@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from src import main
+from src.core import warmup
+from src.core.cache import cache
+from src.core.config import settings
+from src.main import app
+
+
+def test_ready_is_503_until_warmup_has_run(monkeypatch, fake_redis):
+    pytest.importorskip("aiosqlite")
+    engine = create_async_engine("sqlite+aiosqlite://")
+    readiness = warmup.Readiness()
+    monkeypatch.setattr(main, "readiness", readiness)
+    monkeypatch.setattr(warmup, "readiness", readiness)
+    monkeypatch.setattr(warmup, "async_engine", engine)
+    monkeypatch.setattr(warmup, "async_read_engine", engine)
+
+    async def connected():
+        pass
+
+    monkeypatch.setattr(cache, "connect", connected)
+    client = TestClient(app)
+    try:
+        starting = client.get("/ready")
+        asyncio.run(warmup.run_warmup())
+        ready = client.get("/ready")
+    finally:
+        asyncio.run(engine.dispose())
+
+    assert starting.status_code == 503
+    assert starting.json()["status"] == "starting"
+    assert ready.status_code == 200
+    assert ready.json()["checks"] == {"model": "ok", "redis": "ok", "database": "ok"}
+
+
+def test_timed_out_pool_warmup_closes_opened_connections(monkeypatch):
+    class SlowConnection:
+        closed = False
+
+        async def execute(self, statement):
+            await asyncio.sleep(10)
+
+        async def close(self):
+            self.closed = True
+
+    class Engine:
+        def __init__(self):
+            self.connections = []
+
+        async def connect(self):
+            self.connections.append(SlowConnection())
+            return self.connections[-1]
+
+    engine = Engine()
+    monkeypatch.setattr(settings, "WARMUP_TIMEOUT", 0.05)
+
+    status = asyncio.run(warmup._with_timeout("database", warmup._warm_db_pool(engine, 3)))
+
+    assert status == "unavailable"
+    assert len(engine.connections) == 3
+    assert all(connection.closed for connection in engine.connections)
+
+
+def test_redis_warmup_goes_through_the_breaker(monkeypatch, fake_redis):
+    async def connected():
+        pass
+
+    monkeypatch.setattr(cache, "connect", connected)
+    cache.breaker.trip()
+
+    assert asyncio.run(warmup._warm_redis()) == "unavailable"